@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Ops/sec of the tm.obs.counters primitives, with and without bound label handles."""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from typing import Callable, List, Tuple
+
+from tm.obs.counters import Registry
+
+_LABELS = {"flow": "demo", "status": "ok"}
+
+
+def _cases(registry: Registry) -> List[Tuple[str, Callable[[int], None]]]:
+    counter = registry.get_counter("bench_counter")
+    gauge = registry.get_gauge("bench_gauge")
+    histogram = registry.get_histogram("bench_histogram", buckets=[1, 5, 10, 50, 100, 250, 500, 1000, 5000])
+    counter_child = counter.labels(_LABELS)
+    gauge_child = gauge.labels(_LABELS)
+    histogram_child = histogram.labels(_LABELS)
+
+    def counter_inc(n: int) -> None:
+        for _ in range(n):
+            counter.inc(labels=_LABELS)
+
+    def counter_child_inc(n: int) -> None:
+        for _ in range(n):
+            counter_child.inc()
+
+    def gauge_set(n: int) -> None:
+        for i in range(n):
+            gauge.set(i, labels=_LABELS)
+
+    def gauge_child_set(n: int) -> None:
+        for i in range(n):
+            gauge_child.set(i)
+
+    def histogram_observe(n: int) -> None:
+        for i in range(n):
+            histogram.observe(i % 2000, labels=_LABELS)
+
+    def histogram_child_observe(n: int) -> None:
+        for i in range(n):
+            histogram_child.observe(i % 2000)
+
+    return [
+        ("Counter.inc(labels=)", counter_inc),
+        ("CounterChild.inc", counter_child_inc),
+        ("Gauge.set(labels=)", gauge_set),
+        ("GaugeChild.set", gauge_child_set),
+        ("Histogram.observe(labels=)", histogram_observe),
+        ("HistogramChild.observe", histogram_child_observe),
+    ]
+
+
+def _run(fn: Callable[[int], None], ops: int, threads: int) -> float:
+    workers = [threading.Thread(target=fn, args=(ops,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return ops * threads / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Metric primitive benchmark")
+    parser.add_argument("--ops", type=int, default=200_000, help="operations per thread")
+    parser.add_argument("--threads", default="1,4", help="comma separated thread counts")
+    args = parser.parse_args()
+
+    thread_counts = [int(t) for t in args.threads.split(",") if t.strip()]
+    print("===== Metric Primitive Benchmark =====")
+    print(f"{'primitive':<28}" + "".join(f"{f'{t} thr ops/s':>16}" for t in thread_counts))
+    for name, _ in _cases(Registry()):
+        rates = []
+        for threads in thread_counts:
+            registry = Registry()  # fresh shards per run
+            fn = dict(_cases(registry))[name]
+            rates.append(_run(fn, args.ops, threads))
+        print(f"{name:<28}" + "".join(f"{rate:>16,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Pipeline.run throughput against context size (snapshot cost benchmark)."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from tm.pipeline.engine import Pipeline, Plan, Rule, StepSpec, TraceSpan
+
+
+def _make_ctx(n_services: int) -> Dict[str, Any]:
+    return {
+        "new": {
+            "nfInstanceId": "nf-1",
+            "services": [
+                {"name": f"svc-{i}", "state": "UP", "meta": {"idx": i, "tags": ["a", "b"]}} for i in range(n_services)
+            ],
+        }
+    }
+
+
+def _touch(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    ctx["new"]["status"] = "ALIVE"
+    return ctx
+
+
+def _legacy_run(plan: Plan, ctx: Dict[str, Any], sink: Callable[[Any], None]) -> Dict[str, Any]:
+    # Previous behaviour: full JSON round-trip before every step.
+    for rule in plan.rules:
+        for step_name in rule.steps:
+            before = json.loads(json.dumps(ctx))
+            ctx = plan.steps[step_name].fn(ctx)
+            sink((before, ctx))
+    return ctx
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pipeline snapshot benchmark")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma separated service counts per context")
+    parser.add_argument("--steps", type=int, default=5, help="steps per rule")
+    parser.add_argument("--runs", type=int, default=50, help="pipeline runs per size")
+    args = parser.parse_args()
+
+    step_names = [f"s{i}" for i in range(args.steps)]
+    plan = Plan(
+        steps={name: StepSpec(name, [], [], _touch) for name in step_names},
+        rules=[Rule("r", ["new"], step_names)],
+    )
+    spans: List[TraceSpan] = []
+    pipe = Pipeline(plan, trace_sink=spans.append)
+
+    print("===== Pipeline Snapshot Benchmark =====")
+    print(f"{'services':>10} {'bytes':>10} {'legacy runs/s':>14} {'lazy runs/s':>12} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        ctx = _make_ctx(size)
+        encoded = len(json.dumps(ctx))
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            _legacy_run(plan, ctx, lambda _span: None)
+        legacy = args.runs / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            pipe.run(ctx, [("new",)], lambda expr, path: True)
+            spans.clear()
+        lazy = args.runs / (time.perf_counter() - start)
+
+        print(f"{size:>10} {encoded:>10} {legacy:>14.1f} {lazy:>12.1f} {lazy / legacy:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
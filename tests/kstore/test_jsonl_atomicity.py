@@ -1,6 +1,8 @@
 import json
 import threading
 
+import pytest
+
 from tm.kstore.jsonl import JsonlKStore
 
 
@@ -31,3 +33,153 @@ def test_jsonl_atomicity(tmp_path):
         assert leftovers == []
     finally:
         store.close()
+
+
+def test_jsonl_appends_instead_of_rewriting(tmp_path):
+    path = tmp_path / "state.jsonl"
+    store = JsonlKStore(path, compact_min_records=1_000_000)
+    try:
+        store.put("a", {"v": 1})
+        inode = path.stat().st_ino
+        store.put("a", {"v": 2})
+        store.delete("a")
+        store.put("b", {"v": 3})
+        assert path.stat().st_ino == inode
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 4
+    finally:
+        store.close()
+
+    reopened = JsonlKStore(path)
+    try:
+        assert reopened.get("a") is None
+        assert reopened.get("b") == {"v": 3}
+    finally:
+        reopened.close()
+
+
+def test_jsonl_compacts_dead_records(tmp_path):
+    path = tmp_path / "state.jsonl"
+    store = JsonlKStore(path, compact_ratio=0.5, compact_min_records=20, background_compaction=False)
+    try:
+        for i in range(50):
+            store.put("hot", {"v": i})
+        store.put("cold", {"v": -1})
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) < 20
+        assert store.get("hot") == {"v": 49}
+    finally:
+        store.close()
+
+    reopened = JsonlKStore(path)
+    try:
+        assert reopened.get("hot") == {"v": 49}
+        assert reopened.get("cold") == {"v": -1}
+    finally:
+        reopened.close()
+    assert list(tmp_path.glob(".state.jsonl.tmp-*")) == []
+
+
+def test_jsonl_background_compaction_keeps_concurrent_writes(tmp_path):
+    path = tmp_path / "state.jsonl"
+    store = JsonlKStore(path, compact_ratio=0.3, compact_min_records=10)
+
+    def _writer(idx: int) -> None:
+        for n in range(40):
+            store.put(f"k:{idx}", {"n": n})
+
+    threads = [threading.Thread(target=_writer, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.compact()
+    store.close()
+
+    reopened = JsonlKStore(path)
+    try:
+        assert dict(reopened.scan("k:")) == {f"k:{i}": {"n": 39} for i in range(4)}
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 4
+    finally:
+        reopened.close()
+
+
+def test_jsonl_load_drops_torn_tail(tmp_path):
+    path = tmp_path / "state.jsonl"
+    path.write_text('{"op":"put","key":"a","value":{"v":1}}\n{"op":"put","key":"b","val', encoding="utf-8")
+    store = JsonlKStore(path)
+    try:
+        assert store.get("a") == {"v": 1}
+        assert store.get("b") is None
+        store.put("c", {"v": 2})
+    finally:
+        store.close()
+    assert [json.loads(line)["key"] for line in path.read_text(encoding="utf-8").splitlines()] == ["a", "c"]
+
+
+def test_jsonl_load_keeps_parseable_unterminated_tail(tmp_path):
+    path = tmp_path / "state.jsonl"
+    path.write_text('{"op":"put","key":"a","value":{"v":1}}\n{"op":"put","key":"b","value":{"v":2}}', encoding="utf-8")
+    store = JsonlKStore(path)
+    try:
+        assert store.get("b") == {"v": 2}
+        store.put("c", {"v": 3})
+    finally:
+        store.close()
+    assert [json.loads(line)["key"] for line in path.read_text(encoding="utf-8").splitlines()] == ["a", "b", "c"]
+
+
+def test_jsonl_failed_append_leaves_state_and_counts(tmp_path):
+    path = tmp_path / "state.jsonl"
+    store = JsonlKStore(path, compact_min_records=1_000_000)
+    try:
+        store.put("a", {"v": 1})
+        fh = store._ensure_handle()
+
+        class _FullDisk:
+            def write(self, _line):
+                raise OSError("disk full")
+
+        store._fh = _FullDisk()
+        try:
+            with pytest.raises(OSError):
+                store.put("a", {"v": 2})
+            with pytest.raises(OSError):
+                store.delete("a")
+        finally:
+            store._fh = fh
+        assert store.get("a") == {"v": 1}
+        assert store._total_records == 1
+    finally:
+        store.close()
+
+
+def test_jsonl_compaction_encodes_outside_the_lock(tmp_path, monkeypatch):
+    import tm.kstore.jsonl as jsonl
+
+    path = tmp_path / "state.jsonl"
+    store = JsonlKStore(path, compact_min_records=1_000_000)
+    for i in range(5):
+        store.put(f"k:{i}", {"v": i})
+    writes_during_encode = []
+    real_encode = jsonl._encode
+
+    def _encode(record):
+        if record.get("key") == "k:0" and not writes_during_encode:
+            writer = threading.Thread(target=lambda: store.put("late", {"v": 99}))
+            writer.start()
+            writer.join(timeout=5)
+            writes_during_encode.append(not writer.is_alive())
+        return real_encode(record)
+
+    monkeypatch.setattr(jsonl, "_encode", _encode)
+    store.compact()
+    monkeypatch.setattr(jsonl, "_encode", real_encode)
+    store.close()
+    assert writes_during_encode == [True]
+
+    reopened = JsonlKStore(path)
+    try:
+        assert reopened.get("late") == {"v": 99}
+        assert len(list(reopened.scan("k:"))) == 5
+    finally:
+        reopened.close()
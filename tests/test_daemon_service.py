@@ -48,6 +48,25 @@ def test_collect_status_reports_queue_counts(tmp_path: Path) -> None:
     assert status.uptime_s is not None and status.uptime_s >= 0
 
 
+def test_collect_status_reads_stats_without_loading_queue(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    queue_dir = tmp_path / "queue"
+    queue = FileWorkQueue(str(queue_dir))
+    queue.put_many([{"task": idx} for idx in range(4)])
+    queue.lease(1, lease_ms=60_000)
+
+    def _no_replay(*_args, **_kwargs):
+        raise AssertionError("status should not replay queue segments")
+
+    monkeypatch.setattr("tm.daemon.state.FileWorkQueue", _no_replay)
+    paths = build_paths(tmp_path / "daemon")
+    write_state(paths, DaemonState(pid=os.getpid(), queue_dir=str(queue_dir), created_at=time.time()))
+    status = collect_status(paths)
+    queue.close()
+    assert status.queue is not None
+    assert (status.queue.backlog, status.queue.pending, status.queue.inflight) == (4, 3, 1)
+    assert status.queue.oldest_available_at is not None
+
+
 # Signal delivery on Windows is inconsistent and may interrupt pytest itself.
 @pytest.mark.skipif(sys.platform == "win32", reason="daemon signal semantics differ on Windows")
 def test_stop_daemon_terminates_process(tmp_path: Path) -> None:
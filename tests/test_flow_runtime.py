@@ -154,3 +154,29 @@ async def test_runtime_notifies_run_end_listeners():
     assert record.status == "ok"
     assert record.binding is None
     assert record.selected_flow == "listener"
+
+
+@pytest.mark.asyncio
+async def test_get_stats_reports_per_flow_and_window_latency():
+    fast = _build_flow_spec("fast")
+    slow = _build_flow_spec("slow")
+    runtime = FlowRuntime(
+        {fast.name: DummyFlow(fast), slow.name: DummyFlow(slow)},
+        idempotency_ttl_sec=0,
+        stats_window_sec=60.0,
+    )
+
+    for _ in range(5):
+        await runtime.run("fast")
+    await runtime.run("slow")
+    await runtime.aclose()
+
+    stats = runtime.get_stats()
+    assert stats["success"] == 6
+    assert stats["exec_ms_p99"] >= stats["exec_ms_p50"] >= 0.0
+    assert set(stats["per_flow"]) == {"fast", "slow"}
+    assert stats["per_flow"]["fast"]["success"] == 5
+    assert stats["per_flow"]["slow"]["count"] == 1
+    assert stats["window"]["window_sec"] == 60.0
+    assert stats["window"]["count"] == 6
+    assert stats["window"]["per_flow"]["fast"]["count"] == 5
@@ -17,7 +17,9 @@ from tm.governance.config import (
     LimitsConfig,
     GovernanceConfig,
 )
+from tm.governance.breaker import BreakerState
 from tm.governance.manager import GovernanceManager
+from tm.obs import counters
 from tm.steps import human_approval as human_approval_step
 
 
@@ -136,3 +138,27 @@ async def test_human_approval_returns_pending():
     assert decided.status == "approve"
 
     await runtime.aclose()
+
+
+def test_governance_gauges_bind_label_children_once(monkeypatch):
+    counters.metrics.reset()
+    manager = GovernanceManager(GovernanceConfig(enabled=False))
+    bound: list[object] = []
+    original = counters.Gauge.labels
+
+    def _labels(self, labels=None, **kwargs):
+        bound.append(labels)
+        return original(self, labels, **kwargs)
+
+    monkeypatch.setattr(counters.Gauge, "labels", _labels)
+
+    manager._record_breaker_state(("flow", "checkout"), BreakerState.OPEN)
+    manager._record_breaker_state(("flow", "checkout"), BreakerState.CLOSED)
+    assert bound == [{"target": "flow:checkout"}]
+    assert counters.metrics.get_gauge("tm_breaker_state").samples() == [((("target", "flow:checkout"),), 0.0)]
+
+    counters.metrics.reset()  # a swapped registry gets fresh children
+    manager._record_breaker_state(("flow", "checkout"), BreakerState.HALF_OPEN)
+    assert len(bound) == 2
+    assert counters.metrics.get_gauge("tm_breaker_state").samples() == [((("target", "flow:checkout"),), 0.5)]
+    counters.metrics.reset()
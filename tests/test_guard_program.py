@@ -0,0 +1,105 @@
+import dataclasses
+import re
+
+import pytest
+
+from tm.guard import GuardEngine, GuardProgram, GuardRule, GuardViolation, register_guard
+from tm.guard import filters
+
+
+@pytest.fixture
+def restore_custom_guards():
+    saved = dict(filters._CUSTOM_RULES)
+    yield
+    filters._CUSTOM_RULES.clear()
+    filters._CUSTOM_RULES.update(saved)
+
+
+def test_compiled_program_shares_paths_and_screens_keywords() -> None:
+    program = GuardEngine.compile_rules(
+        [
+            {"type": "deny_keywords", "path": "$.input.text", "values": ["Drop Table", "rm -rf"]},
+            {"type": "deny_keywords", "path": "$.input.text", "values": ["table", "drop"]},
+            {"type": "length_max", "path": "$.input.items[*].name", "value": 3},
+            {"type": "unknown_rule", "path": "$.input.text"},
+        ]
+    )
+    assert isinstance(program, GuardProgram)
+    engine = GuardEngine()
+
+    clean = engine.evaluate({"input": {"text": "hello", "items": [{"name": "ok"}]}}, program)
+    assert clean.allowed
+
+    blocked = engine.evaluate({"input": {"text": "please DROP TABLE", "items": [{"name": "long"}]}}, program)
+    assert [(v.rule, v.reason, dict(v.details)) for v in blocked.violations] == [
+        ("deny_keywords", "keyword_block", {"keyword": "drop table", "index": 0}),
+        ("deny_keywords", "keyword_block", {"keyword": "table", "index": 0}),
+        ("length_max", "length_exceeded", {"limit": 3, "actual": 4, "index": 0}),
+    ]
+    # rule lists built from the program reuse one cached plan
+    engine.evaluate({}, list(program))
+    assert len(engine._plans) == 1
+
+
+def test_invalid_regex_raises_when_evaluated() -> None:
+    program = GuardEngine.compile_rules([{"type": "regex_deny", "path": "$.text", "pattern": "("}])
+    with pytest.raises(re.error):
+        GuardEngine().evaluate({"text": "x"}, program)
+
+
+def test_register_guard_refreshes_cached_plans(restore_custom_guards) -> None:
+    engine = GuardEngine()
+    program = GuardEngine.compile_rules([{"type": "late_registered_rule", "path": "$.text"}])
+    assert engine.evaluate({"text": "x"}, program).allowed
+
+    @register_guard("late_registered_rule")
+    def _deny(rule, values, _ctx):
+        values.clear()  # handlers get their own copy of the values
+        return [GuardViolation(rule=rule.name, path=rule.path, reason="late")]
+
+    decision = engine.evaluate({"text": "x"}, program)
+    assert [v.reason for v in decision.violations] == ["late"]
+
+
+def test_guard_rules_are_immutable() -> None:
+    options = {"value": 3}
+    rule = GuardRule(name="length_max", path="$.text", options=options)
+    engine = GuardEngine()
+    assert not engine.evaluate({"text": "long"}, [rule]).allowed
+
+    options["value"] = 10  # the rule keeps its own copy
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        rule.path = "$.other"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        rule.options["value"] = 10  # type: ignore[index]
+    assert not engine.evaluate({"text": "long"}, [rule]).allowed
+
+    relaxed = dataclasses.replace(rule, options={"value": 10})
+    assert engine.evaluate({"text": "long"}, [relaxed]).allowed
+
+
+def test_evaluate_many_matches_per_payload_decisions() -> None:
+    program = GuardEngine.compile_rules(
+        [
+            {"type": "deny_keywords", "path": "$.text", "values": ["drop table", "ß"]},
+            {"type": "length_max", "path": "$.text", "value": 12},
+            {"type": "required", "path": "$.text"},
+            {"type": "regex_deny", "path": "$.tags[*]", "pattern": "^admin$"},
+        ]
+    )
+    payloads = [
+        {"text": "fine"},
+        {"text": "x drop"},  # "drop" and "table" sit in adjacent rows, never in one value
+        {"text": "table y"},
+        {"text": "İstanbul DROP TABLE"},  # lowercases to more characters; offsets are re-based
+        {"text": "STRASSE ß"},
+        {"text": 1234567890123},
+        {"text": ""},
+        {"tags": ["user", "admin"]},
+        None,
+    ]
+    engine = GuardEngine()
+    batch = engine.evaluate_many(payloads, program)
+    assert batch == [engine.evaluate(payload, program) for payload in payloads]
+    assert [decision.allowed for decision in batch] == [True, True, True, False, False, False, False, False, False]
+    assert engine.evaluate_many([], program) == []
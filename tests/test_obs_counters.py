@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from tm.obs.counters import Registry
+
+
+def test_counter_shards_merge_across_live_and_finished_threads():
+    registry = Registry()
+    counter = registry.get_counter("hits")
+    child = counter.labels(route="a")
+
+    def work() -> None:
+        for _ in range(1000):
+            child.inc()
+            counter.inc(labels={"route": "b"})
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    child.inc(5)
+
+    samples = dict(counter.samples())
+    assert samples[(("route", "a"),)] == 4005.0
+    assert samples[(("route", "b"),)] == 4000.0
+    # finished threads are folded once, not counted again
+    assert dict(counter.samples()) == samples
+
+
+def test_labels_returns_cached_child_bound_to_canonical_key():
+    registry = Registry()
+    counter = registry.get_counter("hits")
+    assert counter.labels(b="2", a="1") is counter.labels({"a": "1"}, b="2")
+    counter.labels(a="1", b="2").inc()
+    counter.inc(2, labels={"b": "2", "a": "1"})
+    assert counter.samples() == [((("a", "1"), ("b", "2")), 3.0)]
+
+    gauge = registry.get_gauge("depth")
+    gauge.labels(q="x").set(7)
+    gauge.labels(q="x").inc(1)
+    gauge.set(3, labels={"q": "y"})
+    assert dict(gauge.samples()) == {(("q", "x"),): 8.0, (("q", "y"),): 3.0}
+
+
+def test_histogram_buckets_sum_and_count():
+    registry = Registry()
+    histogram = registry.get_histogram("latency", buckets=[1, 5, 10])
+    assert histogram.buckets == (1.0, 5.0, 10.0, float("inf"))
+    child = histogram.labels(flow="f")
+    for value in (0.5, 1.0, 3, 5, 7, 100):
+        child.observe(value)
+    child.observe(float("nan"))
+
+    samples = histogram.samples()
+    assert list(samples) == [(("flow", "f"),)]  # no separate sum series
+    buckets = samples[(("flow", "f"),)]
+    assert [(bucket.le, bucket.count) for bucket in buckets] == [
+        (1.0, 2.0),
+        (5.0, 4.0),
+        (10.0, 5.0),
+        (float("inf"), 6.0),
+    ]
+    total, count = histogram.totals()[(("flow", "f"),)]
+    assert total == pytest.approx(116.5)
+    assert count == 6
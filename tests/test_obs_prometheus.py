@@ -0,0 +1,85 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from tm.obs.counters import Registry
+from tm.obs.exporters import prometheus
+from tm.obs.exporters.prometheus import PrometheusRenderer, mount_prometheus
+
+
+def _registry() -> Registry:
+    registry = Registry()
+    registry.get_counter("jobs_total", help="Jobs\nprocessed").inc(3, labels={"flow": 'say "hi"\\now'})
+    registry.get_gauge("depth").set(2.5)
+    latency = registry.get_histogram("latency_ms", buckets=[10, 100])
+    latency.labels(flow="f").observe(5, exemplar={"trace_id": "run-1"})
+    latency.labels(flow="f").observe(50)
+    return registry
+
+
+def test_text_format_escapes_labels_and_emits_sum_and_count() -> None:
+    text = PrometheusRenderer(_registry()).render()
+    lines = text.splitlines()
+    assert "# HELP jobs_total Jobs\\nprocessed" in lines
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{flow="say \\"hi\\"\\\\now"} 3' in lines
+    assert "depth 2.5" in lines
+    assert lines[-5:] == [
+        'latency_ms_bucket{flow="f",le="10.0"} 1',
+        'latency_ms_bucket{flow="f",le="100.0"} 2',
+        'latency_ms_bucket{flow="f",le="+Inf"} 2',
+        'latency_ms_count{flow="f"} 2',
+        'latency_ms_sum{flow="f"} 55',
+    ]
+    assert "trace_id" not in text  # exemplars are OpenMetrics only
+
+
+def test_openmetrics_format_has_exemplars_and_eof() -> None:
+    lines = PrometheusRenderer(_registry()).render(openmetrics=True).splitlines()
+    assert "# TYPE jobs counter" in lines
+    assert any(line.startswith('jobs_total{flow="say') for line in lines)
+    bucket = next(line for line in lines if line.startswith('latency_ms_bucket{flow="f",le="10.0"}'))
+    assert bucket.startswith('latency_ms_bucket{flow="f",le="10.0"} 1 # {trace_id="run-1"} 5 ')
+    assert lines[-1] == "# EOF"
+
+
+def test_renderer_only_reformats_changed_series(monkeypatch) -> None:
+    registry = Registry()
+    histogram = registry.get_histogram("latency_ms", buckets=[10])
+    for flow in ("a", "b", "c"):
+        histogram.labels(flow=flow).observe(1)
+    renderer = PrometheusRenderer(registry)
+    renderer.render()
+
+    rendered = []
+    original = prometheus._histogram_lines
+    monkeypatch.setattr(
+        prometheus,
+        "_histogram_lines",
+        lambda name, key, *args: rendered.append(key) or original(name, key, *args),
+    )
+    histogram.labels(flow="b").observe(20)
+    text = renderer.render()
+    assert rendered == [(("flow", "b"),)]
+    assert 'latency_ms_count{flow="b"} 2' in text.splitlines()
+
+
+def test_metrics_endpoint_negotiates_format_and_gzip() -> None:
+    app = FastAPI()
+    mount_prometheus(app, _registry())
+    client = TestClient(app)
+
+    plain = client.get("/metrics", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "content-encoding" not in plain.headers
+
+    zipped = client.get(
+        "/metrics",
+        headers={"Accept": "application/openmetrics-text; version=1.0.0", "Accept-Encoding": "gzip"},
+    )
+    assert zipped.headers["content-type"].startswith("application/openmetrics-text")
+    assert zipped.headers["content-encoding"] == "gzip"
+    # the client undoes the transfer encoding; the body must still be the full exposition
+    body = zipped.content if not zipped.content.startswith(b"\x1f\x8b") else gzip.decompress(zipped.content)
+    assert body.decode("utf-8").rstrip().endswith("# EOF")
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+
+from tm.obs.counters import Registry
+from tm.obs.shared import FleetMetrics, MetricsSpool, merge_spools, retire_spool, spool_names
+
+
+def _record(registry: Registry, hits: float, latency: float) -> None:
+    registry.get_counter("hits").inc(hits, labels={"flow": "f"})
+    registry.get_gauge("inflight").set(hits)
+    registry.get_histogram("latency", buckets=[10, 100]).labels(flow="f").observe(latency)
+
+
+def test_spools_merge_and_survive_retirement(tmp_path: Path) -> None:
+    spool_dir = str(tmp_path / "metrics")
+    workers = [Registry(), Registry()]
+    _record(workers[0], 2, 5)
+    _record(workers[1], 3, 50)
+    for index, registry in enumerate(workers):
+        MetricsSpool(spool_dir, f"worker-{index}-1", registry).publish()
+    local = Registry()
+    local.get_counter("hits").inc(1, labels={"flow": "f"})
+
+    merged = merge_spools(spool_dir, local)
+    assert merged.get_counter("hits").samples() == [((("flow", "f"),), 6.0)]
+    assert dict(merged.get_gauge("inflight").samples()) == {
+        (("process", "worker-0-1"),): 2.0,
+        (("process", "worker-1-1"),): 3.0,
+    }
+    latency = merged.get_histogram("latency")
+    assert [bucket.count for bucket in latency.samples()[(("flow", "f"),)]] == [1.0, 2.0, 2.0]
+    assert latency.totals()[(("flow", "f"),)] == (pytest.approx(55.0), 2)
+
+    # a restarted worker starts from zero; the exited one's counters are kept
+    retire_spool(spool_dir, "worker-0-1")
+    restarted = Registry()
+    _record(restarted, 4, 500)
+    MetricsSpool(spool_dir, "worker-0-2", restarted).publish()
+    assert spool_names(spool_dir) == ["worker-0-2", "worker-1-1"]
+
+    snapshot = FleetMetrics(spool_dir, local=None).snapshot()
+    assert snapshot["counters"]["hits"] == [((("flow", "f"),), 9.0)]
+    assert {key for key, _ in snapshot["gauges"]["inflight"]} == {
+        (("process", "worker-0-2"),),
+        (("process", "worker-1-1"),),
+    }
+    assert snapshot["histograms"]["latency"][(("flow", "f"),)][-1].count == 3.0
+
+
+def test_spool_rejects_reserved_name(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        MetricsSpool(str(tmp_path), "retired", Registry())
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from tm.obs.sketch import QuantileSketch, WindowedSketch
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(round(q * (len(ordered) - 1)))]
+
+
+def test_quantile_sketch_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(2.0, 1.2) for _ in range(20000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.count == len(values)
+    assert sketch.sum == pytest.approx(sum(values))
+    for q in (0.5, 0.95, 0.99):
+        exact = _exact(values, q)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+
+
+def test_quantile_sketch_memory_is_bounded():
+    sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=64)
+    for i in range(1, 100000, 7):
+        sketch.add(float(i))
+    assert sketch.bucket_count <= 64
+    assert sketch.quantile(0.99) == pytest.approx(_exact(list(range(1, 100000, 7)), 0.99), rel=0.011)
+
+
+def test_quantile_sketch_empty_zero_and_merge():
+    empty = QuantileSketch()
+    assert empty.quantile(0.5) == 0.0
+
+    left = QuantileSketch()
+    right = QuantileSketch()
+    for _ in range(10):
+        left.add(0.0)
+    for value in (5.0, 10.0, 20.0):
+        right.add(value)
+    left.merge(right)
+    assert left.count == 13
+    assert left.quantile(0.0) == 0.0
+    assert left.quantile(1.0) == pytest.approx(20.0, rel=0.01)
+
+
+def test_windowed_sketch_expires_old_slices():
+    now = [0.0]
+    window = WindowedSketch(10.0, slices=5, clock=lambda: now[0])
+    window.add(1000.0)
+    now[0] = 5.0
+    window.add(1.0)
+    assert window.merged().count == 2
+
+    now[0] = 12.0
+    merged = window.merged()
+    assert merged.count == 1
+    assert merged.quantile(0.5) == pytest.approx(1.0, rel=0.01)
@@ -0,0 +1,125 @@
+import dataclasses
+import json
+import math
+
+import pytest
+
+from tm.pipeline.engine import ContextSnapshot, Pipeline, Plan, Rule, StepSpec, TraceSpan
+from tm.pipeline.trace_store import PipelineTraceSink
+from tm.storage.binlog import BinaryLogReader
+
+
+def _mutate_nested(ctx):
+    for svc in ctx["new"]["services"]:
+        svc["state"] = "UP"
+    ctx["new"]["status"] = "ALIVE"
+    return ctx
+
+
+def _stamp(ctx):
+    ctx["stamped"] = True
+    return ctx
+
+
+def _boom(ctx):
+    ctx["partial"] = 1
+    raise RuntimeError("boom")
+
+
+def _run(ctx, steps, sink):
+    plan = Plan(
+        steps={name: StepSpec(name, [], [], fn) for name, fn in steps.items()},
+        rules=[Rule("r", ["new"], list(steps))],
+    )
+    return Pipeline(plan, trace_sink=sink).run(ctx, [("new",)], lambda expr, path: True)
+
+
+def test_spans_capture_state_despite_in_place_mutation():
+    spans: list[TraceSpan] = []
+    ctx = {"new": {"services": [{"name": "a", "state": "DOWN"}]}}
+
+    out = _run(ctx, {"mutate": _mutate_nested, "stamp": _stamp}, spans.append)
+
+    assert out["stamped"] is True
+    first, second = spans
+    assert first.inputs == {"new": {"services": [{"name": "a", "state": "DOWN"}]}}
+    assert first.outputs["new"]["status"] == "ALIVE"
+    assert "stamped" not in first.outputs
+    assert second.inputs == first.outputs
+    assert second.outputs["stamped"] is True
+
+
+def test_snapshots_are_shared_and_lazy():
+    spans: list[TraceSpan] = []
+    _run({"new": {"v": 1}}, {"a": _stamp, "b": _stamp}, spans.append)
+
+    first, second = spans
+    assert second.inputs is first.outputs
+    assert isinstance(first.inputs, ContextSnapshot)
+    assert first.inputs._decoded is False
+    assert json.loads(first.inputs_raw()) == {"new": {"v": 1}}
+    assert first.inputs._decoded is False
+
+
+def test_error_step_records_partial_outputs():
+    spans: list[TraceSpan] = []
+    _run({"new": {}}, {"boom": _boom, "after": _stamp}, spans.append)
+
+    assert len(spans) == 1
+    assert spans[0].error == "RuntimeError: boom"
+    assert spans[0].outputs == {"new": {}, "partial": 1}
+
+
+def test_trace_sink_splices_encoded_snapshots(tmp_path):
+    sink = PipelineTraceSink(str(tmp_path), seg_bytes=1_000_000)
+    _run({"new": {"services": [{"name": "a", "state": "DOWN"}]}}, {"mutate": _mutate_nested}, sink.append)
+    sink.writer.flush_fsync()
+
+    events = [json.loads(payload) for etype, payload in BinaryLogReader(str(tmp_path)).scan()]
+    assert len(events) == 1
+    assert events[0]["step"] == "mutate"
+    assert events[0]["inputs"]["new"]["services"][0]["state"] == "DOWN"
+    assert events[0]["outputs"]["new"]["status"] == "ALIVE"
+
+
+def test_non_json_value_from_the_last_step_is_recorded_live():
+    marker = object()
+    spans: list[TraceSpan] = []
+
+    out = _run({"new": {}}, {"stamp": _stamp, "attach": lambda ctx: {**ctx, "handle": marker}}, spans.append)
+
+    assert out["handle"] is marker
+    assert spans[-1].outputs["handle"] is marker
+    # as before, a following step still needs a JSON copy of its inputs
+    with pytest.raises(TypeError):
+        _run({"new": {}}, {"attach": lambda ctx: {**ctx, "handle": marker}, "stamp": _stamp}, spans.append)
+
+
+def test_trace_sink_writes_strict_json_for_nan(tmp_path):
+    sink = PipelineTraceSink(str(tmp_path), seg_bytes=1_000_000)
+    spans: list[TraceSpan] = []
+
+    def _nan(ctx):
+        ctx["ratio"] = float("nan")
+        return ctx
+
+    _run({"new": {}}, {"nan": _nan}, lambda span: (spans.append(span), sink.append(span)))
+    sink.writer.flush_fsync()
+
+    assert math.isnan(spans[0].outputs["ratio"])
+    assert spans[0].outputs_raw() is None
+    payloads = [payload for _, payload in BinaryLogReader(str(tmp_path)).scan()]
+    event = json.loads(payloads[0], parse_constant=lambda token: pytest.fail(f"non-standard JSON: {token}"))
+    assert event["outputs"] == {"new": {}, "ratio": None}
+
+
+def test_trace_span_is_a_dataclass():
+    spans: list[TraceSpan] = []
+    _run({"new": {"v": 1}}, {"a": _stamp}, spans.append)
+
+    span = spans[0]
+    assert dataclasses.asdict(span)["inputs"] == {"new": {"v": 1}}
+    assert type(dataclasses.asdict(span)["outputs"]) is dict
+    renamed = dataclasses.replace(span, step="renamed")
+    assert renamed.step == "renamed" and renamed.outputs == {"new": {"v": 1}, "stamped": True}
+    assert not hasattr(span, "__dict__")
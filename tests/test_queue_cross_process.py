@@ -78,3 +78,55 @@ def test_visibility_timeout_across_processes(tmp_path: Path) -> None:
     assert leases, "expected task to become visible again"
     queue2.ack(leases[0].offset, leases[0].token)
     queue2.close()
+
+
+def _lease_and_ack(dir_path: str, rounds: int, results) -> None:  # noqa: ANN001 - multiprocessing queue
+    queue = FileWorkQueue(dir_path)
+    leased = []
+    for _ in range(rounds):
+        queue.refresh()
+        for lease in queue.lease(2, 60_000):
+            leased.append(lease.offset)
+            queue.ack(lease.offset, lease.token)
+        time.sleep(0.005)
+    queue.close()
+    results.put(leased)
+
+
+def test_concurrent_consumers_lease_each_task_once(tmp_path: Path) -> None:
+    queue_dir = tmp_path / "queue"
+    queue_dir.mkdir()
+    producer = FileWorkQueue(str(queue_dir))
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_lease_and_ack, args=(str(queue_dir), 200, results)) for _ in range(2)]
+    for proc in workers:
+        proc.start()
+    # enqueue while both consumers are tailing the same segment
+    for idx in range(40):
+        producer.put({"input": {"idx": idx}})
+        time.sleep(0.005)
+    leased = [offset for _ in workers for offset in results.get(timeout=30)]
+    for proc in workers:
+        proc.join(timeout=10)
+        assert proc.exitcode == 0
+    assert sorted(leased) == list(range(40))
+    producer.refresh()
+    assert producer.pending_count() == 0
+    producer.close()
+
+
+def test_renewed_lease_is_not_taken_over(tmp_path: Path) -> None:
+    first = FileWorkQueue(str(tmp_path))
+    second = FileWorkQueue(str(tmp_path))
+    first.put({"input": {"idx": 1}})
+    second.refresh()
+    (task,) = first.lease(1, 50)
+    assert second.lease(1, 50) == []
+    assert first.extend_lease(task.offset, task.token, 60_000) is not None
+    time.sleep(0.1)
+    assert second.lease(1, 50) == []  # the claim moved with the renewal
+    first.nack(task.offset, task.token)
+    assert [lease.offset for lease in second.lease(1, 50)] == [task.offset]
+    first.close()
+    second.close()
@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import pytest
@@ -117,3 +118,84 @@ def test_registry_rejects_non_accepted(tmp_path: Path):
 
     with pytest.raises(ValueError):
         registry.add(artifact, path)
+
+
+def test_registry_index_tails_appends_and_rebuilds_on_rewrite(tmp_path: Path, monkeypatch):
+    plan, plan_path = _create_and_verify(tmp_path, _base_plan_artifact(), "plan.yaml")
+    intent, intent_path = _create_and_verify(tmp_path, _base_intent_artifact(), "intent.yaml")
+    storage = RegistryStorage(tmp_path / "registry.jsonl")
+    registry = ArtifactRegistry(storage=storage)
+    plan_entry = registry.add(plan, plan_path)
+    assert registry.list_all() == [plan_entry]
+
+    offsets: list[int] = []
+    original = storage.read_records_from
+
+    def _tracking(offset: int):
+        offsets.append(offset)
+        return original(offset)
+
+    monkeypatch.setattr(storage, "read_records_from", _tracking)
+
+    assert registry.get_by_artifact_id(plan_entry.artifact_id) == plan_entry
+    assert offsets == []  # unchanged file: served from the index
+
+    # an append from another writer is picked up by tail-reading
+    other = ArtifactRegistry(storage=RegistryStorage(storage.path))
+    intent_entry = other.add(intent, intent_path)
+    assert registry.list_by_intent_id("TM-INT-0001") == [intent_entry]
+    assert offsets and offsets[-1] > 0
+
+    # a rewrite that drops records forces a rebuild
+    lines = storage.path.read_text(encoding="utf-8").splitlines(keepends=True)
+    replacement = storage.path.with_suffix(".tmp")
+    replacement.write_text(lines[1], encoding="utf-8")
+    replacement.replace(storage.path)
+    assert registry.get_by_artifact_id(plan_entry.artifact_id) is None
+    assert registry.list_all() == [intent_entry]
+
+
+def test_registry_index_detects_growing_in_place_rewrite(tmp_path: Path):
+    plan, plan_path = _create_and_verify(tmp_path, _base_plan_artifact(), "plan.yaml")
+    intent, intent_path = _create_and_verify(tmp_path, _base_intent_artifact(), "intent.yaml")
+    storage = RegistryStorage(tmp_path / "registry.jsonl")
+    registry = ArtifactRegistry(storage=storage)
+    plan_entry = registry.add(plan, plan_path)
+    assert registry.list_all() == [plan_entry]
+
+    # same inode, larger file, but the indexed line itself was replaced
+    intent_line = ArtifactRegistry(storage=RegistryStorage(tmp_path / "scratch.jsonl")).add(intent, intent_path)
+    size = storage.path.stat().st_size
+    with storage.path.open("r+", encoding="utf-8") as handle:
+        handle.write(json.dumps(intent_line.to_dict()) + "\n")
+    assert storage.path.stat().st_size > size
+    assert registry.get_by_artifact_id(plan_entry.artifact_id) is None
+    assert [entry.artifact_id for entry in registry.list_all()] == [intent_line.artifact_id]
+
+
+def test_registry_indexes_final_line_without_newline(tmp_path: Path):
+    plan, plan_path = _create_and_verify(tmp_path, _base_plan_artifact(), "plan.yaml")
+    storage = RegistryStorage(tmp_path / "registry.jsonl")
+    entry = ArtifactRegistry(storage=storage).add(plan, plan_path)
+    storage.path.write_text(storage.path.read_text(encoding="utf-8").rstrip("\n"), encoding="utf-8")
+
+    registry = ArtifactRegistry(storage=storage)
+    assert registry.list_all() == [entry]
+    with storage.path.open("a", encoding="utf-8") as handle:
+        handle.write("\n")
+    assert registry.list_all() == [entry]
+
+
+def test_registry_lookups_return_copies(tmp_path: Path):
+    plan, plan_path = _create_and_verify(tmp_path, _base_plan_artifact(), "plan.yaml")
+    registry = ArtifactRegistry(storage=RegistryStorage(tmp_path / "registry.jsonl"))
+    entry = registry.add(plan, plan_path)
+
+    fetched = registry.get_by_artifact_id(entry.artifact_id)
+    assert fetched is not None
+    fetched.path = "elsewhere.yaml"
+    fetched.meta["tampered"] = True  # type: ignore[index]
+    registry.list_all()[0].status = None  # type: ignore[assignment]
+
+    assert registry.get_by_artifact_id(entry.artifact_id) == entry
+    assert registry.list_by_type(ArtifactType.PLAN) == [entry]
@@ -3,6 +3,8 @@ from __future__ import annotations
 import time
 from pathlib import Path
 
+import pytest
+
 from tm.runtime.dlq import DeadLetterStore
 from tm.runtime.idempotency import IdempotencyResult, IdempotencyStore
 from tm.runtime.queue.memory import InMemoryWorkQueue
@@ -137,3 +139,67 @@ def test_task_queue_metrics(tmp_path: Path):
     assert _counter_has("tm_dlq_total", {"flow": flow, "reason": "forced"})
     assert _gauge_value("tm_queue_depth") == 0
     assert _gauge_value("tm_queue_inflight") == 0
+
+
+def test_enqueue_many_batches_and_dedupes_within_batch(tmp_path: Path):
+    queue = InMemoryWorkQueue()
+    calls = []
+    original = queue.put_many
+
+    def tracking_put_many(tasks):
+        tasks = list(tasks)
+        calls.append(len(tasks))
+        return original(tasks)
+
+    queue.put_many = tracking_put_many  # type: ignore[method-assign]
+    manager = _fresh_manager(queue=queue, store=IdempotencyStore(dir_path=str(tmp_path / "idem")))
+    requests = [
+        queue_manager_module.EnqueueRequest(flow_id="demo", input={"n": 1}, headers={"idempotency_key": "k"}),
+        queue_manager_module.EnqueueRequest(flow_id="demo", input={"n": 2}, headers={"idempotency_key": "k"}),
+        queue_manager_module.EnqueueRequest(flow_id="demo", input={"n": 3}),
+    ]
+    outcomes = manager.enqueue_many(requests)
+    assert [outcome.queued for outcome in outcomes] == [True, False, True]
+    assert calls == [2]
+
+    leases = manager.lease(5, 1000)
+    assert [lease.envelope.input["n"] for lease in leases] == [1, 3]
+    manager.ack_many(leases)
+    assert queue.pending_count() == 0
+    assert _gauge_value("tm_queue_inflight") == 0.0
+
+
+def test_failed_batch_write_releases_idempotency_keys(tmp_path: Path):
+    queue = InMemoryWorkQueue()
+    original = queue.put_many
+    failures = [OSError("disk full")]
+
+    def flaky_put_many(tasks):
+        if failures:
+            raise failures.pop()
+        return original(tasks)
+
+    queue.put_many = flaky_put_many  # type: ignore[method-assign]
+    manager = _fresh_manager(queue=queue, store=IdempotencyStore(dir_path=str(tmp_path / "idem")))
+    requests = [
+        queue_manager_module.EnqueueRequest(flow_id="demo", input={"n": n}, headers={"idempotency_key": f"k{n}"})
+        for n in range(2)
+    ]
+    with pytest.raises(OSError):
+        manager.enqueue_many(requests)
+
+    retried = manager.enqueue(flow_id="demo", input={"n": 0}, headers={"idempotency_key": "k0"})
+    assert retried.queued is True
+    assert [lease.envelope.input["n"] for lease in manager.lease(5, 1000)] == [0]
+
+
+def test_lease_records_queue_wait_per_class(tmp_path: Path):
+    manager = _fresh_manager(store=IdempotencyStore(dir_path=str(tmp_path / "idem")))
+    manager.enqueue(flow_id="batch", input={}, headers={"tenant": "acme", "priority": 2})
+    manager.enqueue(flow_id="interactive", input={})
+    manager.enqueue(flow_id="pager", input={}, headers={"priority": 10**12})
+    assert len(manager.lease(3, lease_ms=1000)) == 3
+
+    samples = counters.metrics.snapshot()["histograms"]["tm_queue_wait_ms"]
+    classes = {dict(labels).get("class"): dict(labels).get("priority") for labels in samples}
+    assert classes == {"acme": "2", "interactive": "0", "pager": "high"}
@@ -11,6 +11,7 @@ import pytest
 from tm.runtime.queue.file import FileWorkQueue
 from tm.triggers.config import load_trigger_config_text
 from tm.triggers.manager import TriggerEvent, TriggerManager
+from tm.triggers.queue import TriggerQueueDispatcher
 from tm.triggers.runner import TriggerRuntime
 
 
@@ -172,3 +173,33 @@ def _free_port() -> int:
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
         sock.bind(("127.0.0.1", 0))
         return sock.getsockname()[1]
+
+
+async def test_trigger_dispatcher_coalesces_bursts(tmp_path) -> None:
+    dispatcher = TriggerQueueDispatcher(
+        queue_dir=str(tmp_path / "queue"),
+        idempotency_dir=str(tmp_path / "idem"),
+        dlq_dir=str(tmp_path / "dlq"),
+    )
+    batches: list[int] = []
+    original = dispatcher._enqueue_batch
+
+    def tracking_batch(events):
+        batches.append(len(events))
+        original(events)
+
+    dispatcher._enqueue_batch = tracking_batch  # type: ignore[method-assign]
+    events = [
+        TriggerEvent(trigger_id="t", kind="cron", flow_id="flows/demo.yaml", payload={"n": n}, headers={})
+        for n in range(20)
+    ]
+    await asyncio.gather(*(dispatcher.handle(event) for event in events))
+    dispatcher.close()
+
+    assert sum(batches) == 20
+    assert len(batches) < 20
+    queue = FileWorkQueue(str(tmp_path / "queue"))
+    try:
+        assert queue.pending_count() == 20
+    finally:
+        queue.close()
@@ -0,0 +1,67 @@
+import random
+
+from tm.pipeline.engine import Plan
+from tm.verify.adapter import TraceMindAdapter
+from tm.verify.ctl import CtlChecker, check_ctl, parse_expr
+from tm.verify.explorer import ExplorationResult
+from tm.verify.state import State
+
+
+def _model(n: int, edges: dict[int, list[int]], marked: set[int]) -> ExplorationResult:
+    states = [
+        State(store={}, pending=("x",) if i in edges else (), done=("goal",) if i in marked else (), events=())
+        for i in range(n)
+    ]
+    return ExplorationResult(states=states, edges=edges, predecessors={}, deadlocks=[], hash_mode="full", max_depth=0)
+
+
+def _reference(op: str, child: set[int], model: ExplorationResult) -> set[int]:
+    everything = set(range(len(model.states)))
+    if op == "EX":
+        return {sid for sid, succs in model.edges.items() if any(nxt in child for nxt in succs)}
+    if op in ("EF", "AG"):
+        target = child if op == "EF" else everything - child
+        sat = set(target)
+        changed = True
+        while changed:
+            changed = False
+            for sid, succs in model.edges.items():
+                if sid not in sat and any(nxt in sat for nxt in succs):
+                    sat.add(sid)
+                    changed = True
+        return sat if op == "EF" else everything - sat
+    target = child if op == "AF" else everything - child
+    sat = set(target)
+    changed = True
+    while changed:
+        changed = False
+        for sid, succs in model.edges.items():
+            if sid not in sat and succs and all(nxt in sat for nxt in succs):
+                sat.add(sid)
+                changed = True
+    return sat if op == "AF" else everything - sat
+
+
+def test_ctl_checker_matches_fixpoint_reference_on_random_graphs():
+    rng = random.Random(11)
+    adapter = TraceMindAdapter.from_plan(Plan(steps={}, rules=[]))
+    for _ in range(25):
+        n = rng.randint(1, 40)
+        edges = {sid: [rng.randrange(n) for _ in range(rng.randint(1, 3))] for sid in range(n) if rng.random() < 0.8}
+        marked = {sid for sid in range(n) if rng.random() < 0.2}
+        model = _model(n, edges, marked)
+        for op in ("EX", "EF", "AF", "EG", "AG"):
+            expected = _reference(op, marked, model)
+            assert check_ctl(parse_expr(f"{op} Done(goal)"), model, adapter) == expected, (op, edges, marked)
+
+
+def test_ctl_checker_memoizes_subformulas():
+    adapter = TraceMindAdapter.from_plan(Plan(steps={}, rules=[]))
+    model = _model(3, {0: [1], 1: [2]}, {2})
+    checker = CtlChecker(model, adapter)
+
+    first = checker.sat(parse_expr("EF Done(goal) AND NOT Pending(x)"))
+    again = checker.sat(parse_expr("EF Done(goal)"))
+    assert checker.sat(parse_expr("EF Done(goal)")) is again
+    assert list(first) == [0, 0, 1]
+    assert checker.states(parse_expr("AG EF Done(goal)")) == {0, 1, 2}
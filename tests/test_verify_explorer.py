@@ -0,0 +1,152 @@
+from tm.pipeline.engine import Plan, Rule, StepSpec
+from tm.verify.adapter import TraceMindAdapter
+from tm.verify import explorer as explorer_mod
+from tm.verify.explorer import Explorer
+from tm.verify.invariants import check_invariants, invariant_monitor
+from tm.verify.state import State, StateHasher, StateTable
+from tm.verify.visited import SqliteVisitedSet
+
+
+def _dummy_fn(ctx):
+    return ctx
+
+
+def _diamond_adapter() -> TraceMindAdapter:
+    steps = {
+        "a": StepSpec(name="a", reads=["start"], writes=["x"], fn=_dummy_fn),
+        "b": StepSpec(name="b", reads=["start"], writes=["y"], fn=_dummy_fn),
+        "c": StepSpec(name="c", reads=["x", "y"], writes=["z"], fn=_dummy_fn),
+    }
+    rules = [
+        Rule(name="on_start", triggers=["start"], steps=["a", "b"]),
+        Rule(name="on_x", triggers=["x"], steps=["c"]),
+    ]
+    plan = Plan(steps=steps, rules=rules)
+    return TraceMindAdapter.from_plan(plan, initial_store={"start": True}, changed_paths=["start"])
+
+
+def test_derived_hash_matches_full_rehash():
+    adapter = _diamond_adapter()
+    for mode in ("full", "store"):
+        hasher = StateHasher(mode)
+        root = adapter.initial_state()
+        frontier = [(root, hasher.parts(root))]
+        while frontier:
+            st, parts = frontier.pop()
+            for _, nxt in adapter.successors(st):
+                derived = hasher.derive(st, parts, nxt)
+                assert derived == hasher.parts(nxt)
+                frontier.append((nxt, derived))
+
+
+def test_hash_dedup_agrees_with_stable_hash():
+    adapter = _diamond_adapter()
+    for mode in ("full", "store"):
+        model = Explorer(adapter).run(max_depth=6, hash_mode=mode)
+        hashes = [st.stable_hash(mode) for st in model.states]
+        assert len(set(hashes)) == len(hashes)
+    assert len(Explorer(adapter).run(max_depth=6, hash_mode="store").states) < len(
+        Explorer(adapter).run(max_depth=6, hash_mode="full").states
+    )
+
+
+def test_state_table_round_trip():
+    table = StateTable()
+    first = State(store={"k": {"nested": [1, 2]}, "flag": True}, pending=("a",), done=(), events=("step:x",))
+    second = State(store={"flag": True}, pending=(), done=("a",), events=("step:x", "step:a"))
+    assert table.append(first) == 0
+    assert table.append(second, prefix_of=0) == 1
+    assert len(table) == 2
+    assert table[0] == first
+    assert table[-1] == second
+    assert list(table) == [first, second]
+
+
+def test_state_table_interns_by_type_and_copies_values():
+    table = StateTable()
+    items = [1]
+    table.append(State(store={"v": items}, pending=(), done=(), events=()))
+    table.append(State(store={"v": (1,)}, pending=(), done=(), events=()))
+    items.append(2)
+
+    assert table[0].store["v"] == [1]
+    assert table[1].store["v"] == (1,)
+    table[0].store["v"].append(3)
+    assert table[0].store["v"] == [1]
+
+
+def test_derive_catches_in_place_mutation():
+    hasher = StateHasher("store")
+    parent = State(store={"k": [1], "flag": True}, pending=(), done=(), events=())
+    parts = hasher.parts(parent)
+
+    shallow = dict(parent.store)
+    shallow["k"].append(2)  # shared with the parent, which was hashed before the change
+    child = State(store=shallow, pending=(), done=(), events=())
+    assert hasher.derive(parent, parts, child) == StateHasher("store").parts(child)
+
+    same_store = State(store=child.store, pending=(), done=(), events=())
+    child_parts = hasher.parts(child)
+    child.store["flag"] = False  # type: ignore[index]
+    assert hasher.derive(child, child_parts, same_store) == StateHasher("store").parts(same_store)
+
+    # terms recorded by a different hasher are unknown, so the child is hashed in full
+    fresh = StateHasher("store")
+    assert fresh.derive(parent, parts, child) == fresh.parts(child)
+
+
+def test_disk_backed_visited_set_matches_memory(tmp_path):
+    adapter = _diamond_adapter()
+    in_memory = Explorer(adapter).run(max_depth=6)
+    on_disk = Explorer(adapter).run(max_depth=6, visited_path=tmp_path / "visited.sqlite")
+    assert list(on_disk.states) == list(in_memory.states)
+    assert on_disk.edges == in_memory.edges
+    assert on_disk.deadlocks == in_memory.deadlocks
+
+
+def test_sqlite_visited_set_spills_batches(tmp_path):
+    visited = SqliteVisitedSet(tmp_path / "v.sqlite", batch_size=2)
+    for sid in range(5):
+        visited.add((1 << 127) + sid, sid)
+    assert len(visited) == 5
+    assert [visited.get((1 << 127) + sid) for sid in range(5)] == list(range(5))
+    assert visited.get(7) is None
+    visited.close()
+
+
+def _wide_adapter(width: int) -> TraceMindAdapter:
+    steps = {
+        f"s{i}": StepSpec(name=f"s{i}", reads=["start"], writes=[f"k{i}"], fn=lambda ctx: ctx) for i in range(width)
+    }
+    rules = [Rule(name="on_start", triggers=["start"], steps=list(steps))]
+    return TraceMindAdapter.from_plan(
+        Plan(steps=steps, rules=rules), initial_store={"start": True}, changed_paths=["start"]
+    )
+
+
+def test_parallel_exploration_matches_sequential(monkeypatch):
+    monkeypatch.setattr(explorer_mod, "_PARALLEL_MIN_FRONTIER", 0)
+    adapter = _wide_adapter(4)
+    seen = []
+    sequential = Explorer(adapter).run(max_depth=4)
+    parallel = Explorer(adapter).run(max_depth=4, workers=2, progress=seen.append)
+    assert list(parallel.states) == list(sequential.states)
+    assert parallel.edges == sequential.edges
+    assert parallel.predecessors == sequential.predecessors
+    assert parallel.deadlocks == sequential.deadlocks
+    assert [p.depth for p in seen] == [1, 2, 3, 4, 5]
+    assert seen[-1].states == len(sequential.states)
+
+
+def test_state_budget_and_fail_fast_stop_exploration():
+    adapter = _wide_adapter(4)
+    budgeted = Explorer(adapter).run(max_depth=4, max_states=5)
+    assert budgeted.stopped == "budget"
+    assert len(budgeted.states) == 5
+
+    monitor = invariant_monitor(["NOT Has(k2)"], adapter)
+    stopped = Explorer(adapter).run(max_depth=4, stop_on=monitor)
+    assert stopped.stopped == "violation"
+    assert "k2" in stopped.states[-1].store
+    report = check_invariants(["NOT Has(k2)"], stopped, adapter)
+    assert report[0].violated_at == len(stopped.states) - 1
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import os
+import select
+import threading
+import time
 from pathlib import Path
 
 from tm.runtime.queue.memory import InMemoryWorkQueue
 from tm.runtime.queue.file import FileWorkQueue
+from tm.runtime.queue.notify import QueueNotifier
+from tm.runtime.queue.scheduling import FairReadyQueue
+from tm.runtime.queue.partitioned import PartitionedWorkQueue, open_file_queue, partition_dirs
+from tm.runtime.queue.shm import SharedMemoryWorkQueue
+from tm.runtime.queue.stats import read_queue_stats
 
 
 class _FakeClock:
@@ -110,3 +119,435 @@ def test_file_queue_compacts_segments(tmp_path: Path):
     # Remaining segment should still be present with outstanding items
     remaining_logs = sorted(queue_dir.glob("segment-*.log"))
     assert remaining_logs
+
+
+def test_file_queue_replays_ack_journal_without_checkpoint(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    queue = FileWorkQueue(str(queue_dir), ack_checkpoint_records=3)
+    for n in range(6):
+        queue.put({"value": n})
+    leased = queue.lease(4, lease_ms=1000)
+    for task in leased[:2]:
+        queue.ack(task.offset, task.token)
+    # below the checkpoint threshold acks only live in the journal
+    assert not list(queue_dir.glob("segment-*.idx"))
+    journal = next(queue_dir.glob("segment-*.ack"))
+    assert journal.stat().st_size == 16
+
+    queue.ack(leased[2].offset, leased[2].token)
+    assert next(queue_dir.glob("segment-*.idx")).exists()
+    assert journal.stat().st_size == 0
+
+    queue.ack(leased[3].offset, leased[3].token)
+    # simulate a crash: no close(), plus a torn trailing record
+    with open(journal, "ab") as fh:
+        fh.write(b"\x00\x00\x00")
+
+    reopened = FileWorkQueue(str(queue_dir), ack_checkpoint_records=3)
+    assert journal.stat().st_size == 8
+    assert [task.offset for task in reopened.lease(10, lease_ms=1000)] == [4, 5]
+    reopened.close()
+
+
+def test_file_queue_group_commits_concurrent_acks(tmp_path: Path, monkeypatch):
+    queue = FileWorkQueue(str(tmp_path / "queue"))
+    for n in range(16):
+        queue.put({"value": n})
+    leased = queue.lease(16, lease_ms=10_000)
+
+    real_fsync = os.fsync
+    calls = []
+
+    def slow_fsync(fd):
+        calls.append(fd)
+        time.sleep(0.02)
+        real_fsync(fd)
+
+    monkeypatch.setattr("tm.runtime.queue.file.os.fsync", slow_fsync)
+    threads = [threading.Thread(target=queue.ack, args=(task.offset, task.token)) for task in leased]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert queue.pending_count() == 0
+    assert 1 <= len(calls) < len(leased)
+    queue.close()
+
+
+def test_put_many_and_ack_many_match_single_calls(tmp_path: Path, monkeypatch):
+    fsyncs = []
+    real_fsync = os.fsync
+
+    def counting_fsync(fd):
+        fsyncs.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr("tm.runtime.queue.file.os.fsync", counting_fsync)
+    queue_dir = tmp_path / "queue"
+    file_queue = FileWorkQueue(str(queue_dir), fsync_on_put=True)
+    for queue in (InMemoryWorkQueue(), file_queue):
+        assert queue.put({"value": "first"}) == 0
+        assert queue.put_many([{"value": n} for n in range(5)]) == [1, 2, 3, 4, 5]
+        leased = queue.lease(6, lease_ms=1000)
+        assert [task.task["value"] for task in leased] == ["first", 0, 1, 2, 3, 4]
+        queue.ack_many([(task.offset, task.token) for task in leased[:4]])
+        assert queue.pending_count() == 2
+    # one fsync for the single put, one for the batch, one for the batched acks
+    assert len(fsyncs) == 3
+    file_queue.close()
+
+    reopened = FileWorkQueue(str(queue_dir))
+    assert [task.offset for task in reopened.lease(10, lease_ms=1000)] == [4, 5]
+    assert reopened.put({"value": "next"}) == 6
+    reopened.close()
+
+
+def test_put_many_rotates_segments_mid_batch(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    queue = FileWorkQueue(str(queue_dir), segment_max_bytes=1024)
+    offsets = queue.put_many([{"payload": "x" * 200, "i": i} for i in range(12)])
+    assert offsets == list(range(12))
+    assert len(list(queue_dir.glob("segment-*.log"))) >= 3
+    queue.close()
+
+    reopened = FileWorkQueue(str(queue_dir), segment_max_bytes=1024)
+    assert [task.task["i"] for task in reopened.lease(20, lease_ms=1000)] == list(range(12))
+    reopened.close()
+
+
+def test_file_queue_refresh_sees_other_instances(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    consumer = FileWorkQueue(str(queue_dir))
+    producer = FileWorkQueue(str(queue_dir), segment_max_bytes=1024)
+    assert consumer.lease(1, lease_ms=1000) == []
+
+    offsets = producer.put_many([{"payload": "x" * 300, "i": i} for i in range(6)])
+    consumer.refresh()
+    assert consumer.pending_count() == 6
+
+    # acks journaled by another instance retire the entries here too
+    leased = producer.lease(2, lease_ms=1000)
+    producer.ack_many([(task.offset, task.token) for task in leased])
+    consumer.refresh()
+    assert sorted(task.offset for task in consumer.lease(10, lease_ms=1000)) == offsets[2:]
+    producer.close()
+    consumer.close()
+
+
+def test_queue_notifier_wakes_listener(tmp_path: Path):
+    notifier = QueueNotifier(str(tmp_path))
+    notifier.notify()  # no listener yet: silently ignored
+    listener = notifier.listen()
+    if listener is None:  # pragma: no cover - platforms without named pipes
+        return
+    try:
+        assert select.select([listener], [], [], 0)[0] == []
+        queue = FileWorkQueue(str(tmp_path))
+        queue.put({"value": 1})
+        assert select.select([listener], [], [], 1.0)[0] == [listener]
+        listener.drain()
+        assert select.select([listener], [], [], 0)[0] == []
+        queue.close()
+    finally:
+        listener.close()
+
+
+def test_shared_memory_queue_shares_state_and_recovers(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    producer = SharedMemoryWorkQueue(str(queue_dir), capacity=8, data_bytes=256)
+    consumer = SharedMemoryWorkQueue(str(queue_dir))
+    try:
+        assert producer.put_many([{"i": i} for i in range(5)]) == [0, 1, 2, 3, 4]
+        assert consumer.pending_count() == 5
+
+        leased = consumer.lease(3, lease_ms=60_000)
+        assert [task.task["i"] for task in leased] == [0, 1, 2]
+        assert [task.offset for task in producer.lease(10, lease_ms=60_000)] == [3, 4]
+        producer.ack(leased[0].offset, "lease-999")  # stale token is ignored
+        consumer.ack_many([(task.offset, task.token) for task in leased[:2]])
+        assert producer.pending_count() == 3
+
+        # the slot ring wraps once the head advances
+        assert producer.put_many([{"i": i} for i in range(5, 10)]) == [5, 6, 7, 8, 9]
+        try:
+            producer.put({"i": 10})
+        except RuntimeError:
+            pass
+        else:  # pragma: no cover - assertion helper
+            raise AssertionError("expected a full queue")
+    finally:
+        producer.close()
+        consumer.unlink()
+        consumer.close()
+
+    # the segment is gone; unacked tasks come back from the durability log with fresh offsets
+    reopened = SharedMemoryWorkQueue(str(queue_dir), capacity=8, data_bytes=256)
+    try:
+        recovered = reopened.lease(10, lease_ms=60_000)
+        assert [task.task["i"] for task in recovered] == [2, 3, 4, 5, 6, 7, 8, 9]
+        assert recovered[0].offset == 10
+    finally:
+        reopened.unlink()
+        reopened.close()
+
+
+def test_shared_memory_queue_reuses_space_behind_a_stuck_task(tmp_path: Path):
+    queue = SharedMemoryWorkQueue(str(tmp_path / "queue"), capacity=4, data_bytes=200, log_compact_bytes=1)
+    try:
+        queue.put({"i": "slow"})
+        (slow,) = queue.lease(1, lease_ms=60_000)
+        # the long lease pins the oldest slot and payload; later tasks keep cycling through the rest
+        for round_ in range(20):
+            offsets = queue.put_many([{"i": round_, "pad": "x" * 20}, {"i": round_}, {"i": round_}])
+            leased = queue.lease(3, lease_ms=60_000)
+            assert [task.offset for task in leased] == offsets
+            queue.ack_many([(task.offset, task.token) for task in leased[:2]])
+            queue.nack(leased[2].offset, leased[2].token, requeue=False)
+        assert queue.describe() == {"backlog": 1, "pending": 0, "inflight": 1, "oldest_available_at": None}
+        assert queue.extend_lease(slow.offset, slow.token, 60_000) is not None
+        # dropping a task compacts the log down to the one live record
+        assert (tmp_path / "queue" / "shm-queue.log").stat().st_size < 100
+    finally:
+        queue.unlink()
+        queue.close()
+
+
+def test_extend_lease_keeps_task_invisible(tmp_path: Path):
+    shm_queue = SharedMemoryWorkQueue(str(tmp_path / "shm"))
+    try:
+        for queue in (InMemoryWorkQueue(), FileWorkQueue(str(tmp_path / "file")), shm_queue):
+            queue.put({"value": 1})
+            (task,) = queue.lease(1, lease_ms=50)
+            deadline = queue.extend_lease(task.offset, task.token, 60_000)
+            assert deadline is not None and deadline > task.lease_deadline
+            time.sleep(0.1)
+            assert queue.lease(1, lease_ms=50) == []
+            assert queue.extend_lease(task.offset, "lease-other", 60_000) is None
+            queue.ack(task.offset, task.token)
+            assert queue.extend_lease(task.offset, task.token, 60_000) is None
+    finally:
+        shm_queue.unlink()
+        shm_queue.close()
+
+
+def test_file_queue_stats_file_tracks_all_instances(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    producer = FileWorkQueue(str(queue_dir))
+    producer.put_many([{"i": i} for i in range(5)])
+    consumer = FileWorkQueue(str(queue_dir))
+    stats = read_queue_stats(str(queue_dir))
+    assert stats is not None and (stats.backlog, stats.inflight) == (5, 0)
+    assert stats.oldest_available_at is not None and stats.oldest_available_at <= time.time()
+
+    leased = consumer.lease(3, lease_ms=60_000)
+    consumer.ack(leased[0].offset, leased[0].token)
+    consumer.nack(leased[1].offset, leased[1].token, requeue=False)
+    stats = read_queue_stats(str(queue_dir))
+    assert stats is not None and (stats.backlog, stats.inflight, stats.pending) == (3, 1, 2)
+
+    consumer.close()  # its remaining lease is abandoned
+    stats = read_queue_stats(str(queue_dir))
+    assert stats is not None and (stats.backlog, stats.inflight) == (3, 0)
+    producer.close()
+
+
+def test_file_queue_full_load_reconciles_stats(tmp_path: Path):
+    queue_dir = str(tmp_path / "queue")
+    producer = FileWorkQueue(queue_dir)
+    producer.put_many([{"i": i} for i in range(3)])
+    crashed = FileWorkQueue(queue_dir)
+    crashed.lease(2, lease_ms=300)
+    crashed._stats.close()  # dies without releasing its leases
+    stats = read_queue_stats(queue_dir)
+    assert stats is not None and stats.inflight == 2
+
+    # while its claims are live they still count as inflight, and only the free task is waiting
+    restarted = FileWorkQueue(queue_dir)
+    stats = read_queue_stats(queue_dir)
+    assert stats is not None and (stats.backlog, stats.inflight) == (3, 2)
+    assert [task.task["i"] for task in restarted.lease(3, lease_ms=1000)] == [2]
+    restarted.close()
+
+    time.sleep(0.4)
+    FileWorkQueue(queue_dir).close()  # the lapsed leases are reconciled by the next full load
+    stats = read_queue_stats(queue_dir)
+    assert stats is not None and (stats.backlog, stats.inflight) == (3, 0)
+    assert stats.oldest_available_at is not None
+    producer.close()
+
+
+def test_binary_segments_recover_and_truncate_torn_tail(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    queue = FileWorkQueue(str(queue_dir), segment_format="binary")
+    assert queue.put_many([{"i": i, "scheduled_at": 0} for i in range(4)]) == [0, 1, 2, 3]
+    (first,) = queue.lease(1, lease_ms=1000)
+    queue.ack(first.offset, first.token)
+    queue.close()
+    (segment,) = queue_dir.glob("segment-*.bin")
+    assert not list(queue_dir.glob("segment-*.log"))
+    intact = segment.stat().st_size
+    with segment.open("ab") as fh:
+        fh.write(b"TMG1\x01\x7f partial")  # a frame cut short by a crash
+
+    reopened = FileWorkQueue(str(queue_dir), segment_format="binary")
+    assert segment.stat().st_size == intact
+    # payloads stay undecoded until leased
+    assert all(entry.task is None for entry in reopened._entries.values())  # type: ignore[attr-defined]
+    assert reopened.put({"i": 4}) == 4
+    assert [task.task["i"] for task in reopened.lease(10, lease_ms=1000)] == [1, 2, 3, 4]
+    reopened.close()
+
+
+def test_binary_segments_are_tailed_by_other_instances(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    consumer = FileWorkQueue(str(queue_dir), segment_format="binary")
+    producer = FileWorkQueue(str(queue_dir), segment_format="binary")
+    producer.put_many([{"i": i} for i in range(3)])
+    consumer.refresh()
+    assert [task.task["i"] for task in consumer.lease(10, lease_ms=1000)] == [0, 1, 2]
+    producer.close()
+    consumer.close()
+
+
+def test_migrate_jsonl_segments_to_binary(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    legacy = FileWorkQueue(str(queue_dir), segment_max_bytes=1024)
+    legacy.put_many([{"payload": "x" * 200, "i": i} for i in range(8)])
+    leased = legacy.lease(3, lease_ms=1000)
+    legacy.ack_many([(task.offset, task.token) for task in leased])
+    legacy.close()
+
+    legacy_segments = len(list(queue_dir.glob("segment-*.log")))
+    assert legacy_segments >= 2
+
+    queue = FileWorkQueue(str(queue_dir), segment_format="binary")
+    assert queue.migrate_segments() == legacy_segments
+    assert not list(queue_dir.glob("segment-*.log"))
+    queue.close()
+
+    reopened = FileWorkQueue(str(queue_dir))
+    assert [task.task["i"] for task in reopened.lease(10, lease_ms=1000)] == [3, 4, 5, 6, 7]
+    reopened.close()
+
+
+def test_partitioned_queue_routes_by_flow_and_keeps_order(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    queue = PartitionedWorkQueue(str(queue_dir), partitions=4)
+    tasks = [{"flow_id": f"flow-{i % 5}", "seq": i} for i in range(40)]
+    offsets = queue.put_many(tasks)
+    assert len(set(offsets)) == 40
+    assert queue.pending_count() == 40
+    for task, offset in zip(tasks, offsets):
+        assert offset % 4 == queue.partition_for(task)
+
+    leased = queue.lease(40, lease_ms=1000)
+    assert len(leased) == 40
+    by_flow: dict[str, list[int]] = {}
+    for task in leased:
+        by_flow.setdefault(task.task["flow_id"], []).append(task.task["seq"])
+    assert all(seqs == sorted(seqs) for seqs in by_flow.values())
+
+    queue.ack_many([(task.offset, task.token) for task in leased[:30]])
+    queue.nack(leased[30].offset, leased[30].token)
+    assert queue.extend_lease(leased[31].offset, leased[31].token, 1000) is not None
+    assert queue.describe()["inflight"] == 9
+    queue.close()
+
+    reopened = open_file_queue(str(queue_dir))
+    assert isinstance(reopened, PartitionedWorkQueue) and reopened.partitions == 4
+    assert reopened.pending_count() == 10
+    assert len(partition_dirs(str(queue_dir)) or []) == 4
+    reopened.close()
+
+
+def test_partitioned_queue_prefers_owned_partitions_and_steals(tmp_path: Path):
+    queue_dir = str(tmp_path / "queue")
+    producer = PartitionedWorkQueue(queue_dir, partitions=2)
+    hot = next(f"flow-{i}" for i in range(100) if producer.partition_for({"flow_id": f"flow-{i}"}) == 1)
+    cold = next(f"flow-{i}" for i in range(100) if producer.partition_for({"flow_id": f"flow-{i}"}) == 0)
+    producer.put_many([{"flow_id": hot, "seq": i} for i in range(3)] + [{"flow_id": cold, "seq": 0}])
+
+    owner = PartitionedWorkQueue(queue_dir, owned=[0], steal=False)
+    thief = PartitionedWorkQueue(queue_dir, owned=[0])
+    first = owner.lease(4, lease_ms=1000)
+    assert [task.task["flow_id"] for task in first] == [cold]
+    assert owner.lease(4, lease_ms=1000) == []
+    # partition 0 is claimed by the owner, so the thief only takes the unclaimed hot partition
+    stolen = thief.lease(4, lease_ms=1000)
+    assert [task.task["seq"] for task in stolen] == [0, 1, 2]
+    thief.ack_many([(task.offset, task.token) for task in stolen])
+    assert thief.lease(4, lease_ms=1000) == []
+
+    owner.close()  # its unacked task is redelivered to whoever claims the partition next
+    assert [task.task["flow_id"] for task in thief.lease(4, lease_ms=1000)] == [cold]
+
+    assert PartitionedWorkQueue.owned_partitions(4, 1, 2) == [1, 3]
+    assert PartitionedWorkQueue.owned_partitions(2, 3, 4) == [1]
+
+
+def test_partitioned_queue_hands_a_stolen_partition_back_to_its_owner(tmp_path: Path):
+    queue_dir = str(tmp_path / "queue")
+    producer = PartitionedWorkQueue(queue_dir, partitions=2)
+    hot = next(f"flow-{i}" for i in range(100) if producer.partition_for({"flow_id": f"flow-{i}"}) == 1)
+    producer.put_many([{"flow_id": hot, "seq": i} for i in range(4)])
+
+    thief = PartitionedWorkQueue(queue_dir, owned=[0])
+    stolen = thief.lease(1, lease_ms=1000)
+    assert [task.task["seq"] for task in stolen] == [0]
+
+    # the owner finds its partition taken and asks for it back
+    owner = PartitionedWorkQueue(queue_dir, owned=[1], steal=False)
+    assert owner.lease(4, lease_ms=1000) == []
+    # the thief stops leasing from it but keeps the claim until its lease settles
+    assert thief.lease(4, lease_ms=1000) == []
+    assert owner.lease(4, lease_ms=1000) == []
+
+    thief.ack_many([(task.offset, task.token) for task in stolen])
+    assert thief.lease(4, lease_ms=1000) == []
+    assert [task.task["seq"] for task in owner.lease(4, lease_ms=1000)] == [1, 2, 3]
+    try:
+        PartitionedWorkQueue(queue_dir, partitions=3)
+    except ValueError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("reopening with a different partition count must fail")
+    for queue in (producer, thief):
+        queue.close()
+
+
+def test_fair_ready_queue_orders_by_priority_then_weighted_share():
+    ready = FairReadyQueue({"interactive": 3.0})
+    for offset in range(8):
+        ready.push(offset, 0.0, "backfill", 0)
+    for offset in range(8, 12):
+        ready.push(offset, 0.0, "interactive", 0)
+    ready.push(12, 0.0, "backfill", 5)
+    ready.push(13, 5.0, "interactive", 9)  # not due yet
+
+    order = []
+    while (item := ready.pop(1.0, lambda offset: offset != 3)) is not None:
+        order.append(item[0])
+    # priority first (using up a backfill turn), then three interactive turns per backfill turn;
+    # offset 3 was acked meanwhile
+    assert order == [12, 8, 9, 10, 0, 11, 1, 2, 4, 5, 6, 7]
+    assert ready.oldest(lambda offset: True) == 5.0
+    assert ready.pop(5.0, lambda offset: True) == (13, 5.0)
+
+
+def test_file_queue_flood_does_not_starve_other_flows(tmp_path: Path):
+    queue_dir = str(tmp_path / "queue")
+    queue = FileWorkQueue(queue_dir, segment_format="binary")
+    queue.put_many([{"flow_id": "backfill", "seq": i} for i in range(200)])
+    queue.put_many([{"flow_id": "ui", "seq": i, "headers": {"tenant": "web"}} for i in range(2)])
+    first = [task.task["flow_id"] for task in queue.lease(4, lease_ms=1000)]
+    assert first.count("ui") == 2
+    queue.close()
+
+    # class and priority come back from the binary frame head without decoding the task
+    reopened = FileWorkQueue(queue_dir, share_weights={"web": 2.0})
+    reopened.put({"flow_id": "urgent", "headers": {"priority": 1}})
+    reopened.put({"flow_id": "page", "headers": {"priority": 2**40}})  # clamped to the frame's int32
+    leased = reopened.lease(4, lease_ms=1000)
+    assert [task.task["flow_id"] for task in leased] == ["page", "urgent", "backfill", "ui"]
+    reopened.close()
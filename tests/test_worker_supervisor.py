@@ -1,18 +1,22 @@
 from __future__ import annotations
 
 import json
+import multiprocessing as mp
 import os
+import threading
 import time
 from pathlib import Path
 
 import pytest
 
 from tm.runtime.idempotency import IdempotencyStore
-from tm.runtime.queue import FileWorkQueue
+from tm.runtime.queue import FileWorkQueue, PartitionedWorkQueue, SharedMemoryWorkQueue, WorkQueue
 from tm.runtime.queue.manager import TaskQueueManager
-from tm.runtime.workers import TaskWorkerSupervisor, WorkerOptions
+from tm.runtime.queue.stats import read_queue_stats
+from tm.runtime.workers import TaskWorkerSupervisor, WorkerOptions, _TaskMetrics, _worker_entry
 from tm.obs import counters
 from tm.obs.counters import _reset_for_tests
+from tm.obs.shared import merge_spools, spool_names
 
 
 def _gauge_value(name: str) -> float:
@@ -70,6 +74,7 @@ jitter_ms = 0
         heartbeat_timeout=1.0,
         result_ttl=60.0,
         config_path=str(config_path),
+        metrics_dir=str(tmp_path / "metrics"),
     )
 
     supervisor = TaskWorkerSupervisor(opts)
@@ -96,6 +101,12 @@ jitter_ms = 0
         supervisor.drain(grace_period=1.0)
         supervisor.stop()
 
+    # the workers' latency histograms outlive them in the metrics spool
+    fleet = merge_spools(str(tmp_path / "metrics"))
+    processed_count = sum(count for _, count in fleet.get_histogram("tm_task_processing_ms").totals().values())
+    assert processed_count >= 5
+    assert spool_names(str(tmp_path / "metrics")) == []
+
     # verify idempotency cache now serves duplicates without enqueueing
     queue2 = FileWorkQueue(str(queue_dir))
     store2 = IdempotencyStore(dir_path=str(idem_dir))
@@ -109,3 +120,160 @@ jitter_ms = 0
     assert duplicate.cached_result is not None
     queue2.close()
     os.environ.pop("TRACE_MIND_WORKER_RESULT_FILE", None)
+
+
+def test_task_metrics_bind_histogram_children_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    _reset_for_tests()
+    bound: list[dict[str, object]] = []
+    original = counters.Histogram.labels
+
+    def _labels(self, labels=None, **kwargs):
+        bound.append(kwargs)
+        return original(self, labels, **kwargs)
+
+    monkeypatch.setattr(counters.Histogram, "labels", _labels)
+    task_metrics = _TaskMetrics()
+    for _ in range(3):
+        task_metrics.observe("demo.flow", "ok", 12.0, 40.0)
+    assert len(bound) == 2  # one child per histogram
+    task_metrics.observe("demo.flow", "error", 1.0, 2.0)
+    assert len(bound) == 4
+    totals = counters.metrics.get_histogram("tm_task_processing_ms").totals()
+    assert totals[(("flow", "demo.flow"), ("status", "ok"))] == (36.0, 3)
+
+    _reset_for_tests()  # a swapped registry gets fresh children
+    task_metrics.observe("demo.flow", "ok", 5.0, 6.0)
+    assert counters.metrics.get_histogram("tm_end_to_end_ms").totals() == {
+        (("flow", "demo.flow"), ("status", "ok")): (6.0, 1)
+    }
+    _reset_for_tests()
+
+
+def test_worker_processes_leases_concurrently(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    queue_dir = tmp_path / "queue"
+    idem_dir = tmp_path / "idem"
+    dlq_dir = tmp_path / "dlq"
+    queue = FileWorkQueue(str(queue_dir))
+    manager = TaskQueueManager(queue, IdempotencyStore(dir_path=str(idem_dir)))
+    for idx in range(8):
+        manager.enqueue(flow_id="demo.flow", input={"idx": idx})
+    queue.close()
+
+    result_file = tmp_path / "results.log"
+    monkeypatch.setenv("TRACE_MIND_WORKER_RESULT_FILE", str(result_file))
+    opts = WorkerOptions(
+        queue_dir=str(queue_dir),
+        idempotency_dir=str(idem_dir),
+        dlq_dir=str(dlq_dir),
+        runtime_spec="tests.worker_runtime_stub:build_slow_runtime",
+        max_inflight=4,
+        poll_interval=0.05,
+        config_path=str(tmp_path / "missing.toml"),
+    )
+    parent_conn, child_conn = mp.Pipe(duplex=True)
+    worker = threading.Thread(target=_worker_entry, args=(0, opts, child_conn))
+    started = time.monotonic()
+    worker.start()
+    try:
+        records: list = []
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline and len(records) < 8:
+            time.sleep(0.05)
+            if result_file.exists():
+                records = [json.loads(line) for line in result_file.read_text(encoding="utf-8").splitlines() if line]
+        elapsed = time.monotonic() - started
+    finally:
+        parent_conn.send(("shutdown",))
+        worker.join(timeout=5.0)
+    assert sorted(record["inputs"]["idx"] for record in records) == list(range(8))
+    assert max(record["active"] for record in records) == 4
+    assert elapsed < 8 * 0.2
+
+
+@pytest.mark.parametrize("backend", ["file", "shm"])
+def test_worker_renews_lease_while_task_runs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, backend: str) -> None:
+    queue_dir = tmp_path / "queue"
+    idem_dir = tmp_path / "idem"
+    queue: WorkQueue = SharedMemoryWorkQueue(str(queue_dir)) if backend == "shm" else FileWorkQueue(str(queue_dir))
+    TaskQueueManager(queue, IdempotencyStore(dir_path=str(idem_dir))).enqueue(flow_id="demo.flow", input={"sleep": 0.8})
+    result_file = tmp_path / "results.log"
+    monkeypatch.setenv("TRACE_MIND_WORKER_RESULT_FILE", str(result_file))
+    opts = WorkerOptions(
+        queue_backend=backend,
+        queue_dir=str(queue_dir),
+        idempotency_dir=str(idem_dir),
+        dlq_dir=str(tmp_path / "dlq"),
+        runtime_spec="tests.worker_runtime_stub:build_slow_runtime",
+        lease_ms=150,
+        poll_interval=0.05,
+        config_path=str(tmp_path / "missing.toml"),
+    )
+    parent_conn, child_conn = mp.Pipe(duplex=True)
+    worker = threading.Thread(target=_worker_entry, args=(0, opts, child_conn))
+    worker.start()
+    stolen = []
+    try:
+        deadline = time.monotonic() + 3.0
+        # a file queue instance only sees its own leases; the shared stats file sees the worker's
+        while (
+            time.monotonic() < deadline
+            and (queue.describe()["inflight"] if backend == "shm" else read_queue_stats(str(queue_dir)).inflight) == 0
+        ):
+            time.sleep(0.01)
+        # the run outlasts lease_ms several times over, but renewals keep it invisible to other consumers
+        while time.monotonic() < deadline and not result_file.exists():
+            queue.refresh()
+            stolen.extend(queue.lease(1, lease_ms=60_000))
+            time.sleep(0.02)
+    finally:
+        parent_conn.send(("shutdown",))
+        worker.join(timeout=5.0)
+        if isinstance(queue, SharedMemoryWorkQueue):
+            queue.unlink()
+        queue.close()
+    assert result_file.exists()
+    assert stolen == []
+
+
+@pytest.mark.parametrize("backend", ["file", "shm", "partitioned"])
+def test_idle_worker_wakes_on_enqueue(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, backend: str) -> None:
+    queue_dir = tmp_path / "queue"
+    idem_dir = tmp_path / "idem"
+    queue: WorkQueue
+    if backend == "partitioned":
+        queue = PartitionedWorkQueue(str(queue_dir), partitions=4)
+    elif backend == "file":
+        queue = FileWorkQueue(str(queue_dir))
+    else:
+        queue = SharedMemoryWorkQueue(str(queue_dir))
+    result_file = tmp_path / "results.log"
+    monkeypatch.setenv("TRACE_MIND_WORKER_RESULT_FILE", str(result_file))
+    opts = WorkerOptions(
+        queue_backend="shm" if backend == "shm" else "file",
+        queue_dir=str(queue_dir),
+        idempotency_dir=str(idem_dir),
+        dlq_dir=str(tmp_path / "dlq"),
+        runtime_spec="tests.worker_runtime_stub:build_runtime",
+        poll_interval=5.0,
+        heartbeat_interval=5.0,
+        heartbeat_timeout=10.0,
+        config_path=str(tmp_path / "missing.toml"),
+    )
+    parent_conn, child_conn = mp.Pipe(duplex=True)
+    worker = threading.Thread(target=_worker_entry, args=(0, opts, child_conn))
+    worker.start()
+    try:
+        time.sleep(0.3)  # let the worker go idle
+        TaskQueueManager(queue, IdempotencyStore(dir_path=str(idem_dir))).enqueue(flow_id="demo.flow", input={})
+        enqueued = time.monotonic()
+        while time.monotonic() - enqueued < 3.0 and not result_file.exists():
+            time.sleep(0.01)
+        latency = time.monotonic() - enqueued
+    finally:
+        parent_conn.send(("shutdown",))
+        worker.join(timeout=10.0)
+        if isinstance(queue, SharedMemoryWorkQueue):
+            queue.unlink()
+        queue.close()
+    assert result_file.exists()
+    assert latency < 1.0
@@ -30,3 +30,25 @@ class DummyRuntime:
 
 def build_runtime() -> DummyRuntime:
     return DummyRuntime()
+
+
+class SlowRuntime(DummyRuntime):
+    """Runtime whose runs take a while (``inputs["sleep"]`` seconds); records how many overlap."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = 0
+
+    async def run(self, flow_id: str, inputs: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        self.active += 1
+        try:
+            await asyncio.sleep(float((inputs or {}).get("sleep", 0.2)))
+            with self._path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps({"flow_id": flow_id, "inputs": inputs or {}, "active": self.active}) + "\n")
+        finally:
+            self.active -= 1
+        return {"status": "ok", "output": inputs or {}}
+
+
+def build_slow_runtime() -> SlowRuntime:
+    return SlowRuntime()
@@ -12,6 +12,7 @@ from tm.obs.exporters import get_exporter_factory
 from tm.obs.exporters.binlog_exporter import maybe_enable_from_env as maybe_enable_binlog_exporter
 from tm.obs.exporters.file_exporter import maybe_enable_from_env as maybe_enable_file_exporter
 from tm.obs.exporters.prometheus import mount_prometheus
+from tm.obs.shared import FleetMetrics
 from tm.pipeline.engine import Pipeline, Plan
 from tm.pipeline.selectors import match as sel_match
 from tm.pipeline.trace_store import PipelineTraceSink
@@ -120,7 +121,9 @@ requested = (
 _active_exporters: list[Any] = []
 
 if "prometheus" in requested:
-    mount_prometheus(app, counters.metrics)
+    # with workers publishing to a spool directory, scrapes cover the whole fleet
+    spool_dir = os.getenv("TRACE_METRICS_SPOOL_DIR")
+    mount_prometheus(app, FleetMetrics(spool_dir) if spool_dir else counters.metrics)
 if "file" in requested:
     file_exporter = maybe_enable_file_exporter()
     if file_exporter:
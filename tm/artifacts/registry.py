@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import copy
+import threading
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, Union
+from typing import Any, Dict, List, Mapping, Union
 
 from .models import Artifact, ArtifactStatus, ArtifactType
-from .storage import RegistryStorage
+from .storage import RegistryStorage, StorageStat
 
 DEFAULT_REGISTRY_PATH = Path(".tracemind/registry.jsonl")
 
@@ -64,33 +66,91 @@ class RegistryEntry:
             intent_id=intent_id if isinstance(intent_id, str) else None,
         )
 
+    def copy(self) -> "RegistryEntry":
+        return replace(self, meta=copy.deepcopy(self.meta))
+
+
+class _RegistryIndex:
+    """In-memory lookup tables over the registry file.
+
+    The index remembers the byte offset it has consumed, the file's size,
+    mtime and inode, and a fingerprint of the consumed bytes. Appends are
+    caught up by tail-reading from that offset; any other change (truncation,
+    rewrite, replacement) triggers a rebuild. Lookups hand out copies, so
+    callers cannot mutate the indexed entries.
+    """
+
+    def __init__(self) -> None:
+        self.entries: List[RegistryEntry] = []
+        self.by_artifact_id: Dict[str, RegistryEntry] = {}
+        self.by_intent_id: Dict[str, List[RegistryEntry]] = {}
+        self.by_type: Dict[ArtifactType, List[RegistryEntry]] = {}
+        self.by_body_hash: Dict[str, List[RegistryEntry]] = {}
+        self.offset = 0
+        self.fingerprint = 0
+        self.stat: StorageStat | None = None
+
+    def add(self, entry: RegistryEntry) -> None:
+        self.entries.append(entry)
+        self.by_artifact_id.setdefault(entry.artifact_id, entry)
+        if entry.intent_id is not None:
+            self.by_intent_id.setdefault(entry.intent_id, []).append(entry)
+        self.by_type.setdefault(entry.artifact_type, []).append(entry)
+        self.by_body_hash.setdefault(entry.body_hash, []).append(entry)
+
 
 class ArtifactRegistry:
     def __init__(self, storage: RegistryStorage | None = None):
         self.storage = storage or RegistryStorage(DEFAULT_REGISTRY_PATH)
-
-    def _iter_entries(self) -> Iterable[RegistryEntry]:
-        for record in self.storage.read_records():
-            yield RegistryEntry.from_dict(record)
+        self._index = _RegistryIndex()
+        self._index_lock = threading.Lock()
+
+    def _refresh_index(self) -> _RegistryIndex:
+        index = self._index
+        current = self.storage.stat()
+        if current is not None and current == index.stat:
+            return index
+        previous = index.stat
+        appended_only = (
+            current is not None
+            and previous is not None
+            and current.inode == previous.inode
+            and current.size >= previous.size
+            and current.size >= index.offset
+            # a growing in-place rewrite also keeps the inode; check the consumed bytes are untouched
+            and self.storage.fingerprint(index.offset) == index.fingerprint
+        )
+        if not appended_only:
+            index = self._index = _RegistryIndex()
+        if current is not None:
+            records, index.offset = self.storage.read_records_from(index.offset)
+            for record in records:
+                index.add(RegistryEntry.from_dict(record))
+            index.fingerprint = self.storage.fingerprint(index.offset)
+        index.stat = current
+        return index
 
     def list_all(self) -> List[RegistryEntry]:
-        return list(self._iter_entries())
+        with self._index_lock:
+            return [entry.copy() for entry in self._refresh_index().entries]
 
     def get_by_artifact_id(self, artifact_id: str) -> RegistryEntry | None:
-        for entry in self._iter_entries():
-            if entry.artifact_id == artifact_id:
-                return entry
-        return None
+        with self._index_lock:
+            entry = self._refresh_index().by_artifact_id.get(artifact_id)
+            return entry.copy() if entry is not None else None
 
     def list_by_intent_id(self, intent_id: str) -> List[RegistryEntry]:
-        return [entry for entry in self._iter_entries() if entry.intent_id == intent_id]
+        with self._index_lock:
+            return [entry.copy() for entry in self._refresh_index().by_intent_id.get(intent_id, ())]
 
     def list_by_type(self, artifact_type: ArtifactType | str) -> List[RegistryEntry]:
         target_type = ArtifactType(artifact_type) if isinstance(artifact_type, str) else artifact_type
-        return [entry for entry in self._iter_entries() if entry.artifact_type == target_type]
+        with self._index_lock:
+            return [entry.copy() for entry in self._refresh_index().by_type.get(target_type, ())]
 
     def list_by_body_hash(self, body_hash: str) -> List[RegistryEntry]:
-        return [entry for entry in self._iter_entries() if entry.body_hash == body_hash]
+        with self._index_lock:
+            return [entry.copy() for entry in self._refresh_index().by_body_hash.get(body_hash, ())]
 
     def add(self, artifact: Artifact, artifact_path: Union[Path, str]) -> RegistryEntry:
         if artifact.envelope.status != ArtifactStatus.ACCEPTED:
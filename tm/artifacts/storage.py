@@ -1,8 +1,18 @@
 from __future__ import annotations
 
 import json
+import os
+import zlib
 from pathlib import Path
-from typing import Iterator, Mapping
+from typing import Iterator, List, Mapping, NamedTuple, Tuple
+
+_PROBE_BYTES = 4096
+
+
+class StorageStat(NamedTuple):
+    size: int
+    mtime_ns: int
+    inode: int
 
 
 class RegistryStorage:
@@ -25,5 +35,61 @@ class RegistryStorage:
                     continue
                 yield json.loads(line)
 
+    def stat(self) -> StorageStat | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return StorageStat(st.st_size, st.st_mtime_ns, st.st_ino)
+
+    def read_records_from(self, offset: int) -> Tuple[List[Mapping[str, object]], int]:
+        """Parse complete records appended at or after byte ``offset``.
+
+        Returns the records and the offset just past the last complete record.
+        A final line without a newline counts as complete once it parses, as
+        :meth:`read_records` treats it; a partially written one is left for the
+        next call.
+        """
+
+        records: List[Mapping[str, object]] = []
+        try:
+            handle = self.path.open("rb")
+        except FileNotFoundError:
+            return records, 0
+        with handle:
+            handle.seek(offset)
+            end = offset
+            for raw in handle:
+                line = raw.strip()
+                if not raw.endswith(b"\n"):
+                    if line:
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            break
+                    end += len(raw)
+                    break
+                end += len(raw)
+                if line:
+                    records.append(json.loads(line))
+        return records, end
+
+    def fingerprint(self, end: int) -> int:
+        """Checksum the first and last few KiB before byte ``end``.
+
+        Cheap enough to run on every refresh, and it changes when the bytes an
+        index has already consumed are rewritten in place.
+        """
+
+        try:
+            handle = self.path.open("rb")
+        except FileNotFoundError:
+            return 0
+        with handle:
+            head = handle.read(min(end, _PROBE_BYTES))
+            handle.seek(max(0, end - _PROBE_BYTES))
+            tail = handle.read(end - handle.tell())
+        return zlib.crc32(tail, zlib.crc32(head))
+
 
-__all__ = ["RegistryStorage"]
+__all__ = ["RegistryStorage", "StorageStat"]
@@ -27,9 +27,16 @@ from tm.governance.config import load_governance_config
 from tm.governance.hitl import HitlManager
 from tm.runtime.workers import WorkerOptions, TaskWorkerSupervisor, install_signal_handlers
 from tm.runtime.dlq import DeadLetterStore
-from tm.runtime.queue import FileWorkQueue, InMemoryWorkQueue
+from tm.runtime.queue import (
+    FileWorkQueue,
+    InMemoryWorkQueue,
+    PartitionedWorkQueue,
+    SharedMemoryWorkQueue,
+    open_file_queue,
+)
+from tm.runtime.queue.partitioned import partition_dirs
 from tm.runtime.idempotency import IdempotencyStore
-from tm.runtime.queue.manager import EnqueueOutcome, TaskQueueManager
+from tm.runtime.queue.manager import EnqueueOutcome, EnqueueRequest, TaskQueueManager
 from tm.runtime.retry import load_retry_policy
 from tm.daemon import DaemonStatus, build_paths, collect_status, start_daemon, stop_daemon
 from tm.triggers.config import (
@@ -72,6 +79,7 @@ from tm.verify import (
     Explorer,
     TraceMindAdapter,
     build_report,
+    invariant_monitor,
     load_plan as load_verify_plan,
     load_spec as load_verify_spec,
 )
@@ -220,7 +228,9 @@ def _enqueue_task(
     if backend == "file":
         queue_path = Path(queue_dir).resolve()
         queue_path.mkdir(parents=True, exist_ok=True)
-        queue = FileWorkQueue(str(queue_path))
+        queue = open_file_queue(str(queue_path))
+    elif backend == "shm":
+        queue = SharedMemoryWorkQueue(str(Path(queue_dir).resolve()))
     elif backend == "memory":
         queue = InMemoryWorkQueue()
     else:
@@ -237,7 +247,7 @@ def _enqueue_task(
             trace=dict(trace or {}),
         )
     finally:
-        if backend == "file":
+        if backend in {"file", "shm"}:
             try:
                 queue.flush()
             finally:
@@ -355,7 +365,7 @@ def _build_parser() -> argparse.ArgumentParser:
         window = _parse_duration(args.window)
         until = datetime.now(timezone.utc)
         since = until - window
-        entries = load_window(args.dir, since, until)
+        entries = load_window(args.dir, since, until, workers=args.workers)
         if args.format == "csv":
             print("type,name,labels,value")
             for entry in entries:
@@ -377,7 +387,22 @@ def _build_parser() -> argparse.ArgumentParser:
             initial_pending=spec.initial_pending,
         )
         explorer = Explorer(adapter)
-        model = explorer.run(max_depth=int(args.depth), hash_mode=args.hash_mode)
+
+        def _report_progress(progress):
+            print(
+                f"verify: depth={progress.depth} states={progress.states} frontier={progress.frontier}",
+                file=sys.stderr,
+            )
+
+        model = explorer.run(
+            max_depth=int(args.depth),
+            hash_mode=args.hash_mode,
+            visited_path=args.visited_db,
+            workers=int(args.workers),
+            max_states=args.max_states,
+            stop_on=invariant_monitor(spec.invariants, adapter) if args.fail_fast else None,
+            progress=_report_progress if args.progress else None,
+        )
         report = build_report(
             invariants=spec.invariants,
             properties=spec.properties,
@@ -389,6 +414,8 @@ def _build_parser() -> argparse.ArgumentParser:
             print(json.dumps(report.as_dict(), indent=2))
         else:
             print(f"explored={report.explored_states} depth<={report.max_depth} deadlocks={len(report.deadlocks)}")
+            if model.stopped:
+                print(f"stopped early: {model.stopped}")
             if model.deadlocks:
                 print(f"deadlock_states={model.deadlocks}")
             for inv in report.invariants:
@@ -458,6 +485,12 @@ def _build_parser() -> argparse.ArgumentParser:
     spm_dump.add_argument("--dir", required=True, help="binlog directory")
     spm_dump.add_argument("--window", default="5m", help="window size (e.g. 5m, 1h)")
     spm_dump.add_argument("--format", choices=["csv", "json"], default="csv")
+    spm_dump.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes used to scan binlog segments in parallel (0 = one per CPU)",
+    )
     spm_dump.set_defaults(func=_cmd_metrics_dump)
 
     runtime_parser = sub.add_parser("runtime", help="Runtime utilities")
@@ -526,6 +559,17 @@ def _build_parser() -> argparse.ArgumentParser:
     verify_parser.add_argument(
         "--hash-mode", choices=["full", "store"], default="full", help="State hashing mode for deduplication"
     )
+    verify_parser.add_argument(
+        "--visited-db", default=None, help="Keep the visited-state set in this SQLite scratch file instead of memory"
+    )
+    verify_parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for frontier expansion (0 = one per CPU)"
+    )
+    verify_parser.add_argument("--max-states", type=int, default=None, help="Stop after discovering this many states")
+    verify_parser.add_argument(
+        "--fail-fast", action="store_true", help="Stop exploring as soon as an invariant is violated"
+    )
+    verify_parser.add_argument("--progress", action="store_true", help="Report exploration progress on stderr")
     verify_parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format")
     verify_sub = verify_parser.add_subparsers(dest="vcmd")
     verify_parser.set_defaults(func=_cmd_verify_semantic)
@@ -787,8 +831,8 @@ def _build_parser() -> argparse.ArgumentParser:
     )
     enqueue_parser.add_argument("flow", help="Flow id or YAML spec path containing flow.id")
     enqueue_parser.add_argument("-i", "--input", default="{}", help="JSON payload or @file path")
-    enqueue_parser.add_argument("--queue", choices=["file", "memory"], default="file", help="queue backend")
-    enqueue_parser.add_argument("--queue-dir", default="data/queue", help="queue directory (file backend)")
+    enqueue_parser.add_argument("--queue", choices=["file", "shm", "memory"], default="file", help="queue backend")
+    enqueue_parser.add_argument("--queue-dir", default="data/queue", help="queue directory (file and shm backends)")
     enqueue_parser.add_argument(
         "--idempotency-dir",
         default="data/idempotency",
@@ -1173,10 +1217,21 @@ def _build_parser() -> argparse.ArgumentParser:
     workers_start.add_argument(
         "-n", "--num", dest="worker_count", type=int, default=1, help="number of worker processes"
     )
-    workers_start.add_argument("--queue", choices=["file", "memory"], default="file", help="queue backend")
-    workers_start.add_argument("--queue-dir", default="data/queue", help="queue directory (file backend)")
+    workers_start.add_argument("--queue", choices=["file", "shm", "memory"], default="file", help="queue backend")
+    workers_start.add_argument("--queue-dir", default="data/queue", help="queue directory (file and shm backends)")
+    workers_start.add_argument(
+        "--partitions",
+        type=int,
+        default=0,
+        help="split a new file queue into N partitions by flow id (existing queues keep their layout)",
+    )
     workers_start.add_argument("--idempotency-dir", default="data/idempotency", help="idempotency cache directory")
     workers_start.add_argument("--dlq-dir", default="data/dlq", help="dead letter queue directory")
+    workers_start.add_argument(
+        "--metrics-dir",
+        default="data/metrics",
+        help="spool directory where workers publish metrics for fleet-wide export ('' to disable)",
+    )
     workers_start.add_argument(
         "--runtime",
         default="tm.app.wiring_flows:_runtime",
@@ -1184,6 +1239,7 @@ def _build_parser() -> argparse.ArgumentParser:
     )
     workers_start.add_argument("--lease-ms", type=int, default=30_000, help="lease duration in milliseconds")
     workers_start.add_argument("--batch", type=int, default=1, help="tasks to lease per fetch")
+    workers_start.add_argument("--max-inflight", type=int, default=1, help="tasks each worker processes concurrently")
     workers_start.add_argument("--poll", type=float, default=0.5, help="poll interval when idle (seconds)")
     workers_start.add_argument("--heartbeat", type=float, default=5.0, help="heartbeat interval (seconds)")
     workers_start.add_argument(
@@ -1205,22 +1261,33 @@ def _build_parser() -> argparse.ArgumentParser:
         idem_dir.mkdir(parents=True, exist_ok=True)
         dlq_dir = Path(args.dlq_dir).resolve()
         dlq_dir.mkdir(parents=True, exist_ok=True)
+        metrics_dir = Path(args.metrics_dir).resolve() if args.metrics_dir else None
+        if args.queue == "file" and args.partitions > 1:
+            # lay out the partitions up front so a mismatch fails here rather than in every worker
+            try:
+                open_file_queue(str(queue_dir), partitions=args.partitions).close()
+            except ValueError as exc:
+                print(str(exc), file=sys.stderr)
+                sys.exit(1)
 
         opts = WorkerOptions(
             worker_count=args.worker_count,
             queue_backend=args.queue,
             queue_dir=str(queue_dir),
+            queue_partitions=args.partitions,
             idempotency_dir=str(idem_dir),
             dlq_dir=str(dlq_dir),
             runtime_spec=args.runtime,
             lease_ms=args.lease_ms,
             batch_size=args.batch,
+            max_inflight=args.max_inflight,
             poll_interval=args.poll,
             heartbeat_interval=args.heartbeat,
             heartbeat_timeout=args.heartbeat_timeout,
             result_ttl=args.result_ttl,
             config_path=str(Path(args.config).resolve()) if args.config else None,
             drain_grace=args.drain_grace,
+            metrics_dir=str(metrics_dir) if metrics_dir else None,
         )
         supervisor = TaskWorkerSupervisor(opts)
         install_signal_handlers(supervisor)
@@ -1305,8 +1372,8 @@ def _build_parser() -> argparse.ArgumentParser:
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""Example:\n  tm queue stats --queue file""",
     )
-    queue_stats.add_argument("--queue", choices=["file", "memory"], default="file", help="queue backend")
-    queue_stats.add_argument("--queue-dir", default="data/queue", help="queue directory (file backend)")
+    queue_stats.add_argument("--queue", choices=["file", "shm", "memory"], default="file", help="queue backend")
+    queue_stats.add_argument("--queue-dir", default="data/queue", help="queue directory (file and shm backends)")
     queue_stats.add_argument("--json", action="store_true", help="emit JSON instead of text")
 
     def _cmd_queue_stats(args):
@@ -1314,7 +1381,9 @@ def _build_parser() -> argparse.ArgumentParser:
         if args.queue == "file":
             queue_dir = Path(args.queue_dir).resolve()
             queue_dir.mkdir(parents=True, exist_ok=True)
-            queue = FileWorkQueue(str(queue_dir))
+            queue = open_file_queue(str(queue_dir))
+        elif args.queue == "shm":
+            queue = SharedMemoryWorkQueue(str(Path(args.queue_dir).resolve()))
         else:
             queue = InMemoryWorkQueue()
         try:
@@ -1323,7 +1392,9 @@ def _build_parser() -> argparse.ArgumentParser:
             lag = max(0.0, now - oldest) if oldest is not None else 0.0
             entries = getattr(queue, "_entries", {})
             inflight = 0
-            if isinstance(entries, Mapping):
+            if isinstance(queue, (SharedMemoryWorkQueue, PartitionedWorkQueue)):
+                inflight = int(queue.describe()["inflight"])
+            elif isinstance(entries, Mapping):
                 inflight = sum(1 for entry in entries.values() if getattr(entry, "token", None))
             ready = max(0, depth - inflight)
             stats = {
@@ -1342,11 +1413,33 @@ def _build_parser() -> argparse.ArgumentParser:
                 print(f"inflight      : {stats['inflight']}")
                 print(f"lag_seconds   : {stats['lag_seconds']:.3f}")
         finally:
-            if args.queue == "file":
+            if args.queue in {"file", "shm"}:
                 queue.close()
 
     queue_stats.set_defaults(func=_cmd_queue_stats)
 
+    queue_migrate = queue_sub.add_parser(
+        "migrate",
+        help="convert JSONL queue segments to the binary format",
+        description="Rewrite sealed JSONL segments as binary segments. Stop workers and producers first.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:\n  tm queue migrate --queue-dir data/queue""",
+    )
+    queue_migrate.add_argument("--queue-dir", default="data/queue", help="queue directory (file backend)")
+
+    def _cmd_queue_migrate(args):
+        queue_dir = str(Path(args.queue_dir).resolve())
+        converted = 0
+        for path in partition_dirs(queue_dir) or [queue_dir]:
+            queue = FileWorkQueue(path, segment_format="binary")
+            try:
+                converted += queue.migrate_segments()
+            finally:
+                queue.close()
+        print(f"migrated {converted} segment(s) to the binary format")
+
+    queue_migrate.set_defaults(func=_cmd_queue_migrate)
+
     dlq_parser = sub.add_parser(
         "dlq",
         help="dead letter queue tools",
@@ -1425,20 +1518,24 @@ def _build_parser() -> argparse.ArgumentParser:
             sys.exit(1)
         if not args.all:
             matches = matches[:1]
-        queue = FileWorkQueue(str(Path(args.queue_dir).resolve()))
+        queue = open_file_queue(str(Path(args.queue_dir).resolve()))
         idem = IdempotencyStore(dir_path=str(Path(args.idempotency_dir).resolve()))
         policy = load_retry_policy(args.config)
         manager = TaskQueueManager(queue, idem, retry_policy=policy)
         try:
+            requests = []
             for record in matches:
                 headers = dict(record.task.get("headers", {})) if isinstance(record.task, Mapping) else {}
                 trace = record.task.get("trace") if isinstance(record.task, Mapping) else {}
-                outcome = manager.enqueue(
-                    flow_id=record.flow_id,
-                    input=record.task.get("input", {}),
-                    headers=headers,
-                    trace=trace if isinstance(trace, Mapping) else {},
+                requests.append(
+                    EnqueueRequest(
+                        flow_id=record.flow_id,
+                        input=record.task.get("input", {}),
+                        headers=headers,
+                        trace=trace if isinstance(trace, Mapping) else {},
+                    )
                 )
+            for record, outcome in zip(matches, manager.enqueue_many(requests)):
                 if outcome.envelope:
                     print(f"requeued {record.entry_id} -> task {outcome.envelope.task_id}")
                 else:
@@ -22,6 +22,7 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     parser.add_argument("--runtime", default="tm.app.wiring_flows:_runtime")
     parser.add_argument("--lease-ms", type=int, default=30_000)
     parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--max-inflight", type=int, default=1)
     parser.add_argument("--poll", type=float, default=0.5)
     parser.add_argument("--heartbeat", type=float, default=5.0)
     parser.add_argument("--heartbeat-timeout", type=float, default=15.0)
@@ -50,6 +51,7 @@ def main(argv: Optional[list[str]] = None) -> int:
         runtime_spec=args.runtime,
         lease_ms=args.lease_ms,
         batch_size=args.batch,
+        max_inflight=args.max_inflight,
         poll_interval=args.poll,
         heartbeat_interval=args.heartbeat,
         heartbeat_timeout=args.heartbeat_timeout,
@@ -17,6 +17,8 @@ except ModuleNotFoundError:  # pragma: no cover - non-windows
     msvcrt = None  # type: ignore[assignment]
 
 from tm.runtime.queue.file import FileWorkQueue
+from tm.runtime.queue.partitioned import partition_dirs
+from tm.runtime.queue.stats import QueueStats, read_queue_stats
 
 __all__ = [
     "DaemonPaths",
@@ -81,7 +83,10 @@ class DaemonState:
 
 @dataclass
 class QueueStatus:
-    """Snapshot of queue health used for CLI reporting."""
+    """Snapshot of queue health used for CLI reporting.
+
+    ``oldest_available_at`` is a wall-clock timestamp.
+    """
 
     backend: str
     path: str
@@ -224,21 +229,37 @@ def _collect_queue_status(queue_dir: str) -> QueueStatus:
             inflight=0,
             oldest_available_at=None,
         )
-    queue = FileWorkQueue(queue_dir)
-    try:
-        snapshot = queue.describe()
-    finally:
-        queue.close()
+    backlog = pending = inflight = 0
+    oldest: Optional[float] = None
+    # a partitioned queue keeps one stats file per partition
+    for path in partition_dirs(queue_dir) or [queue_dir]:
+        stats = _read_or_seed_stats(path)
+        backlog += stats.backlog
+        pending += stats.pending
+        inflight += stats.inflight
+        if stats.oldest_available_at is not None and (oldest is None or stats.oldest_available_at < oldest):
+            oldest = stats.oldest_available_at
     return QueueStatus(
         backend="file",
         path=queue_dir,
-        backlog=snapshot["backlog"],
-        pending=snapshot["pending"],
-        inflight=snapshot["inflight"],
-        oldest_available_at=snapshot["oldest_available_at"],
+        backlog=backlog,
+        pending=pending,
+        inflight=inflight,
+        oldest_available_at=oldest,
     )
 
 
+def _read_or_seed_stats(queue_dir: str) -> QueueStats:
+    stats = read_queue_stats(queue_dir)
+    if stats is None:
+        # queue written before stats tracking existed: one full load seeds the stats file
+        FileWorkQueue(queue_dir).close()
+        stats = read_queue_stats(queue_dir)
+    if stats is None:  # pragma: no cover - seeding failed
+        stats = QueueStats(backlog=0, inflight=0, oldest_available_at=None, updated_at=0.0)
+    return stats
+
+
 def is_process_running(pid: int) -> bool:
     if pid <= 0:
         return False
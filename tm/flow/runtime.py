@@ -21,6 +21,7 @@ from .policies import FlowPolicies
 from .spec import FlowSpec, StepDef
 from .trace_store import FlowTraceSink, TraceSpanLike
 from tm.obs.recorder import Recorder
+from tm.obs.sketch import QuantileSketch, WindowedSketch
 
 
 logger = logging.getLogger(__name__)
@@ -43,6 +44,51 @@ class _Request:
     governance_descriptor: Optional[RequestDescriptor] = None
 
 
+class _LatencyStats:
+    """Queue/exec latency sketches with an optional sliding window."""
+
+    __slots__ = ("queued", "exec", "queued_window", "exec_window", "success", "error")
+
+    def __init__(self, window_sec: float = 0.0) -> None:
+        self.queued = QuantileSketch()
+        self.exec = QuantileSketch()
+        self.queued_window: Optional[WindowedSketch] = WindowedSketch(window_sec) if window_sec > 0 else None
+        self.exec_window: Optional[WindowedSketch] = WindowedSketch(window_sec) if window_sec > 0 else None
+        self.success = 0
+        self.error = 0
+
+    def observe_queued(self, value: float) -> None:
+        self.queued.add(value)
+        if self.queued_window is not None:
+            self.queued_window.add(value)
+
+    def observe_exec(self, value: float) -> None:
+        self.exec.add(value)
+        if self.exec_window is not None:
+            self.exec_window.add(value)
+
+    @staticmethod
+    def percentiles(prefix: str, sketch: QuantileSketch) -> Dict[str, float]:
+        p50, p95, p99 = sketch.quantiles((0.50, 0.95, 0.99))
+        return {f"{prefix}_p50": p50, f"{prefix}_p95": p95, f"{prefix}_p99": p99}
+
+    def summary(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"success": self.success, "error": self.error, "count": self.exec.count}
+        payload.update(self.percentiles("queued_ms", self.queued))
+        payload.update(self.percentiles("exec_ms", self.exec))
+        return payload
+
+    def window_summary(self) -> Optional[Dict[str, Any]]:
+        if self.queued_window is None or self.exec_window is None:
+            return None
+        queued = self.queued_window.merged()
+        execs = self.exec_window.merged()
+        payload: Dict[str, Any] = {"count": execs.count}
+        payload.update(self.percentiles("queued_ms", queued))
+        payload.update(self.percentiles("exec_ms", execs))
+        return payload
+
+
 @dataclass
 class FlowRunRecord:
     """Normalized run completion payload."""
@@ -83,6 +129,7 @@ class FlowRuntime:
         idempotency_cache_size: int = 1024,
         run_listeners: Sequence[Callable[[FlowRunRecord], Awaitable[None] | None]] | None = None,
         governance: GovernanceManager | None = None,
+        stats_window_sec: float = 0.0,
     ) -> None:
         self._flows: Dict[str, Flow] = dict(flows or {})
         self._policies = policies or FlowPolicies()
@@ -107,11 +154,12 @@ class FlowRuntime:
             "active_peak": 0,
             "rejected": 0,
             "rejected_reason": defaultdict(int, {"QUEUE_FULL": 0, "QUEUE_TIMEOUT": 0}),
-            "queued_ms": [],
-            "exec_ms": [],
             "success": 0,
             "error": 0,
         }
+        self._stats_window_sec = max(0.0, float(stats_window_sec))
+        self._latency = _LatencyStats(self._stats_window_sec)
+        self._flow_latency: Dict[str, _LatencyStats] = {}
 
         self._idempotency_ttl = max(0.0, float(idempotency_ttl_sec))
         self._idempotency_cache_size = max(0, int(idempotency_cache_size))
@@ -319,7 +367,9 @@ class FlowRuntime:
 
             start_ts = time.perf_counter()
             queued_ms = (start_ts - request.enqueue_ts) * 1000.0
-            self._stats["queued_ms"].append(queued_ms)
+            flow_latency = self._flow_latency_for(request.flow_name)
+            self._latency.observe_queued(queued_ms)
+            flow_latency.observe_queued(queued_ms)
 
             self._active += 1
             self._stats["active_peak"] = max(self._stats["active_peak"], self._active)
@@ -378,15 +428,19 @@ class FlowRuntime:
                 output = {}
                 self._recorder.on_flow_finished(request.spec.name, request.model_name, "error")
                 self._stats["error"] += 1
+                flow_latency.error += 1
             else:
                 self._recorder.on_flow_finished(request.spec.name, request.model_name, "ok")
                 self._stats["success"] += 1
+                flow_latency.success += 1
             finally:
                 self._active -= 1
 
             exec_ms = (time.perf_counter() - exec_start) * 1000.0
             run_end_ts = time.time()
-            self._stats["exec_ms"].append(exec_ms)
+            self._latency.observe_exec(exec_ms)
+            flow_latency.observe_exec(exec_ms)
+            self._recorder.on_flow_exec(request.spec.name, status, exec_ms, request.run_id)
 
             result = {
                 "status": status,
@@ -624,17 +678,16 @@ class FlowRuntime:
         self._close_trace_sink()
 
     def get_stats(self) -> Dict[str, Any]:
-        def percentile(data: list[float], pct: float) -> float:
-            if not data:
-                return 0.0
-            ordered = sorted(data)
-            idx = int(round((pct / 100.0) * (len(ordered) - 1)))
-            return ordered[idx]
+        """Return runtime counters and latency percentiles.
 
-        queued = list(self._stats["queued_ms"])
-        execs = list(self._stats["exec_ms"])
+        Percentiles come from fixed-size quantile sketches, so both memory and
+        the cost of this call stay constant regardless of how many runs have
+        completed. ``per_flow`` breaks the same figures down by flow name and,
+        when ``stats_window_sec`` is configured, ``window`` reports them over
+        the most recent window only.
+        """
 
-        return {
+        stats: Dict[str, Any] = {
             "queue_depth_peak": self._stats["queue_depth_peak"],
             "queue_depth_current": self._stats["queue_depth_current"],
             "active_peak": self._stats["active_peak"],
@@ -642,13 +695,23 @@ class FlowRuntime:
             "rejected_reason": dict(self._stats["rejected_reason"]),
             "success": self._stats["success"],
             "error": self._stats["error"],
-            "queued_ms_p50": percentile(queued, 50.0),
-            "queued_ms_p95": percentile(queued, 95.0),
-            "queued_ms_p99": percentile(queued, 99.0),
-            "exec_ms_p50": percentile(execs, 50.0),
-            "exec_ms_p95": percentile(execs, 95.0),
-            "exec_ms_p99": percentile(execs, 99.0),
         }
+        stats.update(_LatencyStats.percentiles("queued_ms", self._latency.queued))
+        stats.update(_LatencyStats.percentiles("exec_ms", self._latency.exec))
+        stats["per_flow"] = {name: entry.summary() for name, entry in self._flow_latency.items()}
+        window = self._latency.window_summary()
+        if window is not None:
+            window["window_sec"] = self._stats_window_sec
+            window["per_flow"] = {name: entry.window_summary() for name, entry in self._flow_latency.items()}
+            stats["window"] = window
+        return stats
+
+    def _flow_latency_for(self, flow_name: str) -> _LatencyStats:
+        entry = self._flow_latency.get(flow_name)
+        if entry is None:
+            entry = _LatencyStats(self._stats_window_sec)
+            self._flow_latency[flow_name] = entry
+        return entry
 
     def _maybe_cache_result(self, key: str, result: Dict[str, Any]) -> None:
         if self._idempotency_ttl <= 0 or self._idempotency_cache_size == 0:
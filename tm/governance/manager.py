@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 from tm.guard import GuardDecision, GuardEngine, GuardRule
 from tm.obs import counters
@@ -91,6 +91,8 @@ class GovernanceManager:
         self._guard_flow = {name: GuardEngine.compile_rules(rules) for name, rules in guard_cfg.flow_rules.items()}
         self._guard_policy = {name: GuardEngine.compile_rules(rules) for name, rules in guard_cfg.policy_rules.items()}
         self._hitl = HitlManager(self._config.hitl, audit=self._audit)
+        # gauge children bound once per label set; re-bound if the metrics registry is swapped
+        self._gauge_children: Dict[Tuple[str, Hashable], Tuple[counters.Gauge, counters.GaugeChild]] = {}
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -160,6 +162,33 @@ class GovernanceManager:
     def evaluate_guard(self, payload: Mapping[str, Any], request: RequestDescriptor) -> GuardDecision:
         if not self._config.guard_enabled():
             return GuardDecision(True, ())
+        rules = self._guard_rules_for(request)
+        if not rules:
+            return GuardDecision(True, ())
+        decision = self._guard_engine.evaluate(
+            payload, rules, context={"flow": request.flow, "binding": request.binding}
+        )
+        self._audit_guard_block(decision, request)
+        return decision
+
+    def evaluate_guard_many(
+        self, payloads: Sequence[Mapping[str, Any]], request: RequestDescriptor
+    ) -> List[GuardDecision]:
+        """Evaluate one request's guard rules against a batch of payloads, one decision per payload."""
+
+        if not self._config.guard_enabled():
+            return [GuardDecision(True, ()) for _ in payloads]
+        rules = self._guard_rules_for(request)
+        if not rules:
+            return [GuardDecision(True, ()) for _ in payloads]
+        decisions = self._guard_engine.evaluate_many(
+            payloads, rules, context={"flow": request.flow, "binding": request.binding}
+        )
+        for decision in decisions:
+            self._audit_guard_block(decision, request)
+        return decisions
+
+    def _guard_rules_for(self, request: RequestDescriptor) -> List[GuardRule]:
         rules: List[GuardRule] = list(self._guard_global)
         flow_rules = self._guard_flow.get(request.flow)
         if flow_rules:
@@ -169,19 +198,17 @@ class GovernanceManager:
             policy_rules = self._guard_policy.get(policy)
             if policy_rules:
                 rules.extend(policy_rules)
-        if not rules:
-            return GuardDecision(True, ())
-        decision = self._guard_engine.evaluate(
-            payload, rules, context={"flow": request.flow, "binding": request.binding}
-        )
-        if not decision.allowed and self._audit.enabled:
-            first = decision.first
-            meta = first.as_dict() if first else {"reason": "guard_blocked"}
-            meta.setdefault("flow", request.flow)
-            if request.binding:
-                meta.setdefault("binding", request.binding)
-            self._audit.record("guard_block", meta)
-        return decision
+        return rules
+
+    def _audit_guard_block(self, decision: GuardDecision, request: RequestDescriptor) -> None:
+        if decision.allowed or not self._audit.enabled:
+            return
+        first = decision.first
+        meta = first.as_dict() if first else {"reason": "guard_blocked"}
+        meta.setdefault("flow", request.flow)
+        if request.binding:
+            meta.setdefault("binding", request.binding)
+        self._audit.record("guard_block", meta)
 
     def evaluate_custom_guard(
         self,
@@ -334,8 +361,11 @@ class GovernanceManager:
     def _record_budget_usage(self, key: LimitKey, kind: str, value: Optional[float]) -> None:
         if value is None:
             return
-        labels = {"scope": _format_limit_scope(key), "kind": kind}
-        counters.metrics.get_gauge("tm_govern_budget_usage").set(float(value), labels=labels)
+        self._gauge_child(
+            "tm_govern_budget_usage",
+            (key, kind),
+            lambda: {"scope": _format_limit_scope(key), "kind": kind},
+        ).set(float(value))
 
     def _record_breaker_state(self, key: BreakerKey, state: BreakerState) -> None:
         value = {
@@ -343,20 +373,25 @@ class GovernanceManager:
             BreakerState.HALF_OPEN: 0.5,
             BreakerState.OPEN: 1.0,
         }[state]
-        counters.metrics.get_gauge("tm_breaker_state").set(
-            value,
-            labels={"target": _format_breaker_scope(key)},
-        )
+        self._gauge_child("tm_breaker_state", key, lambda: {"target": _format_breaker_scope(key)}).set(value)
 
     def _update_concurrency_gauge(self, reservation: LimitReservation) -> None:
         level, name, _ = reservation.key
         if level != "flow" or not name:
             return
-        counters.metrics.get_gauge("tm_govern_current_concurrency").set(
-            float(reservation.rate.active),
-            labels={"flow": name},
+        self._gauge_child("tm_govern_current_concurrency", name, lambda: {"flow": name}).set(
+            float(reservation.rate.active)
         )
 
+    def _gauge_child(
+        self, name: str, cache_key: Hashable, labels: Callable[[], Mapping[str, str]]
+    ) -> counters.GaugeChild:
+        gauge = counters.metrics.get_gauge(name)
+        bound = self._gauge_children.get((name, cache_key))
+        if bound is None or bound[0] is not gauge:
+            bound = self._gauge_children[(name, cache_key)] = (gauge, gauge.labels(labels()))
+        return bound[1]
+
 
 def _format_limit_scope(key: LimitKey) -> str:
     level, name, arm = key
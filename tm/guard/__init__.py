@@ -4,6 +4,7 @@ from .filters import (
     GuardBlockedError,
     GuardDecision,
     GuardEngine,
+    GuardProgram,
     GuardRule,
     GuardViolation,
     register_guard,
@@ -13,6 +14,7 @@ __all__ = [
     "GuardBlockedError",
     "GuardDecision",
     "GuardEngine",
+    "GuardProgram",
     "GuardRule",
     "GuardViolation",
     "register_guard",
@@ -3,19 +3,48 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from bisect import bisect_right
+from itertools import accumulate
+from types import MappingProxyType
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Pattern, Sequence, Set, Tuple
 
 GuardHandler = Callable[["GuardRule", Sequence[Any], Mapping[str, Any]], Iterable["GuardViolation"]]
 
 _CUSTOM_RULES: Dict[str, GuardHandler] = {}
+_CUSTOM_VERSION = 0  # bumped by register_guard so cached plans re-resolve handlers
 
+_PLAN_CACHE_SIZE = 256
+_COLUMN_SEP = "\x00"  # joins a batch's values for one keyword scan
 
-@dataclass(eq=False)
+# a path token with its list index pre-parsed (None when it is not an integer)
+_PathToken = Tuple[str, Optional[int]]
+
+
+@dataclass(frozen=True, eq=False)
 class GuardRule:
+    """One configured guard check.
+
+    Rules are immutable (``options`` becomes a read-only copy) because their
+    compiled form and the engine's plans are cached per rule; build a new
+    rule, e.g. with :func:`dataclasses.replace`, to change one.
+    """
+
     name: str
     path: Optional[str]
-    options: Dict[str, Any]
+    options: Mapping[str, Any]
+    _compiled: Optional["_CompiledRule"] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        options = self.options if isinstance(self.options, Mapping) else {}
+        object.__setattr__(self, "options", MappingProxyType(dict(options)))
+
+    def compiled(self) -> "_CompiledRule":
+        compiled = self._compiled
+        if compiled is None:
+            compiled = _compile_rule(self)
+            object.__setattr__(self, "_compiled", compiled)
+        return compiled
 
 
 @dataclass(frozen=True)
@@ -53,8 +82,27 @@ class GuardBlockedError(RuntimeError):
         self.violation = violation
 
 
+class GuardProgram(Tuple[GuardRule, ...]):
+    """Rules produced by :meth:`GuardEngine.compile_rules`, with paths, regexes and keywords pre-compiled.
+
+    It is a tuple of :class:`GuardRule`, so programs can be concatenated
+    with other rule sequences; :meth:`GuardEngine.evaluate` runs any rule
+    sequence, caching its execution plan.
+    """
+
+    __slots__ = ()
+
+
 class GuardEngine:
-    """Execute configured rules against input payloads."""
+    """Execute configured rules against input payloads.
+
+    The first evaluation of a rule sequence builds a plan: handlers are
+    resolved once, each distinct path is extracted once per payload, and the
+    ``deny_keywords`` rules on a path share one combined keyword regex that
+    screens values before the per-rule scan. Plans are cached per rule
+    sequence (by rule identity) and rebuilt when :func:`register_guard` adds
+    a handler.
+    """
 
     def __init__(self, *, registry: Optional[Dict[str, GuardHandler]] = None) -> None:
         self._builtins = {
@@ -64,6 +112,7 @@ class GuardEngine:
             "deny_keywords": _rule_deny_keywords,
         }
         self._registry = registry or {}
+        self._plans: Dict[Tuple[GuardRule, ...], _Plan] = {}
 
     def evaluate(
         self,
@@ -73,16 +122,41 @@ class GuardEngine:
         context: Optional[Mapping[str, Any]] = None,
     ) -> GuardDecision:
         ctx = dict(context or {})
-        violations: List[GuardViolation] = []
-        for rule in rules:
-            handler = self._resolve_handler(rule.name)
-            if handler is None:
-                continue
-            values = _extract_values(payload, rule.path)
-            for violation in handler(rule, values, ctx):
-                violations.append(violation)
-        allowed = not violations
-        return GuardDecision(allowed=allowed, violations=tuple(violations))
+        violations = self._plan_for(rules).run(payload, ctx)
+        return GuardDecision(allowed=not violations, violations=tuple(violations))
+
+    def _plan_for(self, rules: Sequence[GuardRule]) -> "_Plan":
+        key = rules if isinstance(rules, tuple) else tuple(rules)
+        plan = self._plans.get(key)
+        if plan is None or plan.version != _CUSTOM_VERSION:
+            plan = _Plan(self, key)
+            if len(self._plans) >= _PLAN_CACHE_SIZE:
+                self._plans.clear()  # ad-hoc rule lists (e.g. helpers.guard) must not grow the cache
+            self._plans[key] = plan
+        return plan
+
+    def evaluate_many(
+        self,
+        payloads: Iterable[Any],
+        rules: Sequence[GuardRule],
+        *,
+        context: Optional[Mapping[str, Any]] = None,
+    ) -> List[GuardDecision]:
+        """Evaluate *rules* against every payload; same decisions as calling :meth:`evaluate` per payload.
+
+        Each path is extracted for the whole batch in one pass, and keyword
+        rules search the batch's joined values once per keyword, so only
+        rows with a hit are checked individually.
+        """
+
+        batch = payloads if isinstance(payloads, Sequence) else list(payloads)
+        if not batch:
+            return []
+        ctx = dict(context or {})
+        return [
+            GuardDecision(allowed=not violations, violations=tuple(violations))
+            for violations in self._plan_for(rules).run_many(batch, ctx)
+        ]
 
     def _resolve_handler(self, name: str) -> Optional[GuardHandler]:
         if name in self._registry:
@@ -92,7 +166,7 @@ class GuardEngine:
         return self._builtins.get(name)
 
     @staticmethod
-    def compile_rules(definitions: Iterable[Mapping[str, Any]]) -> Tuple[GuardRule, ...]:
+    def compile_rules(definitions: Iterable[Mapping[str, Any]]) -> GuardProgram:
         compiled: List[GuardRule] = []
         for entry in definitions:
             if not isinstance(entry, Mapping):
@@ -101,14 +175,14 @@ class GuardEngine:
             if not isinstance(raw_name, str) or not raw_name.strip():
                 continue
             path = entry.get("path")
-            compiled.append(
-                GuardRule(
-                    name=raw_name.strip(),
-                    path=str(path) if isinstance(path, str) and path else None,
-                    options={k: v for k, v in entry.items() if k not in {"type", "path"}},
-                )
+            rule = GuardRule(
+                name=raw_name.strip(),
+                path=str(path) if isinstance(path, str) and path else None,
+                options={k: v for k, v in entry.items() if k not in {"type", "path"}},
             )
-        return tuple(compiled)
+            rule.compiled()
+            compiled.append(rule)
+        return GuardProgram(compiled)
 
 
 def register_guard(name: str) -> Callable[[GuardHandler], GuardHandler]:
@@ -119,24 +193,66 @@ def register_guard(name: str) -> Callable[[GuardHandler], GuardHandler]:
     normalized = name.strip()
 
     def _decorator(func: GuardHandler) -> GuardHandler:
+        global _CUSTOM_VERSION
         _CUSTOM_RULES[normalized] = func
+        _CUSTOM_VERSION += 1
         return func
 
     return _decorator
 
 
+# ---------------------------------------------------------------------------
+# Compiled rules
+# ---------------------------------------------------------------------------
+
+
+class _CompiledRule:
+    """Per-rule work done once: the tokenized path and the rule's parsed options."""
+
+    __slots__ = ("tokens", "limit", "pattern", "regex", "regex_error", "keywords")
+
+    def __init__(self) -> None:
+        self.tokens: Tuple[_PathToken, ...] = ()  # empty: the whole payload
+        self.limit: Optional[int] = None
+        self.pattern: Optional[str] = None
+        self.regex: Optional[Pattern[str]] = None
+        self.regex_error: Optional[re.error] = None
+        self.keywords: Tuple[str, ...] = ()
+
+
+def _compile_rule(rule: GuardRule) -> _CompiledRule:
+    compiled = _CompiledRule()
+    if rule.path:
+        compiled.tokens = tuple((token, _try_int(token)) for token in _tokenize_path(rule.path))
+    options = rule.options
+    raw_limit = options.get("value")
+    if raw_limit is not None:
+        try:
+            compiled.limit = int(raw_limit)
+        except (TypeError, ValueError):
+            pass
+    pattern = options.get("pattern")
+    if isinstance(pattern, str) and pattern:
+        compiled.pattern = pattern
+        flags = re.IGNORECASE if options.get("ignore_case", True) else 0
+        try:
+            compiled.regex = re.compile(pattern, flags=flags)
+        except re.error as exc:
+            compiled.regex_error = exc  # raised when the rule is evaluated, as before
+    raw_list = options.get("values")
+    if isinstance(raw_list, Sequence) and not isinstance(raw_list, (str, bytes)):
+        compiled.keywords = tuple(str(item).lower() for item in raw_list if isinstance(item, (str, bytes)))
+    return compiled
+
+
 # ---------------------------------------------------------------------------
 # Built-in handlers
 # ---------------------------------------------------------------------------
 
 
 def _rule_length_max(rule: GuardRule, values: Sequence[Any], _: Mapping[str, Any]) -> Iterable[GuardViolation]:
-    try:
-        raw_limit = rule.options.get("value") if isinstance(rule.options, Mapping) else None
-        if raw_limit is None:
-            return []
-        limit = int(raw_limit)
-    except (TypeError, ValueError):
+    limit = rule.compiled().limit
+    if limit is None:
         return []
     violations: List[GuardViolation] = []
     for idx, value in enumerate(values):
@@ -170,41 +286,46 @@ def _rule_required(rule: GuardRule, values: Sequence[Any], _: Mapping[str, Any])
 
 
 def _rule_regex_deny(rule: GuardRule, values: Sequence[Any], _: Mapping[str, Any]) -> Iterable[GuardViolation]:
-    pattern = rule.options.get("pattern")
-    if not isinstance(pattern, str) or not pattern:
+    compiled = rule.compiled()
+    if compiled.regex_error is not None:
+        raise compiled.regex_error
+    regex = compiled.regex
+    if regex is None:
         return []
-    flags = re.IGNORECASE if rule.options.get("ignore_case", True) else 0
-    compiled = re.compile(pattern, flags=flags)
     violations: List[GuardViolation] = []
     for idx, value in enumerate(values):
         if not isinstance(value, str):
             continue
-        if compiled.search(value):
+        if regex.search(value):
             violations.append(
                 GuardViolation(
                     rule=rule.name,
                     path=rule.path,
                     reason="regex_block",
-                    details=(("pattern", pattern), ("index", idx)),
+                    details=(("pattern", compiled.pattern), ("index", idx)),
                 )
             )
     return violations
 
 
 def _rule_deny_keywords(rule: GuardRule, values: Sequence[Any], _: Mapping[str, Any]) -> Iterable[GuardViolation]:
-    raw_list = rule.options.get("values")
-    if not isinstance(raw_list, Sequence) or isinstance(raw_list, (str, bytes)):
-        return []
-    keywords = [str(item).lower() for item in raw_list if isinstance(item, (str, bytes))]
-    if not keywords:
-        return []
+    lowered = [value.lower() if isinstance(value, str) else None for value in values]
+    return _keyword_violations(rule, rule.compiled().keywords, lowered)
+
+
+def _keyword_violations(
+    rule: GuardRule,
+    keywords: Sequence[str],
+    lowered: Sequence[Optional[str]],
+) -> List[GuardViolation]:
     violations: List[GuardViolation] = []
-    for idx, value in enumerate(values):
-        if not isinstance(value, str):
+    if not keywords:
+        return violations
+    for idx, text in enumerate(lowered):
+        if text is None:
             continue
-        lowered = value.lower()
         for needle in keywords:
-            if needle in lowered:
+            if needle in text:
                 violations.append(
                     GuardViolation(
                         rule=rule.name,
@@ -217,38 +338,211 @@ def _rule_deny_keywords(rule: GuardRule, values: Sequence[Any], _: Mapping[str,
     return violations
 
 
+_READ_ONLY_HANDLERS = frozenset({_rule_length_max, _rule_required, _rule_regex_deny, _rule_deny_keywords})
+
+
+def _may_exceed_length(rule: GuardRule, values: Sequence[Any]) -> bool:
+    limit = rule.compiled().limit
+    return limit is not None and any(type(value) is not str or len(value) > limit for value in values)
+
+
+def _may_miss_required(_: GuardRule, values: Sequence[Any]) -> bool:
+    return not values or not (type(values[0]) is str and values[0])
+
+
+# batch evaluation skips a built-in handler for rows these cheap checks clear
+_ROW_PREFILTERS: Dict[GuardHandler, Callable[[GuardRule, Sequence[Any]], bool]] = {
+    _rule_length_max: _may_exceed_length,
+    _rule_required: _may_miss_required,
+}
+
+
+# ---------------------------------------------------------------------------
+# Execution plans
+# ---------------------------------------------------------------------------
+
+
+class _PathSlot:
+    """Values of one distinct path, extracted at most once per evaluation."""
+
+    __slots__ = ("tokens", "screen", "needles")
+
+    def __init__(self, tokens: Tuple[_PathToken, ...]) -> None:
+        self.tokens = tokens
+        # union of the keywords of every deny_keywords rule reading this path
+        self.screen: Optional[Pattern[str]] = None
+        self.needles: Tuple[str, ...] = ()
+
+
+class _Plan:
+    def __init__(self, engine: GuardEngine, rules: Tuple[GuardRule, ...]) -> None:
+        self.version = _CUSTOM_VERSION
+        slots: Dict[Tuple[_PathToken, ...], int] = {}
+        self.slots: List[_PathSlot] = []
+        keywords: Dict[int, List[str]] = {}
+        # (rule, slot index, handler, copy values); handler None marks the deny_keywords fast path
+        self.steps: List[Tuple[GuardRule, int, Optional[GuardHandler], bool]] = []
+        for rule in rules:
+            handler = engine._resolve_handler(rule.name)
+            if handler is None:
+                continue
+            tokens = rule.compiled().tokens
+            index = slots.get(tokens)
+            if index is None:
+                index = slots[tokens] = len(self.slots)
+                self.slots.append(_PathSlot(tokens))
+            if handler is _rule_deny_keywords:
+                keywords.setdefault(index, []).extend(rule.compiled().keywords)
+                self.steps.append((rule, index, None, False))
+            else:
+                # built-ins only read the values; other handlers get their own list, as before
+                self.steps.append((rule, index, handler, handler not in _READ_ONLY_HANDLERS))
+        for index, needles in keywords.items():
+            if needles:
+                unique = sorted(set(needles), key=len, reverse=True)
+                self.slots[index].needles = tuple(unique)
+                self.slots[index].screen = re.compile("|".join(re.escape(needle) for needle in unique))
+
+    def run(self, payload: Any, ctx: Mapping[str, Any]) -> List[GuardViolation]:
+        values: List[Optional[List[Any]]] = [None] * len(self.slots)
+        # per slot: lowered string values, or None when no keyword of the slot occurs in any value
+        screened: Dict[int, Optional[List[Optional[str]]]] = {}
+        violations: List[GuardViolation] = []
+        for rule, index, handler, copy in self.steps:
+            slot_values = values[index]
+            if slot_values is None:
+                slot_values = values[index] = _extract_tokens(payload, self.slots[index].tokens)
+            if handler is not None:
+                violations.extend(handler(rule, list(slot_values) if copy else slot_values, ctx))
+                continue
+            if index not in screened:
+                screened[index] = self._screen(self.slots[index], slot_values)
+            lowered = screened[index]
+            if lowered is not None:
+                violations.extend(_keyword_violations(rule, rule.compiled().keywords, lowered))
+        return violations
+
+    def run_many(self, payloads: Sequence[Any], ctx: Mapping[str, Any]) -> List[List[GuardViolation]]:
+        count = len(payloads)
+        columns: List[Optional[List[List[Any]]]] = [None] * len(self.slots)
+        # per slot: rows where a keyword of the slot occurs in some value
+        candidates: Dict[int, Set[int]] = {}
+        violations: List[List[GuardViolation]] = [[] for _ in range(count)]
+        for rule, index, handler, copy in self.steps:
+            column = columns[index]
+            if column is None:
+                tokens = self.slots[index].tokens
+                column = columns[index] = _extract_column(payloads, tokens)
+            if handler is not None:
+                prefilter = _ROW_PREFILTERS.get(handler)
+                for row, row_values in enumerate(column):
+                    if prefilter is None or prefilter(rule, row_values):
+                        violations[row].extend(handler(rule, list(row_values) if copy else row_values, ctx))
+                continue
+            if index not in candidates:
+                candidates[index] = self._screen_column(self.slots[index], column)
+            keywords = rule.compiled().keywords
+            for row in sorted(candidates[index]):
+                lowered = [value.lower() if isinstance(value, str) else None for value in column[row]]
+                violations[row].extend(_keyword_violations(rule, keywords, lowered))
+        return violations
+
+    @staticmethod
+    def _screen_column(slot: _PathSlot, column: Sequence[Sequence[Any]]) -> Set[int]:
+        """Rows where some keyword occurs, found by searching the slot's joined string values."""
+
+        if not slot.needles:
+            return set()
+        located = [
+            (row, value) for row, row_values in enumerate(column) for value in row_values if isinstance(value, str)
+        ]
+        if not located:
+            return set()
+        rows = [row for row, _ in located]
+        texts = [text for _, text in located]
+        starts = list(accumulate((len(text) + 1 for text in texts), initial=0))
+        joined = _COLUMN_SEP.join(texts).lower()
+        if len(joined) != starts[-1] - 1:
+            # some characters lowercase to several; offsets no longer line up, so lower per value
+            texts = [text.lower() for text in texts]
+            starts = list(accumulate((len(text) + 1 for text in texts), initial=0))
+            joined = _COLUMN_SEP.join(texts)
+        hits: Set[int] = set()
+        find = joined.find
+        for needle in slot.needles:
+            position = find(needle)
+            while position != -1:
+                # a hit running over a separator is a false candidate; the exact scan drops it
+                text = bisect_right(starts, position) - 1
+                hits.add(rows[text])
+                if text + 1 >= len(texts):
+                    break
+                # the value is already a candidate; resume the search at the next one
+                position = find(needle, starts[text + 1])
+        return hits
+
+    @staticmethod
+    def _screen(slot: _PathSlot, slot_values: Sequence[Any]) -> Optional[List[Optional[str]]]:
+        screen = slot.screen
+        if screen is None:
+            return None
+        lowered = [value.lower() if isinstance(value, str) else None for value in slot_values]
+        if any(text is not None and screen.search(text) for text in lowered):
+            return lowered
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Path resolution helpers
 # ---------------------------------------------------------------------------
 
 
-def _extract_values(data: Any, path: Optional[str]) -> List[Any]:
-    if not path:
-        return [data]
-    tokens = _tokenize_path(path)
+def _extract_column(payloads: Sequence[Any], tokens: Tuple[_PathToken, ...]) -> List[List[Any]]:
+    """:func:`_extract_tokens` for every payload, walking plain key chains over dicts directly."""
+
+    if not tokens or any(token in ("root", "*") for token, _ in tokens):
+        return [_extract_tokens(payload, tokens) for payload in payloads]
+    keys = [token for token, _ in tokens]
+    column: List[List[Any]] = []
+    for payload in payloads:
+        value = payload
+        for key in keys:
+            if type(value) is not dict:
+                column.append(_extract_tokens(payload, tokens))
+                break
+            value = value.get(key)
+            if value is None:
+                column.append([])
+                break
+        else:
+            column.append([value])
+    return column
+
+
+def _extract_tokens(data: Any, tokens: Tuple[_PathToken, ...]) -> List[Any]:
     if not tokens:
         return [data]
     current: List[Any] = [data]
-    for token in tokens:
+    for token, index in tokens:
         next_values: List[Any] = []
         if token == "root":
             next_values = [data]
             current = next_values
             continue
         for value in current:
-            if isinstance(value, Mapping):
+            kind = type(value)  # plain dicts and lists skip the slower ABC checks
+            if kind is dict or (kind is not list and isinstance(value, Mapping)):
                 if token == "*":
                     next_values.extend(value.values())
                 else:
                     if token in value:
                         next_values.append(value[token])
-            elif isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+            elif kind is list or (isinstance(value, Sequence) and not isinstance(value, (str, bytes))):
                 if token == "*":
                     next_values.extend(value)
                 else:
-                    idx = _try_int(token)
-                    if idx is not None and 0 <= idx < len(value):
-                        next_values.append(value[idx])
+                    if index is not None and 0 <= index < len(value):
+                        next_values.append(value[index])
         current = [item for item in next_values if item is not None]
         if not current:
             break
@@ -305,6 +599,7 @@ __all__ = [
     "GuardDecision",
     "GuardEngine",
     "GuardBlockedError",
+    "GuardProgram",
     "GuardRule",
     "GuardViolation",
     "register_guard",
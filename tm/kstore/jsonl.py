@@ -5,7 +5,7 @@ import os
 import threading
 import uuid
 from pathlib import Path
-from typing import Any, Dict, Iterable, Mapping, Tuple, cast
+from typing import IO, Any, Dict, Iterable, Mapping, Optional, Tuple, cast
 
 from .api import KStore, register_driver, resolve_path
 
@@ -16,30 +16,82 @@ def _ensure_mapping(value: Mapping[str, Any]) -> Dict[str, Any]:
     return {str(key): val for key, val in value.items()}
 
 
+def _encode(record: Mapping[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=True) + "\n"
+
+
 class JsonlKStore(KStore):
-    """Append-only JSON Lines knowledge store with atomic updates."""
+    """Append-only JSON Lines knowledge store with group commit and compaction.
+
+    Writes append a single line to the log and become durable through a shared
+    fsync: concurrent writers that arrive while a sync is in flight are covered
+    by the next one instead of each paying their own. Once superseded records
+    exceed ``compact_ratio`` of the log, a background thread rewrites the file
+    as a snapshot of the live keys (atomically, via rename) and later writes are
+    appended after it, so loading is always "snapshot plus tail".
+    """
 
-    def __init__(self, path: str | os.PathLike[str]) -> None:
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        compact_ratio: float = 0.5,
+        compact_min_records: int = 1024,
+        background_compaction: bool = True,
+    ) -> None:
         self._path = Path(path)
-        self._records: list[dict[str, Any]] = []
         self._state: dict[str, dict[str, Any]] = {}
         self._lock = threading.RLock()
+        self._compact_ratio = max(0.0, float(compact_ratio))
+        self._compact_min_records = max(1, int(compact_min_records))
+        self._background_compaction = bool(background_compaction)
+
+        self._fh: Optional[IO[str]] = None
+        self._total_records = 0
+        self._written_seq = 0
+        self._durable_seq = 0
+        self._syncing = False
+        self._commit_cond = threading.Condition(threading.Lock())
+
+        self._compaction_tail: Optional[list[str]] = None
+        self._compaction_thread: Optional[threading.Thread] = None
         self._load()
 
     def _load(self) -> None:
         try:
-            with self._path.open("r", encoding="utf-8") as fh:
-                for line in fh:
-                    line = line.strip()
+            fh = self._path.open("rb")
+        except FileNotFoundError:
+            return
+        good_end = 0
+        unterminated = False
+        with fh:
+            for raw in fh:
+                line = raw.strip()
+                if not raw.endswith(b"\n"):
+                    # final line without a newline: keep it if it parses, else it is a torn append
+                    try:
+                        record = json.loads(line) if line else None
+                    except ValueError:
+                        break
+                    unterminated = bool(line)
+                else:
                     if not line:
+                        good_end += len(raw)
                         continue
                     record = json.loads(line)
-                    if isinstance(record, dict):
-                        record_dict = dict(record)
-                        self._records.append(record_dict)
-                        self._apply_record(record_dict)
-        except FileNotFoundError:
-            return
+                good_end += len(raw)
+                if isinstance(record, dict):
+                    self._total_records += 1
+                    self._apply_record(record)
+            size = fh.seek(0, os.SEEK_END)
+        if size > good_end or unterminated:
+            with self._path.open("r+b") as out:
+                out.truncate(good_end)
+                if unterminated:
+                    out.seek(good_end)
+                    out.write(b"\n")  # so the next append starts on its own line
+                out.flush()
+                os.fsync(out.fileno())
 
     def _apply_record(self, record: Mapping[str, Any]) -> None:
         op = record.get("op")
@@ -59,19 +111,20 @@ class JsonlKStore(KStore):
         if not isinstance(key, str):
             raise TypeError("key must be a string")
         record = {"op": "put", "key": key, "value": _ensure_mapping(value)}
+        line = _encode(record)
         with self._lock:
             prev = self._state.get(key)
-            self._records.append(record)
             self._state[key] = _ensure_mapping(cast(Mapping[str, Any], record["value"]))
             try:
-                self._flush()
+                seq = self._append(line)
             except Exception:
-                self._records.pop()
                 if prev is None:
                     self._state.pop(key, None)
                 else:
                     self._state[key] = dict(prev)
                 raise
+        self._commit(seq)
+        self._maybe_compact()
 
     def get(self, key: str) -> Mapping[str, Any] | None:
         if not isinstance(key, str):
@@ -90,38 +143,165 @@ class JsonlKStore(KStore):
     def delete(self, key: str) -> bool:
         if not isinstance(key, str):
             raise TypeError("key must be a string")
-        record = {"op": "delete", "key": key}
+        line = _encode({"op": "delete", "key": key})
         with self._lock:
             existed = key in self._state
-            prev = self._state.get(key)
-            self._records.append(record)
-            self._state.pop(key, None)
+            prev = self._state.pop(key, None)
             try:
-                self._flush()
+                seq = self._append(line)
             except Exception:
-                self._records.pop()
                 if prev is not None:
                     self._state[key] = dict(prev.items())
                 raise
+        self._commit(seq)
+        self._maybe_compact()
         return existed
 
+    def compact(self) -> None:
+        """Rewrite the log as a snapshot of live keys, blocking until done."""
+
+        self._wait_for_compaction()
+        self._compact()
+
     def close(self) -> None:
-        # No persistent handles to close, but method included for protocol symmetry.
-        return None
+        self._wait_for_compaction()
+        with self._lock:
+            fh, self._fh = self._fh, None
+        if fh is not None:
+            try:
+                fh.flush()
+                os.fsync(fh.fileno())
+            finally:
+                fh.close()
+
+    # Write path -------------------------------------------------------
+    def _ensure_handle(self) -> IO[str]:
+        if self._fh is None:
+            parent = self._path.parent
+            if str(parent):
+                parent.mkdir(parents=True, exist_ok=True)
+            self._fh = self._path.open("a", encoding="utf-8")
+        return self._fh
 
-    def _flush(self) -> None:
+    def _append(self, line: str) -> int:
+        # caller holds self._lock
+        fh = self._ensure_handle()
+        self._total_records += 1
+        try:
+            fh.write(line)
+        except BaseException:
+            self._total_records -= 1
+            raise
+        self._written_seq += 1
+        if self._compaction_tail is not None:
+            self._compaction_tail.append(line)
+        return self._written_seq
+
+    def _commit(self, seq: int) -> None:
+        """Block until record ``seq`` is fsynced, sharing the sync with peers."""
+
+        with self._commit_cond:
+            while self._durable_seq < seq and self._syncing:
+                self._commit_cond.wait()
+            if self._durable_seq >= seq:
+                return
+            self._syncing = True
+        synced = 0
+        try:
+            with self._lock:
+                fh = self._ensure_handle()
+                fh.flush()
+                target = self._written_seq
+            os.fsync(fh.fileno())
+            synced = target
+        finally:
+            with self._commit_cond:
+                self._syncing = False
+                if synced:
+                    self._durable_seq = max(self._durable_seq, synced)
+                self._commit_cond.notify_all()
+
+    # Compaction -------------------------------------------------------
+    def _needs_compaction(self) -> bool:
+        total = self._total_records
+        if total < self._compact_min_records:
+            return False
+        dead = total - len(self._state)
+        return dead > 0 and dead >= self._compact_ratio * total
+
+    def _maybe_compact(self) -> None:
+        with self._lock:
+            if self._compaction_tail is not None or not self._needs_compaction():
+                return
+            thread: Optional[threading.Thread] = None
+            if self._background_compaction:
+                thread = threading.Thread(target=self._compact, name="jsonl-kstore-compact", daemon=True)
+                self._compaction_thread = thread
+        if thread is None:
+            self._compact()
+        else:
+            thread.start()
+
+    def _wait_for_compaction(self) -> None:
+        thread = self._compaction_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _compact(self) -> None:
+        with self._lock:
+            if self._compaction_tail is not None:
+                return
+            # values are replaced, never mutated, so a shallow copy is a stable snapshot;
+            # writes made while it is encoded land in the compaction tail
+            live = list(self._state.items())
+            self._compaction_tail = []
         parent = self._path.parent
-        if str(parent):
-            parent.mkdir(parents=True, exist_ok=True)
         tmp_name = f".{self._path.name}.tmp-{uuid.uuid4().hex}"
         tmp_path = parent / tmp_name if str(parent) else Path(tmp_name)
-        with tmp_path.open("w", encoding="utf-8") as fh:
-            for record in self._records:
-                fh.write(json.dumps(record, separators=(",", ":"), ensure_ascii=True))
-                fh.write("\n")
-            fh.flush()
-            os.fsync(fh.fileno())
-        os.replace(tmp_path, self._path)
+        try:
+            snapshot = [_encode({"op": "put", "key": k, "value": v}) for k, v in live]
+            if str(parent):
+                parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w", encoding="utf-8") as out:
+                out.writelines(snapshot)
+                out.flush()
+                os.fsync(out.fileno())
+            self._swap_in(tmp_path, len(snapshot))
+        except Exception:
+            with self._lock:
+                self._compaction_tail = None
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+
+    def _swap_in(self, tmp_path: Path, snapshot_records: int) -> None:
+        # Keep group-commit leaders off the old handle while it is replaced.
+        with self._commit_cond:
+            while self._syncing:
+                self._commit_cond.wait()
+            self._syncing = True
+        synced = 0
+        try:
+            with self._lock:
+                tail = self._compaction_tail or []
+                with tmp_path.open("a", encoding="utf-8") as out:
+                    out.writelines(tail)
+                    out.flush()
+                    os.fsync(out.fileno())
+                if self._fh is not None:
+                    self._fh.close()
+                    self._fh = None
+                os.replace(tmp_path, self._path)
+                self._total_records = snapshot_records + len(tail)
+                self._compaction_tail = None
+                synced = self._written_seq
+        finally:
+            with self._commit_cond:
+                self._syncing = False
+                self._durable_seq = max(self._durable_seq, synced)
+                self._commit_cond.notify_all()
 
 
 def _factory(_: str, parsed) -> KStore:
@@ -1,14 +1,22 @@
-"""Thread-safe metric primitives and a shared registry."""
+"""Thread-safe metric primitives and a shared registry.
+
+Counters and histograms are sharded per thread: each thread updates its own
+cells without taking a lock, and :meth:`samples` merges the shards. Callers
+on hot paths can bind labels once with ``metric.labels(...)`` and keep the
+returned child handle.
+"""
 
 from __future__ import annotations
 
 import threading
-from collections import defaultdict
+import time
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, List, Mapping, MutableMapping, Tuple
+from typing import Callable, Dict, Generic, Iterable, List, Mapping, Tuple, TypeVar
 
 
 _LabelKey = Tuple[Tuple[str, str], ...]
+_Cell = TypeVar("_Cell")
 
 
 def _canon_labels(labels: Mapping[str, str] | None) -> _LabelKey:
@@ -17,63 +25,177 @@ def _canon_labels(labels: Mapping[str, str] | None) -> _LabelKey:
     return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
 
 
+class _Shards(Generic[_Cell]):
+    """Per-thread ``label key -> cell`` maps; only the owning thread writes to its map.
+
+    Maps of threads that have exited are folded into a retired map when the
+    shards are next merged, so short-lived threads do not accumulate.
+    """
+
+    def __init__(self, new_cell: Callable[[], _Cell], fold: Callable[[_Cell, _Cell], None]) -> None:
+        self._new_cell = new_cell
+        self._fold = fold
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live: List[Tuple[threading.Thread, Dict[_LabelKey, _Cell]]] = []
+        self._retired: Dict[_LabelKey, _Cell] = {}
+
+    def cell(self, key: _LabelKey) -> _Cell:
+        try:
+            cells = self._local.cells
+        except AttributeError:
+            cells = self._local.cells = {}
+            with self._lock:
+                self._live.append((threading.current_thread(), cells))
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = self._new_cell()
+        return cell
+
+    def merged(self) -> Dict[_LabelKey, _Cell]:
+        with self._lock:
+            live = []
+            for thread, cells in self._live:
+                if thread.is_alive():
+                    live.append((thread, cells))
+                else:
+                    self._merge_into(self._retired, cells)
+            self._live = live
+            merged: Dict[_LabelKey, _Cell] = {}
+            self._merge_into(merged, self._retired)
+            for _, cells in live:
+                self._merge_into(merged, cells)
+        return merged
+
+    def _merge_into(self, target: Dict[_LabelKey, _Cell], cells: Dict[_LabelKey, _Cell]) -> None:
+        # list() snapshots the map in one step even while its owner keeps writing
+        for key, cell in list(cells.items()):
+            merged = target.get(key)
+            if merged is None:
+                merged = target[key] = self._new_cell()
+            self._fold(merged, cell)
+
+
 class _MetricBase:
     def __init__(self, name: str, *, help: str | None = None) -> None:  # noqa: A002 - mimic Prom-style arg
         self.name = name
         self.help = help or ""
-        self._lock = threading.RLock()
+        self._children: Dict[_LabelKey, object] = {}
 
-    def _with_lock(self, fn):
-        with self._lock:
-            return fn()
+    def _key(self, labels: Mapping[str, str] | None, kwargs: Mapping[str, object]) -> _LabelKey:
+        if kwargs:
+            merged = dict(labels or {})
+            merged.update(kwargs)
+            return _canon_labels(merged)  # type: ignore[arg-type]
+        return _canon_labels(labels)
+
+
+class _CounterCell:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+
+def _fold_counter(target: _CounterCell, cell: _CounterCell) -> None:
+    target.value += cell.value
+
+
+class CounterChild:
+    """Counter bound to one label set."""
+
+    __slots__ = ("_shards", "_key")
+
+    def __init__(self, shards: _Shards[_CounterCell], key: _LabelKey) -> None:
+        self._shards = shards
+        self._key = key
+
+    def inc(self, value: float = 1.0) -> None:
+        self._shards.cell(self._key).value += float(value)
 
 
 class Counter(_MetricBase):
     def __init__(self, name: str, *, help: str | None = None) -> None:
         super().__init__(name, help=help)
-        self._values: MutableMapping[_LabelKey, float] = defaultdict(float)
+        self._shards: _Shards[_CounterCell] = _Shards(_CounterCell, _fold_counter)
+
+    def labels(self, labels: Mapping[str, str] | None = None, **kwargs: object) -> CounterChild:
+        key = self._key(labels, kwargs)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, CounterChild(self._shards, key))
+        return child  # type: ignore[return-value]
 
     def inc(self, value: float = 1.0, labels: Mapping[str, str] | None = None) -> None:
-        lbl = _canon_labels(labels)
+        self._shards.cell(_canon_labels(labels)).value += float(value)
 
-        def _inner() -> None:
-            self._values[lbl] += float(value)
+    def samples(self) -> List[Tuple[_LabelKey, float]]:
+        return [(key, cell.value) for key, cell in self._shards.merged().items()]
 
-        self._with_lock(_inner)
 
-    def samples(self) -> List[Tuple[_LabelKey, float]]:
-        def _inner() -> List[Tuple[_LabelKey, float]]:
-            return list(self._values.items())
+class _GaugeCell:
+    __slots__ = ("value", "lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self.lock = threading.Lock()
+
 
-        return self._with_lock(_inner)
+class GaugeChild:
+    """Gauge bound to one label set."""
+
+    __slots__ = ("_cell",)
+
+    def __init__(self, cell: _GaugeCell) -> None:
+        self._cell = cell
+
+    def set(self, value: float) -> None:
+        self._cell.value = float(value)
+
+    def inc(self, value: float = 1.0) -> None:
+        cell = self._cell
+        with cell.lock:
+            cell.value += float(value)
 
 
 class Gauge(_MetricBase):
+    """Last-write-wins gauge.
+
+    A set value is shared across threads rather than sharded: ``set`` is a
+    plain attribute store and only ``inc`` takes the cell's lock.
+    """
+
     def __init__(self, name: str, *, help: str | None = None) -> None:
         super().__init__(name, help=help)
-        self._values: MutableMapping[_LabelKey, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._cells: Dict[_LabelKey, _GaugeCell] = {}
+
+    def _cell(self, key: _LabelKey) -> _GaugeCell:
+        cell = self._cells.get(key)
+        if cell is None:
+            with self._lock:
+                cell = self._cells.setdefault(key, _GaugeCell())
+        return cell
+
+    def labels(self, labels: Mapping[str, str] | None = None, **kwargs: object) -> GaugeChild:
+        key = self._key(labels, kwargs)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, GaugeChild(self._cell(key)))
+        return child  # type: ignore[return-value]
 
     def set(self, value: float, labels: Mapping[str, str] | None = None) -> None:
-        lbl = _canon_labels(labels)
-
-        def _inner() -> None:
-            self._values[lbl] = float(value)
-
-        self._with_lock(_inner)
+        self._cell(_canon_labels(labels)).value = float(value)
 
     def inc(self, value: float = 1.0, labels: Mapping[str, str] | None = None) -> None:
-        lbl = _canon_labels(labels)
-
-        def _inner() -> None:
-            self._values[lbl] += float(value)
-
-        self._with_lock(_inner)
+        cell = self._cell(_canon_labels(labels))
+        with cell.lock:
+            cell.value += float(value)
 
     def samples(self) -> List[Tuple[_LabelKey, float]]:
-        def _inner() -> List[Tuple[_LabelKey, float]]:
-            return list(self._values.items())
-
-        return self._with_lock(_inner)
+        with self._lock:
+            cells = list(self._cells.items())
+        return [(key, cell.value) for key, cell in cells]
 
 
 @dataclass
@@ -82,6 +204,64 @@ class _HistogramBucket:
     count: float
 
 
+@dataclass(frozen=True)
+class Exemplar:
+    """An observation tagged with labels such as a trace id, kept per bucket."""
+
+    labels: _LabelKey
+    value: float
+    timestamp: float
+
+
+@dataclass(frozen=True)
+class HistogramSeries:
+    """Merged state of one labelled histogram series."""
+
+    buckets: Tuple[int, ...]  # cumulative, aligned with Histogram.buckets
+    sum: float
+    count: int
+    exemplars: Tuple[Exemplar | None, ...] | None = None
+
+
+class _HistogramCell:
+    __slots__ = ("counts", "sum", "count", "exemplars")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size  # per bucket, not cumulative
+        self.sum = 0.0
+        self.count = 0
+        self.exemplars: List[Exemplar | None] | None = None  # allocated on the first exemplar
+
+
+def _keep_exemplar(cell: _HistogramCell, index: int, value: float, labels: Mapping[str, str]) -> None:
+    if cell.exemplars is None:
+        cell.exemplars = [None] * len(cell.counts)
+    cell.exemplars[index] = Exemplar(labels=_canon_labels(labels), value=value, timestamp=time.time())
+
+
+class HistogramChild:
+    """Histogram bound to one label set."""
+
+    __slots__ = ("_shards", "_key", "_bounds")
+
+    def __init__(self, shards: _Shards[_HistogramCell], key: _LabelKey, bounds: Tuple[float, ...]) -> None:
+        self._shards = shards
+        self._key = key
+        self._bounds = bounds
+
+    def observe(self, value: float, *, exemplar: Mapping[str, str] | None = None) -> None:
+        v = float(value)
+        if v != v:  # NaN fits no bucket
+            return
+        cell = self._shards.cell(self._key)
+        index = bisect_left(self._bounds, v)
+        cell.counts[index] += 1
+        cell.sum += v
+        cell.count += 1
+        if exemplar is not None:
+            _keep_exemplar(cell, index, v, exemplar)
+
+
 class Histogram(_MetricBase):
     def __init__(self, name: str, *, help: str | None = None, buckets: Iterable[float] | None = None) -> None:
         super().__init__(name, help=help)
@@ -89,34 +269,97 @@ class Histogram(_MetricBase):
         if bounds[-1] != float("inf"):
             bounds.append(float("inf"))
         self._buckets = tuple(bounds)
-        self._values: MutableMapping[_LabelKey, List[_HistogramBucket]] = {}
+        size = len(bounds)
+
+        def _fold(target: _HistogramCell, cell: _HistogramCell) -> None:
+            counts = target.counts
+            for index, count in enumerate(cell.counts):
+                counts[index] += count
+            target.sum += cell.sum
+            target.count += cell.count
+            if cell.exemplars is not None:
+                if target.exemplars is None:
+                    target.exemplars = [None] * size
+                for index, exemplar in enumerate(cell.exemplars):
+                    current = target.exemplars[index]
+                    if exemplar is not None and (current is None or exemplar.timestamp > current.timestamp):
+                        target.exemplars[index] = exemplar
+
+        self._shards: _Shards[_HistogramCell] = _Shards(lambda: _HistogramCell(size), _fold)
+
+    @property
+    def buckets(self) -> Tuple[float, ...]:
+        return self._buckets
+
+    def labels(self, labels: Mapping[str, str] | None = None, **kwargs: object) -> HistogramChild:
+        key = self._key(labels, kwargs)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, HistogramChild(self._shards, key, self._buckets))
+        return child  # type: ignore[return-value]
+
+    def observe(
+        self,
+        value: float,
+        labels: Mapping[str, str] | None = None,
+        *,
+        exemplar: Mapping[str, str] | None = None,
+    ) -> None:
+        """Record *value*; *exemplar* labels (e.g. ``{"trace_id": ...}``) are kept as its bucket's exemplar."""
+
+        v = float(value)
+        if v != v:
+            return
+        cell = self._shards.cell(_canon_labels(labels))
+        index = bisect_left(self._buckets, v)
+        cell.counts[index] += 1
+        cell.sum += v
+        cell.count += 1
+        if exemplar is not None:
+            _keep_exemplar(cell, index, v, exemplar)
+
+    def series(self) -> Dict[_LabelKey, HistogramSeries]:
+        """Cumulative buckets, sum, count and exemplars per label set, from one merge of the shards."""
+
+        result: Dict[_LabelKey, HistogramSeries] = {}
+        for key, cell in self._shards.merged().items():
+            running = 0
+            cumulative = []
+            for count in cell.counts:
+                running += count
+                cumulative.append(running)
+            exemplars = tuple(cell.exemplars) if cell.exemplars is not None else None
+            result[key] = HistogramSeries(tuple(cumulative), cell.sum, cell.count, exemplars)
+        return result
 
-    def observe(self, value: float, labels: Mapping[str, str] | None = None) -> None:
-        lbl = _canon_labels(labels)
+    def samples(self) -> Dict[_LabelKey, List[_HistogramBucket]]:
+        """Cumulative bucket counts per label set."""
 
-        def _inner() -> None:
-            buckets = self._values.setdefault(
-                lbl,
-                [_HistogramBucket(le=b, count=0.0) for b in self._buckets],
-            )
-            v = float(value)
-            for bucket in buckets:
-                if v <= bucket.le:
-                    bucket.count += 1.0
-            # also track sum/count for convenience
-            self._values.setdefault(lbl + (("_sum", ""),), [])
+        return {
+            key: [_HistogramBucket(le=le, count=float(count)) for le, count in zip(self._buckets, series.buckets)]
+            for key, series in self.series().items()
+        }
 
-        self._with_lock(_inner)
+    def totals(self) -> Dict[_LabelKey, Tuple[float, int]]:
+        """``(sum, count)`` of observed values per label set."""
 
-    def samples(self) -> Dict[_LabelKey, List[_HistogramBucket]]:
-        def _inner() -> Dict[_LabelKey, List[_HistogramBucket]]:
-            return {
-                lbl: [_HistogramBucket(le=bucket.le, count=bucket.count) for bucket in buckets]
-                for lbl, buckets in self._values.items()
-                if not lbl or lbl[-1][0] != "_sum"
-            }
+        return {key: (cell.sum, cell.count) for key, cell in self._shards.merged().items()}
 
-        return self._with_lock(_inner)
+    def _absorb(
+        self,
+        labels: Mapping[str, str] | None,
+        bounds: Iterable[float],
+        counts: Iterable[int],
+        total: float,
+        count: int,
+    ) -> None:
+        """Add per-bucket *counts* recorded against *bounds* (e.g. by another process)."""
+
+        cell = self._shards.cell(_canon_labels(labels))
+        for le, bucket_count in zip(bounds, counts):
+            cell.counts[bisect_left(self._buckets, float(le))] += int(bucket_count)
+        cell.sum += float(total)
+        cell.count += int(count)
 
 
 class Registry:
@@ -129,12 +372,18 @@ class Registry:
         self._histograms: Dict[str, Histogram] = {}
 
     def get_counter(self, name: str, *, help: str | None = None) -> Counter:
+        metric = self._counters.get(name)
+        if metric is not None:
+            return metric
         with self._lock:
             if name not in self._counters:
                 self._counters[name] = Counter(name, help=help)
             return self._counters[name]
 
     def get_gauge(self, name: str, *, help: str | None = None) -> Gauge:
+        metric = self._gauges.get(name)
+        if metric is not None:
+            return metric
         with self._lock:
             if name not in self._gauges:
                 self._gauges[name] = Gauge(name, help=help)
@@ -147,18 +396,27 @@ class Registry:
         help: str | None = None,
         buckets: Iterable[float] | None = None,
     ) -> Histogram:
+        metric = self._histograms.get(name)
+        if metric is not None:
+            return metric
         with self._lock:
             if name not in self._histograms:
                 self._histograms[name] = Histogram(name, help=help, buckets=buckets)
             return self._histograms[name]
 
-    def snapshot(self) -> Dict[str, Dict[str, object]]:
+    def collect(self) -> Tuple[List[Counter], List[Gauge], List[Histogram]]:
+        """Return the registered counters, gauges and histograms."""
+
         with self._lock:
-            return {
-                "counters": {name: counter.samples() for name, counter in self._counters.items()},
-                "gauges": {name: gauge.samples() for name, gauge in self._gauges.items()},
-                "histograms": {name: histogram.samples() for name, histogram in self._histograms.items()},
-            }
+            return list(self._counters.values()), list(self._gauges.values()), list(self._histograms.values())
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        counters, gauges, histograms = self.collect()
+        return {
+            "counters": {counter.name: counter.samples() for counter in counters},
+            "gauges": {gauge.name: gauge.samples() for gauge in gauges},
+            "histograms": {histogram.name: histogram.samples() for histogram in histograms},
+        }
 
 
 class _MetricsProxy:
@@ -182,8 +440,7 @@ class _MetricsProxy:
         self.use(Registry())
 
     def _current(self) -> "Registry":
-        with self._lock:
-            return self._registry
+        return self._registry  # a single attribute read; swaps happen under self._lock
 
     def get_counter(self, name: str, *, help: str | None = None) -> Counter:
         return self._current().get_counter(name, help=help)
@@ -200,6 +457,9 @@ class _MetricsProxy:
     ) -> Histogram:
         return self._current().get_histogram(name, help=help, buckets=buckets)
 
+    def collect(self) -> Tuple[List[Counter], List[Gauge], List[Histogram]]:
+        return self._current().collect()
+
     def snapshot(self) -> Dict[str, Dict[str, object]]:
         return self._current().snapshot()
 
@@ -235,8 +495,13 @@ def counter(
 
 __all__ = [
     "Counter",
+    "CounterChild",
+    "Exemplar",
     "Gauge",
+    "GaugeChild",
     "Histogram",
+    "HistogramChild",
+    "HistogramSeries",
     "Registry",
     "metrics",
     "_reset_for_tests",
@@ -48,10 +48,9 @@ class BinlogExporter:
         self._stop.set()
         self._thread.join(timeout=1.0)
         self._thread = None
-        if self._writer and self._writer.fp:
+        if self._writer:
             try:
-                self._writer.fp.flush()
-                self._writer.fp.close()
+                self._writer.close()
             except Exception:
                 pass
         self._writer = None
@@ -134,7 +133,7 @@ class BinlogExporter:
             encoded = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
             frames.append((self._record_type, encoded))
         if frames:
-            writer.append_many(frames)
+            writer.append_many(frames, ts=ts)
             try:
                 writer.flush_fsync()
             except Exception:
@@ -2,19 +2,58 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Mapping, Union
+import gzip
+import math
+import threading
+from typing import Dict, Iterable, List, Mapping, Tuple, Union
 
-from tm.obs.counters import Registry, _MetricsProxy
+from tm.obs.counters import Exemplar, HistogramSeries, Registry, _MetricsProxy
+from tm.obs.shared import FleetMetrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+_SeriesKey = Tuple[str, str, _LabelKey]  # (kind, metric name, labels)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
 
 
 def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
-    if not labels:
+    parts = [f'{key}="{_escape_label_value(str(value))}"' for key, value in labels]
+    if not parts:
         return ""
-    parts = [f"{key}={value!r}" for key, value in labels]
     return "{" + ",".join(parts) + "}"
 
 
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_le(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
 def render_prometheus(snapshot: Mapping[str, Mapping[str, object]]) -> str:
+    """Render a :meth:`Registry.snapshot` in the text format.
+
+    Snapshots carry no histogram sums; prefer :class:`PrometheusRenderer`,
+    which reads the registry directly and emits ``_sum``/``_count``.
+    """
+
     lines = []
     for metric_type, metrics in snapshot.items():
         if not isinstance(metrics, Mapping):
@@ -30,11 +69,11 @@ def render_prometheus(snapshot: Mapping[str, Mapping[str, object]]) -> str:
                     if not isinstance(samples, Iterable):
                         continue
                     for sample in samples:
-                        bucket_labels = list(label_key) + [("le", str(getattr(sample, "le", "")))]
                         count = getattr(sample, "count", None)
                         if count is None:
                             continue
-                        lines.append(f"{name}{_format_labels(bucket_labels)} {count}")
+                        bucket_labels = list(label_key) + [("le", _format_le(getattr(sample, "le", math.inf)))]
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {_format_value(count)}")
         else:
             for name, samples in metrics.items():
                 if not isinstance(samples, Iterable):
@@ -47,18 +86,155 @@ def render_prometheus(snapshot: Mapping[str, Mapping[str, object]]) -> str:
                     label_key, value = sample
                     if not isinstance(label_key, Iterable):
                         continue
-                    lines.append(f"{name}{_format_labels(label_key)} {value}")
+                    lines.append(f"{name}{_format_labels(label_key)} {_format_value(value)}")
     return "\n".join(lines) + "\n"
 
 
-RegistryLike = Union[Registry, _MetricsProxy]
+RegistryLike = Union[Registry, _MetricsProxy, FleetMetrics]
+
+
+class PrometheusRenderer:
+    """Text/OpenMetrics renderer that caches the lines of every series.
+
+    Each scrape reads the current value of every series, but only series
+    whose value changed since the previous scrape are formatted again;
+    unchanged ones reuse their cached lines. Series that disappear from the
+    registry drop out of the cache.
+
+    The OpenMetrics form names counter families without ``_total``, attaches
+    histogram exemplars to their buckets and ends with ``# EOF``.
+    """
+
+    def __init__(self, registry: RegistryLike) -> None:
+        self._registry = registry
+        self._lock = threading.Lock()
+        # per format: (kind, name, labels) -> (state the lines were rendered from, lines)
+        self._caches: Dict[bool, Dict[_SeriesKey, Tuple[object, List[str]]]] = {False: {}, True: {}}
+
+    def render(self, *, openmetrics: bool = False) -> str:
+        counters, gauges, histograms = self._registry.collect()
+        with self._lock:
+            cache = self._caches[openmetrics]
+            fresh: Dict[_SeriesKey, Tuple[object, List[str]]] = {}
+            out: List[str] = []
+            for counter in sorted(counters, key=lambda metric: metric.name):
+                family = counter.name
+                if openmetrics and family.endswith("_total"):
+                    family = family[: -len("_total")]
+                sample_name = family + "_total" if openmetrics else counter.name
+                self._header(out, family, "counter", counter.help)
+                for key, value in counter.samples():
+                    self._series(out, cache, fresh, ("c", counter.name, key), value, sample_name)
+            for gauge in sorted(gauges, key=lambda metric: metric.name):
+                self._header(out, gauge.name, "gauge", gauge.help)
+                for key, value in gauge.samples():
+                    self._series(out, cache, fresh, ("g", gauge.name, key), value, gauge.name)
+            for histogram in sorted(histograms, key=lambda metric: metric.name):
+                self._header(out, histogram.name, "histogram", histogram.help)
+                bounds = histogram.buckets
+                for key, series in histogram.series().items():
+                    cache_key = ("h", histogram.name, key)
+                    state = (bounds, series)
+                    cached = cache.get(cache_key)
+                    if cached is not None and cached[0] == state:
+                        lines = cached[1]
+                    else:
+                        lines = _histogram_lines(histogram.name, key, bounds, series, openmetrics)
+                    fresh[cache_key] = (state, lines)
+                    out.extend(lines)
+            self._caches[openmetrics] = fresh
+        if openmetrics:
+            out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+    @staticmethod
+    def _header(out: List[str], family: str, kind: str, help_text: str) -> None:
+        if help_text:
+            out.append(f"# HELP {family} {_escape_help(help_text)}")
+        out.append(f"# TYPE {family} {kind}")
+
+    @staticmethod
+    def _series(
+        out: List[str],
+        cache: Mapping[_SeriesKey, Tuple[object, List[str]]],
+        fresh: Dict[_SeriesKey, Tuple[object, List[str]]],
+        cache_key: _SeriesKey,
+        value: float,
+        sample_name: str,
+    ) -> None:
+        cached = cache.get(cache_key)
+        if cached is not None and cached[0] == value:
+            lines = cached[1]
+        else:
+            lines = [f"{sample_name}{_format_labels(cache_key[2])} {_format_value(value)}"]
+        fresh[cache_key] = (value, lines)
+        out.extend(lines)
+
+
+def _format_exemplar(exemplar: Exemplar) -> str:
+    return f" # {_format_labels(exemplar.labels) or '{}'} {_format_value(exemplar.value)} {exemplar.timestamp:.3f}"
+
+
+def _histogram_lines(
+    name: str,
+    key: _LabelKey,
+    bounds: Tuple[float, ...],
+    series: HistogramSeries,
+    openmetrics: bool,
+) -> List[str]:
+    lines = []
+    exemplars = series.exemplars if openmetrics else None
+    for index, (bound, count) in enumerate(zip(bounds, series.buckets)):
+        line = f"{name}_bucket{_format_labels(key + (('le', _format_le(bound)),))} {count}"
+        exemplar = exemplars[index] if exemplars is not None else None
+        if exemplar is not None:
+            line += _format_exemplar(exemplar)
+        lines.append(line)
+    labels = _format_labels(key)
+    lines.append(f"{name}_count{labels} {series.count}")
+    lines.append(f"{name}_sum{labels} {_format_value(series.sum)}")
+    return lines
+
+
+def _accepts_openmetrics(accept: str) -> bool:
+    return "application/openmetrics-text" in accept.lower()
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip() == "gzip":
+            return params.replace(" ", "") not in {"q=0", "q=0.0"}
+    return False
 
 
 def mount_prometheus(app, registry: RegistryLike) -> None:  # noqa: ANN001 - FastAPI app instance
-    from fastapi import Response  # local import to avoid hard dependency at module load time
+    from fastapi import Header, Response  # local import to avoid hard dependency at module load time
+
+    renderer = PrometheusRenderer(registry)
+    last_gzip: Dict[str, Tuple[str, bytes]] = {}
 
     @app.get("/metrics", include_in_schema=False)
-    def _metrics() -> Response:
-        snapshot = registry.snapshot()
-        body = render_prometheus(snapshot)
-        return Response(body, media_type="text/plain; version=0.0.4")
+    def _metrics(accept: str = Header(default=""), accept_encoding: str = Header(default="")) -> Response:
+        openmetrics = _accepts_openmetrics(accept)
+        body = renderer.render(openmetrics=openmetrics)
+        media_type = OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+        if not _accepts_gzip(accept_encoding):
+            return Response(body, media_type=media_type)
+        # an idle registry renders the same text scrape after scrape; skip recompressing it
+        cached = last_gzip.get(media_type)
+        if cached is not None and cached[0] == body:
+            payload = cached[1]
+        else:
+            payload = gzip.compress(body.encode("utf-8"), compresslevel=6)
+            last_gzip[media_type] = (body, payload)
+        return Response(payload, media_type=media_type, headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+
+
+__all__ = [
+    "OPENMETRICS_CONTENT_TYPE",
+    "PROMETHEUS_CONTENT_TYPE",
+    "PrometheusRenderer",
+    "mount_prometheus",
+    "render_prometheus",
+]
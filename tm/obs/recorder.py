@@ -10,6 +10,8 @@ from .counters import Registry, _MetricsProxy
 from . import counters
 from tm.kstore import DEFAULT_KSTORE_URL, KStore, open_kstore
 
+_FLOW_EXEC_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 5000, float("inf")]
+
 
 @dataclass
 class Recorder:
@@ -47,6 +49,19 @@ class Recorder:
             labels["model"] = model
         self._registry.get_counter("flows_finished_total").inc(labels=labels)
 
+    def on_flow_exec(self, flow: str, status: str, exec_ms: float, run_id: str | None = None) -> None:
+        """Record a run's execution time; the run id becomes the bucket's ``trace_id`` exemplar."""
+
+        histogram = self._registry.get_histogram(
+            "tm_flow_exec_ms",
+            help="Flow run execution time in milliseconds",
+            buckets=_FLOW_EXEC_BUCKETS,
+        )
+        histogram.labels(flow=flow, status=status).observe(
+            max(0.0, float(exec_ms)),
+            exemplar={"trace_id": run_id} if run_id else None,
+        )
+
     def on_guard_block(self, rule: str, flow: str) -> None:
         labels = {"rule": rule, "flow": flow}
         self._registry.get_counter("tm_audit_guard_blocked_total").inc(labels=labels)
@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Dict, List, Tuple
 
@@ -10,6 +13,7 @@ from tm.storage.binlog import BinaryLogReader
 
 
 LabelKey = Tuple[Tuple[str, str], ...]
+_SeriesKey = Tuple[str, LabelKey]
 
 
 def _to_timestamp(value: datetime | float | int) -> float:
@@ -20,19 +24,32 @@ def _to_timestamp(value: datetime | float | int) -> float:
     return float(value)
 
 
-def load_window(dir_path: str, since: datetime | float | int, until: datetime | float | int) -> List[Dict[str, object]]:
-    since_ts = _to_timestamp(since)
-    until_ts = _to_timestamp(until)
-    reader = BinaryLogReader(dir_path)
+@dataclass
+class _WindowAggregate:
+    """Counters, gauges and histogram buckets aggregated over part of a window."""
 
-    counters: Dict[Tuple[str, LabelKey], float] = {}
-    gauges: Dict[Tuple[str, LabelKey], float] = {}
-    histograms: Dict[Tuple[str, LabelKey], Dict[str, float]] = {}
+    counters: Dict[_SeriesKey, float] = field(default_factory=dict)
+    gauges: Dict[_SeriesKey, float] = field(default_factory=dict)
+    histograms: Dict[_SeriesKey, Dict[str, float]] = field(default_factory=dict)
 
-    for etype, payload in reader.scan():
-        if etype != "MetricSample":
-            continue
-        data = json.loads(payload.decode("utf-8"))
+    def merge(self, later: "_WindowAggregate") -> None:
+        """Fold in an aggregate covering data written after this one."""
+
+        for key, total in later.counters.items():
+            self.counters[key] = self.counters.get(key, 0.0) + total
+        self.gauges.update(later.gauges)
+        for key, buckets in later.histograms.items():
+            hist = self.histograms.setdefault(key, {})
+            for bucket, total in buckets.items():
+                hist[bucket] = hist.get(bucket, 0.0) + total
+
+
+def _aggregate_segment(path: str, since_ts: float, until_ts: float) -> _WindowAggregate:
+    agg = _WindowAggregate()
+    reader = BinaryLogReader(os.path.dirname(path))
+    # type and time filters are pushed down to frame headers and the block index
+    for _, payload in reader.scan_segment(path, types=("MetricSample",), since=since_ts, until=until_ts):
+        data = json.loads(bytes(payload))
         ts = float(data.get("ts", 0.0))
         if ts < since_ts or ts > until_ts:
             continue
@@ -41,28 +58,63 @@ def load_window(dir_path: str, since: datetime | float | int, until: datetime |
         label_key: LabelKey = tuple(sorted((str(k), str(v)) for k, v in labels.items() if k != "le"))
         typ = data.get("type")
         value = float(data.get("value", 0.0))
+        key = (name, label_key)
 
         if typ == "counter":
-            counters[(name, label_key)] = counters.get((name, label_key), 0.0) + value
+            agg.counters[key] = agg.counters.get(key, 0.0) + value
         elif typ == "gauge":
-            gauges[(name, label_key)] = value
+            agg.gauges[key] = value
         elif typ == "hist":
             bucket = str(labels.get("le", "inf"))
-            key = (name, label_key)
-            hist = histograms.setdefault(key, {})
+            hist = agg.histograms.setdefault(key, {})
             hist[bucket] = hist.get(bucket, 0.0) + value
+    return agg
+
+
+def load_window(
+    dir_path: str,
+    since: datetime | float | int,
+    until: datetime | float | int,
+    *,
+    workers: int = 1,
+) -> List[Dict[str, object]]:
+    """Aggregate ``MetricSample`` records written between ``since`` and ``until``.
+
+    Segments are independent, so with ``workers > 1`` (or ``workers <= 0`` for
+    one per CPU) each segment is decoded and pre-aggregated in a separate
+    process and the partial results are merged in segment order.
+    """
+
+    since_ts = _to_timestamp(since)
+    until_ts = _to_timestamp(until)
+    segments = BinaryLogReader(dir_path).segments()
+
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(segments))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(
+                pool.map(_aggregate_segment, segments, [since_ts] * len(segments), [until_ts] * len(segments))
+            )
+    else:
+        partials = [_aggregate_segment(path, since_ts, until_ts) for path in segments]
+
+    total = _WindowAggregate()
+    for partial in partials:
+        total.merge(partial)
 
     entries: List[Dict[str, object]] = []
-    for (name, label_key), total in counters.items():
+    for (name, label_key), value in total.counters.items():
         entries.append(
             {
                 "type": "counter",
                 "name": name,
                 "labels": dict(label_key),
-                "value": total,
+                "value": value,
             }
         )
-    for (name, label_key), value in gauges.items():
+    for (name, label_key), value in total.gauges.items():
         entries.append(
             {
                 "type": "gauge",
@@ -71,8 +123,8 @@ def load_window(dir_path: str, since: datetime | float | int, until: datetime |
                 "value": value,
             }
         )
-    for (name, label_key), buckets in histograms.items():
-        for bucket, total in buckets.items():
+    for (name, label_key), buckets in total.histograms.items():
+        for bucket, bucket_total in buckets.items():
             labels = dict(label_key)
             labels["le"] = bucket
             entries.append(
@@ -80,7 +132,7 @@ def load_window(dir_path: str, since: datetime | float | int, until: datetime |
                     "type": "hist",
                     "name": name,
                     "labels": labels,
-                    "value": total,
+                    "value": bucket_total,
                 }
             )
 
@@ -0,0 +1,223 @@
+"""Metrics shared across processes through a spool directory.
+
+Every process that records metrics (e.g. each worker spawned by
+``TaskWorkerSupervisor``) publishes a snapshot of its registry into its own
+file under the spool directory. Readers -- the Prometheus endpoint, the
+supervisor -- merge those files with their local registry, so a scrape costs
+a directory read rather than an IPC round trip to every worker.
+
+Counters and histograms add up across processes. Gauges are per process,
+so merged gauges carry a ``process`` label naming the spool they came from.
+When a process exits, :func:`retire_spool` folds its counters and histograms
+into ``retired.metrics`` and drops its gauges, keeping fleet-wide counters
+monotonic across worker restarts.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from tm.obs import counters
+from tm.obs.counters import Counter, Gauge, Histogram, Registry, _MetricsProxy
+
+try:  # pragma: no cover - platform specific
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+SPOOL_SUFFIX = ".metrics"
+RETIRED_NAME = "retired"
+_LOCK_NAME = "spool.lock"
+
+RegistryLike = Union[Registry, _MetricsProxy]
+
+
+def dump_registry(registry: RegistryLike) -> Dict[str, Any]:
+    """Return a JSON-serialisable copy of *registry* that :func:`load_into` can merge."""
+
+    counter_list, gauge_list, histogram_list = registry.collect()
+    histograms: Dict[str, Any] = {}
+    for histogram in histogram_list:
+        totals = histogram.totals()
+        series = []
+        for key, buckets in histogram.samples().items():
+            running = 0.0
+            counts = []
+            for bucket in buckets:
+                counts.append(int(bucket.count - running))
+                running = bucket.count
+            total, count = totals.get(key, (0.0, 0))
+            series.append([list(key), counts, total, count])
+        histograms[histogram.name] = {"buckets": list(histogram.buckets), "series": series}
+    return {
+        "counters": {metric.name: [[list(key), value] for key, value in metric.samples()] for metric in counter_list},
+        "gauges": {metric.name: [[list(key), value] for key, value in metric.samples()] for metric in gauge_list},
+        "histograms": histograms,
+    }
+
+
+def load_into(registry: Registry, dump: Mapping[str, Any], *, process: Optional[str] = None) -> None:
+    """Merge a :func:`dump_registry` payload into *registry*.
+
+    Counters and histograms are added. Gauges are set, labelled with
+    ``process`` when one is given.
+    """
+
+    for name, samples in (dump.get("counters") or {}).items():
+        counter = registry.get_counter(name)
+        for labels, value in samples:
+            counter.inc(float(value), labels=dict(labels))
+    for name, samples in (dump.get("gauges") or {}).items():
+        gauge = registry.get_gauge(name)
+        for labels, value in samples:
+            label_map = dict(labels)
+            if process is not None:
+                label_map["process"] = process
+            gauge.set(float(value), labels=label_map)
+    for name, payload in (dump.get("histograms") or {}).items():
+        bounds = payload.get("buckets") or []
+        histogram = registry.get_histogram(name, buckets=bounds)
+        for labels, counts, total, count in payload.get("series") or []:
+            histogram._absorb(dict(labels), bounds, counts, total, count)
+
+
+def _spool_path(dir_path: str, name: str) -> str:
+    return os.path.join(dir_path, name + SPOOL_SUFFIX)
+
+
+def _read_dump(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            payload = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _write_dump(path: str, dump: Mapping[str, Any]) -> None:
+    # readers only ever see a complete file: write aside, then rename over
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(dump, fh, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def _spool_lock(dir_path: str, exclusive: bool) -> Iterator[None]:
+    # retiring moves series between files; the lock keeps readers from counting them twice
+    fd = os.open(os.path.join(dir_path, _LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+
+class MetricsSpool:
+    """Writer for one process's file in the spool directory."""
+
+    def __init__(self, dir_path: str, name: str, registry: RegistryLike = counters.metrics) -> None:
+        if not name or name == RETIRED_NAME or os.sep in name:
+            raise ValueError(f"invalid spool name: {name!r}")
+        os.makedirs(dir_path, exist_ok=True)
+        self._dir = dir_path
+        self._name = name
+        self._registry = registry
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def publish(self) -> None:
+        """Replace this process's spool file with the current registry contents."""
+
+        dump = dump_registry(self._registry)
+        with self._lock:
+            _write_dump(_spool_path(self._dir, self._name), dump)
+
+
+def retire_spool(dir_path: str, name: str) -> None:
+    """Fold the spool of an exited process into ``retired.metrics`` and remove it."""
+
+    path = _spool_path(dir_path, name)
+    if not os.path.exists(path):
+        return
+    with _spool_lock(dir_path, exclusive=True):
+        dump = _read_dump(path)
+        if dump is not None:
+            retired = Registry()
+            previous = _read_dump(_spool_path(dir_path, RETIRED_NAME))
+            if previous is not None:
+                load_into(retired, previous)
+            load_into(retired, {"counters": dump.get("counters"), "histograms": dump.get("histograms")})
+            _write_dump(_spool_path(dir_path, RETIRED_NAME), dump_registry(retired))
+        os.unlink(path)
+
+
+def spool_names(dir_path: str) -> List[str]:
+    """Names of the live (not retired) spools in *dir_path*."""
+
+    try:
+        entries = os.listdir(dir_path)
+    except FileNotFoundError:
+        return []
+    names = [entry[: -len(SPOOL_SUFFIX)] for entry in entries if entry.endswith(SPOOL_SUFFIX)]
+    return sorted(name for name in names if name != RETIRED_NAME)
+
+
+def merge_spools(dir_path: str, local: Optional[RegistryLike] = None) -> Registry:
+    """Build a registry holding *local* plus every spool in *dir_path*."""
+
+    merged = Registry()
+    if local is not None:
+        load_into(merged, dump_registry(local))
+    if not os.path.isdir(dir_path):
+        return merged
+    with _spool_lock(dir_path, exclusive=False):
+        retired = _read_dump(_spool_path(dir_path, RETIRED_NAME))
+        if retired is not None:
+            load_into(merged, retired)
+        for name in spool_names(dir_path):
+            dump = _read_dump(_spool_path(dir_path, name))
+            if dump is not None:
+                load_into(merged, dump, process=name)
+    return merged
+
+
+class FleetMetrics:
+    """Registry-like view merging the local registry with a spool directory.
+
+    Pass it wherever an exporter takes a registry; every :meth:`snapshot`
+    re-reads the spools.
+    """
+
+    def __init__(self, dir_path: str, local: Optional[RegistryLike] = counters.metrics) -> None:
+        self._dir = dir_path
+        self._local = local
+
+    def registry(self) -> Registry:
+        return merge_spools(self._dir, self._local)
+
+    def collect(self) -> Tuple[List[Counter], List[Gauge], List[Histogram]]:
+        return self.registry().collect()
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return self.registry().snapshot()
+
+
+__all__ = [
+    "FleetMetrics",
+    "MetricsSpool",
+    "dump_registry",
+    "load_into",
+    "merge_spools",
+    "retire_spool",
+    "spool_names",
+]
@@ -0,0 +1,177 @@
+"""Fixed-memory quantile sketches for latency statistics."""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class QuantileSketch:
+    """DDSketch-style log-bucketed quantile estimator.
+
+    Values are mapped to logarithmic buckets so that every reported quantile is
+    within ``relative_accuracy`` of the true sample value. Memory is bounded by
+    ``max_buckets``: once exceeded, the lowest buckets are collapsed together,
+    which only degrades accuracy for the smallest values (never for the tail
+    quantiles callers usually care about).
+    """
+
+    __slots__ = (
+        "relative_accuracy",
+        "max_buckets",
+        "min_value",
+        "_gamma",
+        "_log_gamma",
+        "_buckets",
+        "_zero_count",
+        "count",
+        "sum",
+        "min",
+        "max",
+    )
+
+    def __init__(
+        self,
+        *,
+        relative_accuracy: float = 0.01,
+        max_buckets: int = 2048,
+        min_value: float = 1e-6,
+    ) -> None:
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        if max_buckets < 1:
+            raise ValueError("max_buckets must be positive")
+        self.relative_accuracy = float(relative_accuracy)
+        self.max_buckets = int(max_buckets)
+        self.min_value = float(min_value)
+        self._gamma = (1.0 + self.relative_accuracy) / (1.0 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        v = float(value)
+        if v != v:  # NaN
+            return
+        self.count += 1
+        self.sum += v
+        if v < self.min:
+            self.min = v
+        if v > self.max:
+            self.max = v
+        if v <= self.min_value:
+            self._zero_count += 1
+            return
+        idx = int(math.ceil(math.log(v) / self._log_gamma))
+        buckets = self._buckets
+        buckets[idx] = buckets.get(idx, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other._gamma != self._gamma:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        if other.count == 0:
+            return
+        for idx, cnt in other._buckets.items():
+            self._buckets[idx] = self._buckets.get(idx, 0) + cnt
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def copy(self) -> "QuantileSketch":
+        clone = QuantileSketch(
+            relative_accuracy=self.relative_accuracy,
+            max_buckets=self.max_buckets,
+            min_value=self.min_value,
+        )
+        clone.merge(self)
+        return clone
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated value at quantile ``q`` (0..1), or ``0.0`` when empty."""
+
+        if self.count == 0:
+            return 0.0
+        q = min(max(float(q), 0.0), 1.0)
+        rank = int(round(q * (self.count - 1)))
+        if rank < self._zero_count:
+            return self.min
+        seen = self._zero_count
+        estimate = self.max
+        for idx in sorted(self._buckets):
+            seen += self._buckets[idx]
+            if seen > rank:
+                estimate = 2.0 * math.pow(self._gamma, idx) / (self._gamma + 1.0)
+                break
+        return min(max(estimate, self.min), self.max)
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    @property
+    def bucket_count(self) -> int:
+        return len(self._buckets)
+
+    def _collapse(self) -> None:
+        ordered = sorted(self._buckets)
+        lowest, target = ordered[0], ordered[1]
+        self._buckets[target] += self._buckets.pop(lowest)
+
+
+class WindowedSketch:
+    """Sliding-window view over a ring of :class:`QuantileSketch` slices.
+
+    The window is split into ``slices`` equally sized sub-windows; samples
+    land in the current slice and expired slices are recycled, so memory is
+    bounded by ``slices`` sketches regardless of throughput.
+    """
+
+    def __init__(
+        self,
+        window_sec: float,
+        *,
+        slices: int = 6,
+        clock: Callable[[], float] = time.monotonic,
+        relative_accuracy: float = 0.01,
+        max_buckets: int = 2048,
+    ) -> None:
+        if window_sec <= 0:
+            raise ValueError("window_sec must be positive")
+        self.window_sec = float(window_sec)
+        self._slices = max(1, int(slices))
+        self._slice_sec = self.window_sec / self._slices
+        self._clock = clock
+        self._relative_accuracy = relative_accuracy
+        self._max_buckets = max_buckets
+        self._ring: List[Tuple[int, Optional[QuantileSketch]]] = [(-1, None)] * self._slices
+
+    def add(self, value: float) -> None:
+        epoch = int(self._clock() // self._slice_sec)
+        pos = epoch % self._slices
+        slot_epoch, sketch = self._ring[pos]
+        if slot_epoch != epoch or sketch is None:
+            sketch = QuantileSketch(relative_accuracy=self._relative_accuracy, max_buckets=self._max_buckets)
+            self._ring[pos] = (epoch, sketch)
+        sketch.add(value)
+
+    def merged(self) -> QuantileSketch:
+        epoch = int(self._clock() // self._slice_sec)
+        oldest = epoch - self._slices + 1
+        result = QuantileSketch(relative_accuracy=self._relative_accuracy, max_buckets=self._max_buckets)
+        for slot_epoch, sketch in self._ring:
+            if sketch is not None and oldest <= slot_epoch <= epoch:
+                result.merge(sketch)
+        return result
+
+
+__all__ = ["QuantileSketch", "WindowedSketch"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Any, Tuple
+from typing import Callable, Dict, Iterator, List, Any, Mapping, Optional, Tuple
+import copy
 import json
 import time
 from tm.obs.recorder import Recorder
@@ -29,18 +30,100 @@ class Plan:
     rules: List[Rule]
 
 
-@dataclass
+class ContextSnapshot(Mapping[str, Any]):
+    """Immutable, lazily decoded snapshot of a pipeline context.
+
+    The context is encoded once (the same JSON round-trip the pipeline has
+    always used for determinism) and only decoded when a consumer reads it;
+    the snapshot behaves as a read-only mapping of the decoded context. Sinks
+    that persist spans can use ``raw`` to splice the encoded bytes without
+    decoding them at all, provided the encoding is ``strict`` JSON.
+    """
+
+    __slots__ = ("_encoded", "_strict", "_value", "_decoded")
+
+    def __init__(self, encoded: str, *, strict: bool = True) -> None:
+        self._encoded = encoded
+        self._strict = strict
+        self._value: Any = None
+        self._decoded = False
+
+    @classmethod
+    def capture(cls, ctx: Any) -> "ContextSnapshot":
+        try:
+            return cls(json.dumps(ctx, allow_nan=False))
+        except ValueError:
+            # NaN/Infinity round-trip through json as before, but are not valid JSON to splice
+            return cls(json.dumps(ctx), strict=False)
+
+    @property
+    def raw(self) -> bytes:
+        return self._encoded.encode("utf-8")
+
+    @property
+    def strict(self) -> bool:
+        """Whether ``raw`` is standard JSON (no NaN/Infinity literals)."""
+
+        return self._strict
+
+    @property
+    def value(self) -> Any:
+        if not self._decoded:
+            self._value = json.loads(self._encoded)
+            self._decoded = True
+        return self._value
+
+    def __getitem__(self, key: str) -> Any:
+        return self.value[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.value)
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Any:
+        # dataclasses.asdict deep-copies field values; hand it the plain decoded context
+        return copy.deepcopy(self.value, memo)
+
+    def __repr__(self) -> str:
+        return f"ContextSnapshot({self._encoded[:64]!r}{'...' if len(self._encoded) > 64 else ''})"
+
+
+@dataclass(slots=True)
 class TraceSpan:
+    """Trace record for one executed step.
+
+    ``inputs``/``outputs`` are plain mappings or :class:`ContextSnapshot`
+    instances, which decode on first access only.
+    """
+
     rule: str
     step: str
     t0: float
     t1: float
-    inputs: Dict[str, Any]
-    outputs: Dict[str, Any]
+    inputs: Mapping[str, Any]
+    outputs: Mapping[str, Any]
     reads: List[str]
     writes: List[str]
     error: str | None = None
 
+    def inputs_raw(self) -> Optional[bytes]:
+        """Encoded inputs when the span carries a strict snapshot, else ``None``."""
+
+        return _raw(self.inputs)
+
+    def outputs_raw(self) -> Optional[bytes]:
+        """Encoded outputs when the span carries a strict snapshot, else ``None``."""
+
+        return _raw(self.outputs)
+
+
+def _raw(payload: Mapping[str, Any]) -> Optional[bytes]:
+    if isinstance(payload, ContextSnapshot) and payload.strict:
+        return payload.raw
+    return None
+
 
 class Pipeline:
     def __init__(self, plan: Plan, trace_sink: Callable[[TraceSpan], None]):
@@ -57,6 +140,10 @@ class Pipeline:
     def run(
         self, ctx: Dict[str, Any], changed_paths: List[Path], matcher: Callable[[str, Path], bool]
     ) -> Dict[str, Any]:
+        # The snapshot taken after a step doubles as the next step's inputs, so
+        # each step costs a single encode and nothing is decoded unless a sink
+        # reads the span payloads.
+        current: ContextSnapshot | None = None
         for rule in self.plan.rules:
             if not self._match_any(rule.triggers, changed_paths, matcher):
                 continue
@@ -64,13 +151,20 @@ class Pipeline:
                 spec = self.plan.steps[step_name]
                 t0 = time.time()
                 err = None
-                # deep copy via JSON for determinism
-                before = json.loads(json.dumps(ctx))
+                before = current if current is not None else ContextSnapshot.capture(ctx)
                 try:
                     ctx = spec.fn(ctx)
                 except Exception as ex:
                     err = f"{type(ex).__name__}: {ex}"
                 t1 = time.time()
+                outputs: Mapping[str, Any]
+                try:
+                    current = outputs = ContextSnapshot.capture(ctx)
+                except (TypeError, ValueError):
+                    # not JSON-encodable: record the live ctx as before; only a following step's
+                    # input copy needs the encoding, and raises there as it always has
+                    current = None
+                    outputs = ctx
                 self.trace_sink(
                     TraceSpan(
                         rule=rule.name,
@@ -78,7 +172,7 @@ class Pipeline:
                         t0=t0,
                         t1=t1,
                         inputs=before,
-                        outputs=ctx,
+                        outputs=outputs,
                         reads=spec.reads,
                         writes=spec.writes,
                         error=err,
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import orjson
-from .engine import TraceSpan
+from typing import Any, Mapping
+
+from .engine import ContextSnapshot, TraceSpan
 from tm.storage.binlog import BinaryLogWriter
 
 
@@ -19,9 +21,21 @@ class PipelineTraceSink:
             "reads": span.reads,
             "writes": span.writes,
             "error": span.error,
-            "inputs": span.inputs,
-            "outputs": span.outputs,
         }
-        self.writer.append_many([("PipelineTrace", orjson.dumps(payload))])
+        inputs_raw = span.inputs_raw()
+        outputs_raw = span.outputs_raw()
+        if inputs_raw is not None and outputs_raw is not None:
+            # splice the pre-encoded snapshots instead of decoding and re-encoding them
+            body = orjson.dumps(payload)[:-1] + b',"inputs":' + inputs_raw + b',"outputs":' + outputs_raw + b"}"
+        else:
+            payload["inputs"] = _plain(span.inputs)
+            payload["outputs"] = _plain(span.outputs)
+            body = orjson.dumps(payload)
+        self.writer.append_many([("PipelineTrace", body)])
         # fsync cadence is handled by the global writer in the HTTP loop; if used standalone, you may
         # consider exposing a flush window as well.
+
+
+def _plain(payload: Mapping[str, Any]) -> Any:
+    # orjson only encodes real dicts; it writes NaN/Infinity as null
+    return payload.value if isinstance(payload, ContextSnapshot) else payload
@@ -6,6 +6,8 @@ from .queue import (
     LeasedTask,
     InMemoryWorkQueue,
     FileWorkQueue,
+    PartitionedWorkQueue,
+    SharedMemoryWorkQueue,
 )
 from .queue.manager import TaskQueueManager, ManagedLease, EnqueueOutcome
 from .dlq import DeadLetterStore, DeadLetterRecord
@@ -33,6 +35,8 @@ __all__ = [
     "LeasedTask",
     "InMemoryWorkQueue",
     "FileWorkQueue",
+    "PartitionedWorkQueue",
+    "SharedMemoryWorkQueue",
     "TaskQueueManager",
     "ManagedLease",
     "EnqueueOutcome",
@@ -1,10 +1,23 @@
 from .base import LeasedTask, WorkQueue
 from .memory import InMemoryWorkQueue
 from .file import FileWorkQueue
+from .partitioned import PartitionedWorkQueue, open_file_queue
+from .shm import SharedMemoryWorkQueue
+from .notify import QueueNotifier, QueueWakeListener
+from .scheduling import FairReadyQueue
+from .stats import QueueStats, read_queue_stats
 
 __all__ = [
     "LeasedTask",
     "WorkQueue",
     "InMemoryWorkQueue",
     "FileWorkQueue",
+    "PartitionedWorkQueue",
+    "open_file_queue",
+    "SharedMemoryWorkQueue",
+    "QueueNotifier",
+    "QueueWakeListener",
+    "FairReadyQueue",
+    "QueueStats",
+    "read_queue_stats",
 ]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import abc
 from dataclasses import dataclass
-from typing import Any, Mapping, Optional, Sequence
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 
 @dataclass(frozen=True)
@@ -22,6 +22,14 @@ class WorkQueue(abc.ABC):
     def put(self, task: Mapping[str, Any]) -> int:
         """Enqueue *task* and return its monotonic offset."""
 
+    def put_many(self, tasks: Iterable[Mapping[str, Any]]) -> List[int]:
+        """Enqueue *tasks* in order and return their offsets.
+
+        Backends override this to allocate offsets and persist the batch in
+        one step; the default simply calls :meth:`put` per task.
+        """
+        return [self.put(task) for task in tasks]
+
     @abc.abstractmethod
     def lease(self, count: int, lease_ms: int) -> Sequence[LeasedTask]:
         """Lease up to *count* tasks for *lease_ms* milliseconds."""
@@ -30,6 +38,20 @@ class WorkQueue(abc.ABC):
     def ack(self, offset: int, token: str) -> None:
         """Acknowledge the task identified by *offset* for the active lease *token*."""
 
+    def ack_many(self, items: Iterable[Tuple[int, str]]) -> None:
+        """Acknowledge several ``(offset, token)`` pairs, sharing durability work where possible."""
+        for offset, token in items:
+            self.ack(offset, token)
+
+    def extend_lease(self, offset: int, token: str, lease_ms: int) -> Optional[float]:
+        """Push the deadline of the active lease *token* to *lease_ms* from now.
+
+        Returns the new deadline (monotonic), or ``None`` when the lease is no
+        longer held, e.g. it was acked or expired and was handed to another
+        consumer. Backends that cannot extend leases return ``None``.
+        """
+        return None
+
     @abc.abstractmethod
     def nack(self, offset: int, token: str, *, requeue: bool = True) -> None:
         """Reject the task, optionally requeueing it for another consumer."""
@@ -54,6 +76,16 @@ class WorkQueue(abc.ABC):
     def close(self) -> None:
         """Release any resources held by the queue."""
 
+    def refresh(self) -> None:
+        """Pick up work persisted by other processes. No-op for single-process queues."""
+
+    def open_wakeup(self) -> Optional[Any]:
+        """Return a listener (with ``fileno()``/``drain()``/``close()``) that becomes readable on enqueue.
+
+        ``None`` means the backend has no wake-up channel and consumers poll.
+        """
+        return None
+
     def checkpoint(self) -> None:
         """Optional hook for graceful drain implementations."""
         self.flush()
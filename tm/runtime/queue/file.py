@@ -3,12 +3,13 @@ from __future__ import annotations
 import json
 import os
 import re
-import heapq
+import struct
+import sys
 import threading
 import time
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Dict, Mapping, MutableMapping, Optional, Sequence
+from typing import Any, BinaryIO, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 import logging
 
 try:  # pragma: no cover - platform specific
@@ -21,10 +22,18 @@ try:  # pragma: no cover - windows fallback
 except ModuleNotFoundError:  # pragma: no cover
     msvcrt = None  # type: ignore[assignment]
 
+from tm.storage.binlog import MAGIC as _FRAME_MAGIC, FrameError, decode_frame, encode_frame
+
 from .base import LeasedTask, WorkQueue
+from .notify import QueueNotifier, QueueWakeListener
+from .scheduling import FairReadyQueue, share_key, task_priority
+from .stats import QueueStatsFile
 
 LOGGER = logging.getLogger("tm.runtime.queue.file")
 _LOCK_SUFFIX = ".lock"
+_ACK_SUFFIX = ".ack"
+# one big-endian int64 offset per acknowledged record
+_ACK_RECORD = struct.Struct(">q")
 
 
 def _env_flag(name: str, *, default: bool = False) -> bool:
@@ -34,17 +43,134 @@ def _env_flag(name: str, *, default: bool = False) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
-_SEGMENT_RE = re.compile(r"segment-(\d{6})\.log$")
+_SEGMENT_RE = re.compile(r"segment-(\d{6})\.(?:log|bin)$")
+_JSONL_SUFFIX = ".log"
+_BINARY_SUFFIX = ".bin"
+_SEGMENT_FORMATS = {"jsonl": _JSONL_SUFFIX, "binary": _BINARY_SUFFIX}
+# binary segments: one binlog frame per task, payload = offset, scheduled_at, priority and
+# share key length, then the share key and the task JSON
+_SCHED_TASK_FRAME = "task2"
+_SCHED_TASK_HEAD = struct.Struct(">qdiH")
+# lease claims shared by every instance: offset, owner, wall-clock deadline (0 releases the claim)
+_CLAIMS_NAME = "queue.claims"
+_CLAIM_RECORD = struct.Struct(">qQd")
+_CLAIMS_COMPACT_BYTES = 1 << 20
 
 
 @dataclass
 class _FileEntry:
-    task: Mapping[str, Any]
+    task: Optional[Mapping[str, Any]]
     segment_seq: int
     available_at: float
     lease_deadline: float = 0.0
     token: str | None = None
     acked: bool = False
+    raw: Optional[bytes] = None  # undecoded task JSON from a binary segment
+    share: str = ""
+    priority: int = 0
+
+    def load_task(self) -> Mapping[str, Any]:
+        if self.task is None:
+            try:
+                decoded = json.loads(self.raw or b"{}")
+            except ValueError:
+                decoded = {}
+            self.task = decoded if isinstance(decoded, Mapping) else {}
+            self.raw = None
+        return self.task
+
+
+@dataclass
+class _SegmentRecord:
+    offset: int
+    size: int
+    task: Optional[Mapping[str, Any]]
+    raw: Optional[bytes]
+    available_at: float
+    share: str
+    priority: int
+
+    def entry(self, segment_seq: int) -> _FileEntry:
+        return _FileEntry(
+            task=self.task,
+            raw=self.raw,
+            segment_seq=segment_seq,
+            available_at=self.available_at,
+            share=self.share,
+            priority=self.priority,
+        )
+
+
+def _task_record(offset: int, size: int, task: Mapping[str, Any]) -> _SegmentRecord:
+    share = sys.intern(share_key(task))
+    return _SegmentRecord(offset, size, task, None, _extract_available_at(task), share, task_priority(task))
+
+
+def _encode_binary_record(offset: int, payload: Mapping[str, Any]) -> bytes:
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    share = share_key(payload).encode("utf-8")[:0xFFFF]
+    head = _SCHED_TASK_HEAD.pack(offset, _scheduled_at(payload), task_priority(payload), len(share))
+    return encode_frame(_SCHED_TASK_FRAME, head + share + body)
+
+
+def _parse_jsonl_records(data: bytes, *, final: bool) -> Tuple[List[_SegmentRecord], int]:
+    """Parse JSONL segment bytes; returns the records and how many bytes were complete lines."""
+
+    complete = data.rfind(b"\n") + 1
+    records: List[_SegmentRecord] = []
+    # a trailing partial line is still being written, unless the caller knows no writer is active
+    for line in (data if final else data[:complete]).splitlines(keepends=True):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            offset = int(record["offset"])
+        except (ValueError, KeyError, TypeError):
+            continue
+        raw_task = record.get("task")
+        task: Mapping[str, Any] = raw_task if isinstance(raw_task, Mapping) else {}
+        records.append(_task_record(offset, len(line), task))
+    return records, complete
+
+
+def _parse_binary_records(data: bytes, *, final: bool) -> Tuple[List[_SegmentRecord], int]:
+    """Decode binary segment frames; returns the records and where the next read should start.
+
+    Task JSON is kept as bytes until the task is leased; its scheduling
+    class and priority are read from the frame head. A frame that fails
+    its checksum is skipped by resynchronising on the next frame marker. A
+    frame cut off at the end is still being appended unless ``final`` says
+    no writer is active, in which case it is a torn write and is skipped too;
+    the returned position is then the end of the last intact frame.
+    """
+
+    view = memoryview(data)
+    records: List[_SegmentRecord] = []
+    pos = good = 0
+    while pos < len(data):
+        try:
+            frame = decode_frame(view, pos, len(data))
+        except FrameError:
+            frame = None
+        else:
+            if frame is None and not final:
+                return records, pos
+        if frame is None:
+            pos = data.find(_FRAME_MAGIC, pos + 1)
+            if pos < 0:
+                break
+            continue
+        etype, payload, end = frame
+        if etype == _SCHED_TASK_FRAME and len(payload) >= _SCHED_TASK_HEAD.size:
+            offset, scheduled_at, priority, share_len = _SCHED_TASK_HEAD.unpack_from(payload)
+            body = _SCHED_TASK_HEAD.size + share_len
+            share = sys.intern(str(payload[_SCHED_TASK_HEAD.size : body], "utf-8"))
+            available_at = _available_from_scheduled(scheduled_at)
+            records.append(
+                _SegmentRecord(offset, end - pos, None, bytes(payload[body:]), available_at, share, priority)
+            )
+        pos = good = end
+    return records, good
 
 
 @dataclass
@@ -58,6 +184,20 @@ class _FileSegment:
     record_count: int
     pending: int
     acked: set[int] = field(default_factory=set)
+    journal_records: int = 0
+    ack_fp: Optional[BinaryIO] = None
+    # how far refresh() has read the log and ack journal, for records written by other processes
+    tail_bytes: int = 0
+    journal_pos: int = 0
+    index_mtime_ns: int = 0
+
+    @property
+    def binary(self) -> bool:
+        return self.path.endswith(_BINARY_SUFFIX)
+
+    @property
+    def ack_path(self) -> str:
+        return os.path.splitext(self.index_path)[0] + _ACK_SUFFIX
 
     def add_record(self, offset: int, size: int) -> None:
         if self.record_count == 0:
@@ -108,6 +248,159 @@ def _locked_path(path: str):
         fh.close()
 
 
+def _read_ack_journal(path: str) -> tuple[set[int], int]:
+    """Return the offsets recorded in an ack journal and its length in whole records."""
+
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read()
+    except FileNotFoundError:
+        return set(), 0
+    usable = len(raw) - len(raw) % _ACK_RECORD.size
+    offsets = {value for (value,) in _ACK_RECORD.iter_unpack(raw[:usable]) if value >= 0}
+    return offsets, usable
+
+
+def _index_mtime_ns(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _read_index_acked(path: str) -> set[int]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except (OSError, ValueError):
+        return set()
+    values = raw.get("acked", []) if isinstance(raw, dict) else []
+    acked: set[int] = set()
+    for value in values if isinstance(values, list) else []:
+        if isinstance(value, int) and value >= 0:
+            acked.add(value)
+    return acked
+
+
+class _LeaseClaims:
+    """Which instance holds the lease on each offset, shared through ``queue.claims``.
+
+    Leases otherwise live only in each instance's memory, so two processes
+    that see the same record would both hand it out. Every lease, renewal
+    and requeue appends a fixed-size record under a flock; each instance
+    tails the file to keep its view of live claims current. Once the file
+    grows past ``_CLAIMS_COMPACT_BYTES`` it is rewritten with only the
+    unexpired claims, and readers notice the new inode and reread it.
+    """
+
+    def __init__(self, dir_path: str, owner: int) -> None:
+        self._path = os.path.join(dir_path, _CLAIMS_NAME)
+        self._lock_path = self._path + _LOCK_SUFFIX
+        self._owner = owner
+        self._inode: Optional[int] = None
+        self._pos = 0
+        self._claims: Dict[int, Tuple[int, float]] = {}
+
+    def claim(self, offsets: Sequence[int], deadline: float, now: float) -> Dict[int, float]:
+        """Claim *offsets* until *deadline*; returns the ones held elsewhere, with their deadlines."""
+
+        with _locked_path(self._lock_path):
+            self._catch_up()
+            busy = self._live_elsewhere(offsets, now)
+            self._append([(offset, deadline) for offset in offsets if offset not in busy], now)
+        return busy
+
+    def changed(self) -> bool:
+        """Whether another instance wrote claims since this one last read them."""
+
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return self._inode is not None
+        return stat.st_ino != self._inode or stat.st_size != self._pos
+
+    def held_elsewhere(self, offsets: Iterable[int], now: float) -> Dict[int, float]:
+        """The *offsets* another instance holds a live claim on, with their deadlines."""
+
+        with _locked_path(self._lock_path):
+            self._catch_up()
+            return self._live_elsewhere(offsets, now)
+
+    def renew(self, offset: int, deadline: float, now: float) -> bool:
+        """Move this instance's claim on *offset* to *deadline*; false if another instance holds it."""
+
+        with _locked_path(self._lock_path):
+            self._catch_up()
+            if self._live_elsewhere([offset], now):
+                return False
+            self._append([(offset, deadline)], now)
+        return True
+
+    def release(self, offsets: Sequence[int]) -> None:
+        with _locked_path(self._lock_path):
+            self._catch_up()
+            mine = [offset for offset in offsets if self._claims.get(offset, (self._owner,))[0] == self._owner]
+            self._append([(offset, 0.0) for offset in mine], time.time())
+
+    def _live_elsewhere(self, offsets: Iterable[int], now: float) -> Dict[int, float]:
+        busy: Dict[int, float] = {}
+        for offset in offsets:
+            held = self._claims.get(offset)
+            if held is not None and held[0] != self._owner and held[1] > now:
+                busy[offset] = held[1]
+        return busy
+
+    def _catch_up(self) -> None:
+        # caller holds the claims flock
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            self._inode, self._pos = None, 0
+            self._claims.clear()
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._pos:
+            self._inode, self._pos = stat.st_ino, 0
+            self._claims.clear()
+        usable = stat.st_size - (stat.st_size - self._pos) % _CLAIM_RECORD.size
+        if usable <= self._pos:
+            return
+        with open(self._path, "rb") as fh:
+            fh.seek(self._pos)
+            raw = fh.read(usable - self._pos)
+        self._pos += len(raw)
+        self._apply(_CLAIM_RECORD.iter_unpack(raw))
+
+    def _apply(self, records: Iterable[Tuple[int, int, float]]) -> None:
+        for offset, owner, deadline in records:
+            if deadline > 0:
+                self._claims[offset] = (owner, deadline)
+            elif self._claims.get(offset, (owner,))[0] == owner:
+                self._claims.pop(offset, None)
+
+    def _append(self, claims: Sequence[Tuple[int, float]], now: float) -> None:
+        # caller holds the claims flock and has caught up
+        if not claims:
+            return
+        records = [(offset, self._owner, deadline) for offset, deadline in claims]
+        if self._pos >= _CLAIMS_COMPACT_BYTES:
+            self._apply(records)
+            live = [(offset, owner, deadline) for offset, (owner, deadline) in self._claims.items() if deadline > now]
+            tmp_path = f"{self._path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as fh:
+                fh.write(b"".join(_CLAIM_RECORD.pack(*record) for record in live))
+            os.replace(tmp_path, self._path)
+            self._claims = {offset: (owner, deadline) for offset, owner, deadline in live}
+            stat = os.stat(self._path)
+            self._inode, self._pos = stat.st_ino, stat.st_size
+            return
+        with open(self._path, "ab") as fh:
+            fh.write(b"".join(_CLAIM_RECORD.pack(*record) for record in records))
+            self._pos = fh.tell()
+            if self._inode is None:
+                self._inode = os.fstat(fh.fileno()).st_ino
+        self._apply(records)
+
+
 def _fsync_parent(path: str) -> None:
     """Best-effort fsync of the directory containing *path*."""
 
@@ -125,7 +418,34 @@ def _fsync_parent(path: str) -> None:
 
 
 class FileWorkQueue(WorkQueue):
-    """File-backed segmented queue with leases and ack/nack support."""
+    """File-backed segmented queue with leases and ack/nack support.
+
+    Acknowledgements are appended to a per-segment ``.ack`` journal of
+    fixed-size offset records and made durable with a shared (group-commit)
+    fsync. The JSON ``.idx`` file is a checkpoint of acked offsets, rewritten
+    only every ``ack_checkpoint_records`` acks and on flush/close; reopening
+    replays the checkpoint plus the journal.
+
+    Each instance keeps its own in-memory view; :meth:`refresh` folds in
+    records and acks persisted by other processes since the last load, and
+    :meth:`open_wakeup` lets consumers sleep until a producer enqueues.
+    Leases are claimed in the shared ``queue.claims`` file, so instances
+    that see the same record never lease it at the same time, and
+    :meth:`extend_lease` keeps other instances from taking a task over.
+
+    ``segment_format`` (default ``$TM_FILE_QUEUE_FORMAT`` or ``"jsonl"``)
+    picks how new segments are written: ``segment-N.log`` JSON lines, or
+    ``segment-N.bin`` binlog frames whose task JSON is only decoded when the
+    task is leased. Both formats are always readable, so switching only
+    affects segments created afterwards; :meth:`migrate_segments` rewrites
+    the existing JSONL ones. ``notifier`` overrides the wake-up channel, which
+    defaults to a ``queue.wake`` pipe in ``dir_path``.
+
+    Leasing follows :class:`FairReadyQueue`: the ``priority`` header first,
+    then weighted turns across share classes (the ``tenant`` header, else the
+    flow id) with weights from ``share_weights``, so one flow's backlog does
+    not starve the others.
+    """
 
     def __init__(
         self,
@@ -133,20 +453,39 @@ class FileWorkQueue(WorkQueue):
         *,
         segment_max_bytes: int = 64 * 1024 * 1024,
         fsync_on_put: bool = False,
+        ack_checkpoint_records: int = 4096,
+        segment_format: Optional[str] = None,
+        notifier: Optional[QueueNotifier] = None,
+        share_weights: Optional[Mapping[str, float]] = None,
     ) -> None:
+        segment_format = segment_format or os.getenv("TM_FILE_QUEUE_FORMAT") or "jsonl"
+        if segment_format not in _SEGMENT_FORMATS:
+            raise ValueError(f"segment_format must be one of {sorted(_SEGMENT_FORMATS)}")
+        self._binary = segment_format == "binary"
         self._dir = dir_path
         self._v2_enabled = _env_flag("TM_FILE_QUEUE_V2")
         self._io_lock = threading.Lock()
         self._segment_max_bytes = max(segment_max_bytes, 1024)
         self._fsync_on_put = fsync_on_put or self._v2_enabled
+        self._ack_checkpoint_records = max(1, int(ack_checkpoint_records))
+        self._journal_lock = threading.Lock()
+        self._ack_cond = threading.Condition(threading.Lock())
+        self._ack_syncing = False
+        self._ack_written_seq = 0
+        self._ack_durable_seq = 0
+        self._dirty_journals: Dict[int, _FileSegment] = {}
+        self._notifier = notifier or QueueNotifier(self._dir)
         os.makedirs(self._dir, exist_ok=True)
         self._lock = threading.Lock()
         self._segments: list[_FileSegment] = []
         self._segments_by_seq: Dict[int, _FileSegment] = {}
         self._entries: Dict[int, _FileEntry] = {}
-        self._ready_heap: list[tuple[float, int]] = []
-        self._ready_set: set[int] = set()
+        self._ready = FairReadyQueue(share_weights)
         self._lease_seq = 0
+        self._owner = int.from_bytes(os.urandom(8), "big")
+        self._claims = _LeaseClaims(self._dir, self._owner)
+        # offsets skipped because another instance held them, until that claim is released or lapses
+        self._deferred: set[int] = set()
         self._next_offset = 0
         self._current_segment: _FileSegment | None = None
         self._meta_path = os.path.join(self._dir, "queue.meta")
@@ -157,55 +496,88 @@ class FileWorkQueue(WorkQueue):
         if self._current_segment is None:
             with self._io_lock:
                 self._rotate_segment_unlocked()
+        self._stats = QueueStatsFile(self._dir)
+        with self._lock:
+            now, wall = time.monotonic(), time.time()
+            held = self._claims.held_elsewhere(list(self._entries), wall)
+            for offset, deadline in held.items():
+                self._defer(offset, now + (deadline - wall))
+            backlog, oldest = len(self._entries), self._oldest_ready_wall()
+        # a full load sees every record, ack and claim: reset counters other processes' deltas may have skewed
+        self._stats.reseed(backlog, len(held), oldest)
 
     # ------------------------------------------------------------------
     # WorkQueue interface
     # ------------------------------------------------------------------
     def put(self, task: Mapping[str, Any]) -> int:
-        payload: Mapping[str, Any]
-        if isinstance(task, MutableMapping):
-            payload = dict(task)
-        else:
-            payload = task
+        return self.put_many([task])[0]
+
+    def put_many(self, tasks: Iterable[Mapping[str, Any]]) -> List[int]:
+        """Append *tasks* with one offset allocation and one locked write (and fsync) per segment."""
+
+        payloads = [dict(task) if isinstance(task, MutableMapping) else task for task in tasks]
+        if not payloads:
+            return []
         with self._io_lock:
             self._ensure_active_segment()
             segment = self._current_segment
             if segment is None:
                 raise RuntimeError("active segment missing after ensure")
-            offset = self._allocate_offset()
-            record = (
-                json.dumps(
-                    {
-                        "offset": offset,
-                        "task": payload,
-                        "enqueued_at": time.time(),
-                    },
-                    separators=(",", ":"),
-                ).encode("utf-8")
-                + b"\n"
-            )
-            if segment.size_bytes + len(record) > self._segment_max_bytes and segment.record_count > 0:
-                self._rotate_segment_unlocked()
-                segment = self._current_segment
-                if segment is None:
-                    raise RuntimeError("active segment missing after rotate")
-            with open(segment.path, "ab") as fp:
-                _lock_file(fp)
-                try:
-                    fp.write(record)
-                    if self._fsync_on_put:
-                        fp.flush()
-                        os.fsync(fp.fileno())
-                finally:
-                    _unlock_file(fp)
-            available_at = _extract_available_at(payload)
-            with self._lock:
+            first = self._allocate_offsets(len(payloads))
+            enqueued_at = time.time()
+            batch: List[Tuple[int, Mapping[str, Any], bytes]] = []
+            batch_bytes = 0
+            for idx, payload in enumerate(payloads):
+                offset = first + idx
+                record = self._encode_record(offset, payload, enqueued_at)
+                if segment.size_bytes + batch_bytes + len(record) > self._segment_max_bytes and (
+                    segment.record_count > 0 or batch
+                ):
+                    self._write_batch(segment, batch)
+                    batch, batch_bytes = [], 0
+                    self._rotate_segment_unlocked()
+                    segment = self._current_segment
+                    if segment is None:
+                        raise RuntimeError("active segment missing after rotate")
+                batch.append((offset, payload, record))
+                batch_bytes += len(record)
+            self._write_batch(segment, batch)
+            self._maybe_rotate_unlocked()
+        self._publish_stats(backlog=len(payloads))
+        self._notifier.notify(len(payloads))
+        return list(range(first, first + len(payloads)))
+
+    def _encode_record(self, offset: int, payload: Mapping[str, Any], enqueued_at: float) -> bytes:
+        if self._binary:
+            return _encode_binary_record(offset, payload)
+        record = {"offset": offset, "task": payload, "enqueued_at": enqueued_at}
+        return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    def _write_batch(self, segment: _FileSegment, batch: List[Tuple[int, Mapping[str, Any], bytes]]) -> None:
+        # caller holds self._io_lock
+        if not batch:
+            return
+        with open(segment.path, "ab") as fp:
+            _lock_file(fp)
+            try:
+                fp.write(b"".join(record for _, _, record in batch))
+                if self._fsync_on_put:
+                    fp.flush()
+                    os.fsync(fp.fileno())
+            finally:
+                _unlock_file(fp)
+        with self._lock:
+            for offset, payload, record in batch:
                 segment.add_record(offset, len(record))
-                entry = _FileEntry(task=payload, segment_seq=segment.seq, available_at=available_at)
-                self._entries[offset] = entry
+                available_at = _extract_available_at(payload)
+                self._entries[offset] = _FileEntry(
+                    task=payload,
+                    segment_seq=segment.seq,
+                    available_at=available_at,
+                    share=sys.intern(share_key(payload)),
+                    priority=task_priority(payload),
+                )
                 self._push_ready(offset, available_at)
-            self._maybe_rotate_unlocked()
-        return offset
 
     def lease(self, count: int, lease_ms: int) -> Sequence[LeasedTask]:
         if count <= 0:
@@ -214,48 +586,84 @@ class FileWorkQueue(WorkQueue):
         now = time.monotonic()
         leased: list[LeasedTask] = []
         with self._lock:
-            self._release_expired(now)
+            expired = self._release_expired(now)
+            if self._deferred and self._claims.changed():
+                self._retry_deferred(now)
             while len(leased) < count:
-                item = self._pop_ready(now)
-                if item is None:
-                    break
-                offset, available_at = item
-                if offset is None:
+                picked: List[int] = []
+                while len(leased) + len(picked) < count:
+                    item = self._pop_ready(now)
+                    if item is None:
+                        break
+                    picked.append(item[0])
+                if not picked:
                     break
-                entry = self._entries.get(offset)
-                if entry is None:
-                    continue
-                self._lease_seq += 1
-                token = f"lease-{self._lease_seq}"
-                entry.token = token
-                entry.lease_deadline = now + lease_delta
-                leased.append(
-                    LeasedTask(
-                        offset=offset,
-                        task=entry.task,
-                        lease_deadline=entry.lease_deadline,
-                        token=token,
+                wall = time.time()
+                busy = self._claims.claim(picked, wall + lease_delta, wall)
+                for offset in picked:
+                    entry = self._entries[offset]
+                    if offset in busy:
+                        self._defer(offset, now + max(0.0, busy[offset] - wall))
+                        continue
+                    self._deferred.discard(offset)
+                    self._lease_seq += 1
+                    token = f"lease-{self._owner:016x}-{self._lease_seq}"
+                    entry.token = token
+                    entry.lease_deadline = now + lease_delta
+                    leased.append(
+                        LeasedTask(
+                            offset=offset,
+                            task=entry.load_task(),
+                            lease_deadline=entry.lease_deadline,
+                            token=token,
+                        )
                     )
-                )
+        if leased or expired:
+            self._publish_stats(inflight=len(leased) - expired)
         return leased
 
     def ack(self, offset: int, token: str) -> None:
+        self.ack_many([(offset, token)])
+
+    def ack_many(self, items: Iterable[Tuple[int, str]]) -> None:
+        """Acknowledge several leases with one journal write per segment and one shared fsync."""
+
         with self._lock:
-            entry = self._entries.get(offset)
-            if entry is None:
-                return
-            if entry.token != token:
-                return
-            segment = self._segments_by_seq.get(entry.segment_seq)
-            if segment is None:
+            by_segment: Dict[int, List[int]] = {}
+            for offset, token in items:
+                entry = self._entries.get(offset)
+                if entry is None or entry.token != token:
+                    continue
+                segment = self._segments_by_seq.get(entry.segment_seq)
+                if segment is None:
+                    continue
+                segment.ack(offset)
+                entry.token = None
+                entry.lease_deadline = 0.0
+                entry.acked = True
+                self._entries.pop(offset, None)
+                by_segment.setdefault(segment.seq, []).append(offset)
+            if not by_segment:
                 return
-            segment.ack(offset)
-            entry.token = None
-            entry.lease_deadline = 0.0
-            entry.acked = True
-            self._entries.pop(offset, None)
-            self._persist_segment_state(segment)
-            self._maybe_compact_head()
+            seq = 0
+            for segment_seq, offsets in by_segment.items():
+                seq = self._record_acks(self._segments_by_seq[segment_seq], offsets)
+        self._commit_acks(seq)
+        acked = sum(len(offsets) for offsets in by_segment.values())
+        self._publish_stats(backlog=-acked, inflight=-acked)
+        self._maybe_compact_head()
+
+    def extend_lease(self, offset: int, token: str, lease_ms: int) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(offset)
+            if entry is None or entry.acked or entry.token != token:
+                return None
+            lease_delta = max(lease_ms, 0) / 1000.0
+            wall = time.time()
+            if not self._claims.renew(offset, wall + lease_delta, wall):
+                return None  # the lease lapsed and another instance has taken the task over
+            entry.lease_deadline = time.monotonic() + lease_delta
+            return entry.lease_deadline
 
     def nack(self, offset: int, token: str, *, requeue: bool = True) -> None:
         with self._lock:
@@ -274,6 +682,7 @@ class FileWorkQueue(WorkQueue):
                     available_at = now
                     entry.available_at = available_at
                 self._push_ready(offset, available_at)
+                self._claims.release([offset])
             else:
                 entry.acked = True
                 segment = self._segments_by_seq.get(entry.segment_seq)
@@ -281,8 +690,13 @@ class FileWorkQueue(WorkQueue):
                     return
                 segment.ack(offset)
                 self._entries.pop(offset, None)
-                self._persist_segment_state(segment)
-                self._maybe_compact_head()
+                seq = self._record_acks(segment, [offset])
+        if requeue:
+            self._publish_stats(inflight=-1)
+            return
+        self._commit_acks(seq)
+        self._publish_stats(backlog=-1, inflight=-1)
+        self._maybe_compact_head()
 
     def reschedule(self, offset: int, *, available_at: float) -> None:
         with self._lock:
@@ -325,11 +739,151 @@ class FileWorkQueue(WorkQueue):
             "oldest_available_at": oldest,
         }
 
+    def open_wakeup(self) -> Optional[QueueWakeListener]:
+        return self._notifier.listen()
+
+    def refresh(self) -> None:
+        """Load records and acks that other processes persisted since the last load or refresh."""
+
+        with self._io_lock, self._lock:
+            known = set(self._segments_by_seq)
+            for name in sorted(os.listdir(self._dir)):
+                match = _SEGMENT_RE.match(name)
+                if not match or int(match.group(1)) in known:
+                    continue
+                seq = int(match.group(1))
+                index_path = os.path.join(self._dir, f"segment-{seq:06d}.idx")
+                segment = self._build_segment_from_files(
+                    seq, os.path.join(self._dir, name), index_path, writers_active=True
+                )
+                self._segments.append(segment)
+                self._segments_by_seq[seq] = segment
+            self._segments.sort(key=lambda seg: seg.seq)
+            for segment in list(self._segments):
+                if not os.path.exists(segment.path):
+                    self._retire_segment(segment)
+                    continue
+                self._tail_segment(segment)
+                self._tail_acks(segment)
+
+    def _retire_segment(self, segment: _FileSegment) -> None:
+        # another process compacted it, which it only does once every record is acked
+        for offset in [off for off, entry in self._entries.items() if entry.segment_seq == segment.seq]:
+            self._entries.pop(offset, None)
+        if segment.ack_fp is not None:
+            with self._journal_lock:
+                segment.ack_fp.close()
+                segment.ack_fp = None
+        self._dirty_journals.pop(segment.seq, None)
+        self._segments.remove(segment)
+        self._segments_by_seq.pop(segment.seq, None)
+        if segment is self._current_segment:
+            self._current_segment = None  # the next put rotates to a fresh segment
+
+    def _tail_segment(self, segment: _FileSegment) -> None:
+        try:
+            size = os.path.getsize(segment.path)
+        except OSError:
+            return
+        if size <= segment.tail_bytes:
+            return
+        with open(segment.path, "rb") as fh:
+            fh.seek(segment.tail_bytes)
+            data = fh.read(size - segment.tail_bytes)
+        parse = _parse_binary_records if segment.binary else _parse_jsonl_records
+        records, consumed = parse(data, final=False)
+        segment.tail_bytes += consumed
+        for record in records:
+            if record.offset in self._entries or record.offset in segment.acked:
+                continue  # our own write, or already known
+            segment.add_record(record.offset, record.size)
+            self._entries[record.offset] = record.entry(segment.seq)
+            self._push_ready(record.offset, record.available_at)
+
+    def _tail_acks(self, segment: _FileSegment) -> None:
+        mtime_ns = _index_mtime_ns(segment.index_path)
+        try:
+            size = os.path.getsize(segment.ack_path)
+        except OSError:
+            size = 0
+        if mtime_ns != segment.index_mtime_ns or size < segment.journal_pos:
+            # a checkpoint happened: acks may have moved from the journal into the index
+            offsets = _read_index_acked(segment.index_path)
+            journaled, usable = _read_ack_journal(segment.ack_path)
+            offsets |= journaled
+            segment.index_mtime_ns = mtime_ns
+        elif size - segment.journal_pos >= _ACK_RECORD.size:
+            with open(segment.ack_path, "rb") as fh:
+                fh.seek(segment.journal_pos)
+                raw = fh.read(size - segment.journal_pos)
+            raw = raw[: len(raw) - len(raw) % _ACK_RECORD.size]
+            offsets = {value for (value,) in _ACK_RECORD.iter_unpack(raw)}
+            usable = segment.journal_pos + len(raw)
+        else:
+            return
+        segment.journal_pos = usable
+        for offset in offsets:
+            entry = self._entries.get(offset)
+            if entry is None or entry.segment_seq != segment.seq or entry.token is not None:
+                continue  # unknown here, or leased by this process (its own ack settles it)
+            segment.ack(offset)
+            self._entries.pop(offset, None)
+
+    def migrate_segments(self) -> int:
+        """Rewrite sealed JSONL segments in the binary format; returns how many were converted.
+
+        Offsets, ``.idx`` checkpoints and ack journals are keyed by segment
+        number and offset, so they carry over unchanged. Run it while no other
+        process has the queue open; their views still point at the old files.
+        """
+
+        converted = 0
+        with self._io_lock, self._lock:
+            for segment in self._segments:
+                if segment.binary or segment is self._current_segment:
+                    continue
+                with open(segment.path, "rb") as fh:
+                    records, _ = _parse_jsonl_records(fh.read(), final=True)
+                blob = b"".join(_encode_binary_record(record.offset, record.task or {}) for record in records)
+                target = os.path.splitext(segment.path)[0] + _BINARY_SUFFIX
+                tmp_path = target + ".tmp"
+                with open(tmp_path, "wb") as fh:
+                    fh.write(blob)
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                os.replace(tmp_path, target)
+                os.remove(segment.path)
+                _fsync_parent(target)
+                segment.path = target
+                segment.size_bytes = segment.tail_bytes = len(blob)
+                converted += 1
+        return converted
+
     def flush(self) -> None:
-        return
+        """Fold outstanding ack journals into their ``.idx`` checkpoints."""
+
+        with self._lock:
+            for segment in list(self._segments):
+                if segment.journal_records:
+                    self._checkpoint_segment(segment)
 
     def close(self) -> None:
-        return
+        self.flush()
+        with self._lock:
+            held = [offset for offset, entry in self._entries.items() if entry.token is not None]
+            if held:
+                # leases abandoned by this instance are free for others right away
+                self._claims.release(held)
+        if held:
+            # and stop counting as inflight
+            self._publish_stats(inflight=-len(held))
+        self._stats.close()
+        with self._lock, self._journal_lock:
+            for segment in self._segments:
+                if segment.ack_fp is not None:
+                    segment.ack_fp.close()
+                    segment.ack_fp = None
+            self._dirty_journals.clear()
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -343,6 +897,10 @@ class FileWorkQueue(WorkQueue):
                 continue
             seq = int(match.group(1))
             path = os.path.join(self._dir, name)
+            if seq in self._segments_by_seq:
+                # ".bin" sorts first: this ".log" was left behind by an interrupted migrate_segments()
+                os.remove(path)
+                continue
             index_path = os.path.join(self._dir, f"segment-{seq:06d}.idx")
             segment = self._build_segment_from_files(seq, path, index_path)
             self._segments.append(segment)
@@ -352,9 +910,9 @@ class FileWorkQueue(WorkQueue):
                 max_offset = segment.end_offset
         if max_offset >= 0:
             self._next_offset = max_offset + 1
-        if self._segments:
-            last = self._segments[-1]
-            self._open_segment_file(last, append=True)
+        if self._segments and self._segments[-1].binary == self._binary:
+            # a segment in the other format is left sealed and a new one is started
+            self._open_segment_file(self._segments[-1], append=True)
         return max_seq, max_offset
 
     def _load_index_metadata(self, index_path: str) -> tuple[set[int], bool]:
@@ -396,51 +954,50 @@ class FileWorkQueue(WorkQueue):
             acked.add(offset)
         return acked, needs_rewrite
 
-    def _build_segment_from_files(self, seq: int, path: str, index_path: str) -> _FileSegment:
+    def _build_segment_from_files(
+        self,
+        seq: int,
+        path: str,
+        index_path: str,
+        *,
+        writers_active: bool = False,
+    ) -> _FileSegment:
         index_missing = not os.path.exists(index_path)
         acked, needs_rewrite = self._load_index_metadata(index_path)
+        ack_path = os.path.splitext(index_path)[0] + _ACK_SUFFIX
+        journaled, journal_bytes = self._load_ack_journal(ack_path)
+        acked |= journaled
         if self._v2_enabled and index_missing:
             LOGGER.info("queue index %s missing; initializing", index_path)
         start_offset = self._next_offset
         end_offset = self._next_offset - 1
         record_count = 0
         pending = 0
+        records: List[_SegmentRecord] = []
         size_bytes = 0
-        observed_offsets: set[int] = set()
+        tail_bytes = 0
         try:
-            with open(path, "rb") as fh:
-                for line in fh:
-                    if not line.strip():
-                        size_bytes += len(line)
-                        continue
-                    size_bytes += len(line)
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    offset = int(data["offset"])
-                    observed_offsets.add(offset)
-                    if record_count == 0:
-                        start_offset = offset
-                    end_offset = offset
-                    record_count += 1
-                    raw_task = data.get("task")
-                    task_payload: Mapping[str, Any]
-                    if isinstance(raw_task, Mapping):
-                        task_payload = raw_task
-                    else:
-                        task_payload = {}
-                    if offset not in acked:
-                        pending += 1
-                        available_at = _extract_available_at(task_payload)
-                        self._entries[offset] = _FileEntry(
-                            task=task_payload,
-                            segment_seq=seq,
-                            available_at=available_at,
-                        )
-                        self._push_ready(offset, available_at)
+            if path.endswith(_BINARY_SUFFIX):
+                records, size_bytes, tail_bytes = self._read_binary_segment(path, writers_active=writers_active)
+            else:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+                records, tail_bytes = _parse_jsonl_records(data, final=not writers_active)
+                size_bytes = len(data)
         except FileNotFoundError:
             pass
+        observed_offsets: set[int] = set()
+        for record in records:
+            offset = record.offset
+            observed_offsets.add(offset)
+            if record_count == 0:
+                start_offset = offset
+            end_offset = offset
+            record_count += 1
+            if offset not in acked:
+                pending += 1
+                self._entries[offset] = record.entry(seq)
+                self._push_ready(offset, record.available_at)
         if acked:
             missing_offsets = acked - observed_offsets
             if missing_offsets:
@@ -462,11 +1019,53 @@ class FileWorkQueue(WorkQueue):
             record_count=record_count,
             pending=pending,
             acked=acked,
+            journal_records=journal_bytes // _ACK_RECORD.size,
+            tail_bytes=tail_bytes,
+            journal_pos=journal_bytes,
+            index_mtime_ns=_index_mtime_ns(index_path),
         )
         if self._v2_enabled and needs_rewrite:
-            self._persist_segment_state(segment)
+            self._checkpoint_segment(segment)
         return segment
 
+    def _read_binary_segment(self, path: str, *, writers_active: bool) -> Tuple[List[_SegmentRecord], int, int]:
+        """Return a binary segment's records, its size and the length of its intact prefix."""
+
+        if writers_active:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            records, consumed = _parse_binary_records(data, final=False)
+            return records, len(data), consumed
+        with open(path, "r+b") as fh:
+            # holding the writers' lock, a frame cut short can only come from a crashed writer
+            _lock_file(fh)
+            try:
+                fh.seek(0)
+                data = fh.read()
+                records, good = _parse_binary_records(data, final=True)
+                if good < len(data):
+                    LOGGER.warning("queue segment %s has %d torn bytes at its tail; truncating", path, len(data) - good)
+                    fh.truncate(good)
+            finally:
+                _unlock_file(fh)
+        return records, good, good
+
+    def _load_ack_journal(self, ack_path: str) -> tuple[set[int], int]:
+        offsets, usable = _read_ack_journal(ack_path)
+        try:
+            size = os.path.getsize(ack_path)
+        except OSError:
+            return offsets, usable
+        if size > usable:
+            # torn record from an interrupted append; keep later appends aligned
+            with open(ack_path, "r+b") as fh:
+                _lock_file(fh)
+                try:
+                    fh.truncate(usable)
+                finally:
+                    _unlock_file(fh)
+        return offsets, usable
+
     def _ensure_active_segment(self) -> None:
         if self._current_segment is None:
             self._rotate_segment_unlocked()
@@ -480,7 +1079,7 @@ class FileWorkQueue(WorkQueue):
 
     def _rotate_segment_unlocked(self) -> None:
         seq = self._allocate_segment_seq()
-        name = f"segment-{seq:06d}.log"
+        name = f"segment-{seq:06d}{_BINARY_SUFFIX if self._binary else _JSONL_SUFFIX}"
         path = os.path.join(self._dir, name)
         index_path = os.path.join(self._dir, f"segment-{seq:06d}.idx")
         segment = _FileSegment(
@@ -555,7 +1154,9 @@ class FileWorkQueue(WorkQueue):
             finally:
                 _unlock_file(fh)
 
-    def _allocate_offset(self) -> int:
+    def _allocate_offsets(self, count: int) -> int:
+        """Reserve ``count`` consecutive offsets and return the first."""
+
         path = self._offset_path
         with open(path, "r+b") as fh:
             _lock_file(fh)
@@ -563,7 +1164,7 @@ class FileWorkQueue(WorkQueue):
                 fh.seek(0)
                 data = fh.read().decode("utf-8").strip()
                 current = int(data) if data else 0
-                next_value = current + 1
+                next_value = current + count
                 fh.seek(0)
                 fh.write(str(next_value).encode("utf-8"))
                 fh.truncate()
@@ -573,26 +1174,35 @@ class FileWorkQueue(WorkQueue):
                 _unlock_file(fh)
 
     def _push_ready(self, offset: int, available_at: float) -> None:
-        if offset in self._ready_set:
-            return
-        heapq.heappush(self._ready_heap, (available_at, offset))
-        self._ready_set.add(offset)
+        entry = self._entries[offset]
+        self._ready.push(offset, available_at, entry.share, entry.priority)
 
     def _pop_ready(self, now: float) -> tuple[int, float] | None:
-        while self._ready_heap:
-            available_at, offset = heapq.heappop(self._ready_heap)
-            self._ready_set.discard(offset)
-            if available_at > now:
-                heapq.heappush(self._ready_heap, (available_at, offset))
-                self._ready_set.add(offset)
-                return None
-            entry = self._entries.get(offset)
-            if entry is None or entry.token is not None:
-                continue
-            return offset, available_at
-        return None
+        return self._ready.pop(now, self._is_ready)
 
-    def _release_expired(self, now: float) -> None:
+    def _is_ready(self, offset: int) -> bool:
+        entry = self._entries.get(offset)
+        return entry is not None and entry.token is None
+
+    def _retry_deferred(self, now: float) -> None:
+        # caller holds self._lock; requeues deferred tasks whose claim was released (nack) early
+        self._deferred = {offset for offset in self._deferred if offset in self._entries}
+        held = self._claims.held_elsewhere(sorted(self._deferred), time.time())
+        for offset in self._deferred - held.keys():
+            self._deferred.discard(offset)
+            entry = self._entries[offset]
+            if entry.token is None:
+                self._ready.discard(offset)
+                self._push_ready(offset, min(entry.available_at, now))
+
+    def _defer(self, offset: int, retry_at: float) -> None:
+        # caller holds self._lock; another instance holds the lease, look again once it could have lapsed
+        self._deferred.add(offset)
+        self._ready.discard(offset)
+        self._push_ready(offset, retry_at)
+
+    def _release_expired(self, now: float) -> int:
+        released = 0
         for offset, entry in list(self._entries.items()):
             if entry.token is None or entry.acked:
                 continue
@@ -600,11 +1210,100 @@ class FileWorkQueue(WorkQueue):
                 entry.token = None
                 entry.lease_deadline = 0.0
                 self._push_ready(offset, entry.available_at)
+                released += 1
+        return released
 
-    def _persist_segment_state(self, segment: _FileSegment) -> None:
+    def _oldest_ready_wall(self) -> Optional[float]:
+        # caller holds self._lock
+        available_at = self._ready.oldest(self._is_ready)
+        if available_at is None:
+            return None
+        return time.time() + (available_at - time.monotonic())
+
+    def _publish_stats(self, *, backlog: int = 0, inflight: int = 0) -> None:
+        with self._lock:
+            oldest = self._oldest_ready_wall()
+        self._stats.update(backlog=backlog, inflight=inflight, oldest_available_at=oldest)
+
+    def _journal_handle(self, segment: _FileSegment) -> BinaryIO:
+        fp = segment.ack_fp
+        if fp is None:
+            fp = open(segment.ack_path, "a+b", buffering=0)
+            segment.ack_fp = fp
+        return fp
+
+    def _record_acks(self, segment: _FileSegment, offsets: List[int]) -> int:
+        """Append ``offsets`` to the segment's ack journal; returns the commit sequence."""
+
+        # caller holds self._lock
+        fp = self._journal_handle(segment)
+        _lock_file(fp)
+        try:
+            fp.write(b"".join(_ACK_RECORD.pack(offset) for offset in offsets))
+        finally:
+            _unlock_file(fp)
+        segment.journal_records += len(offsets)
+        self._ack_written_seq += 1
+        self._dirty_journals[segment.seq] = segment
+        if segment.journal_records >= self._ack_checkpoint_records:
+            self._checkpoint_segment(segment)
+        return self._ack_written_seq
+
+    def _commit_acks(self, seq: int) -> None:
+        """Block until ack ``seq`` is fsynced, sharing the sync with concurrent ackers."""
+
+        with self._ack_cond:
+            while self._ack_durable_seq < seq and self._ack_syncing:
+                self._ack_cond.wait()
+            if self._ack_durable_seq >= seq:
+                return
+            self._ack_syncing = True
+        synced = 0
+        try:
+            with self._lock:
+                target = self._ack_written_seq
+                dirty = list(self._dirty_journals.values())
+                self._dirty_journals.clear()
+            with self._journal_lock:
+                for segment in dirty:
+                    fp = segment.ack_fp
+                    if fp is None:
+                        continue  # checkpointed and closed in the meantime
+                    try:
+                        os.fsync(fp.fileno())
+                    except OSError:
+                        pass
+            synced = target
+        finally:
+            with self._ack_cond:
+                self._ack_syncing = False
+                self._ack_durable_seq = max(self._ack_durable_seq, synced)
+                self._ack_cond.notify_all()
+
+    def _checkpoint_segment(self, segment: _FileSegment) -> None:
+        """Rewrite the ``.idx`` checkpoint from all known acks and reset the journal."""
+
+        # caller holds self._lock
+        with self._journal_lock:
+            fp = self._journal_handle(segment)
+            _lock_file(fp)
+            try:
+                # acks journaled or checkpointed by other processes are kept
+                journaled, _ = _read_ack_journal(segment.ack_path)
+                acked = segment.acked | journaled | _read_index_acked(segment.index_path)
+                self._persist_segment_state(segment, acked)
+                fp.truncate(0)
+            finally:
+                _unlock_file(fp)
+            segment.journal_records = 0
+            segment.journal_pos = 0
+            segment.index_mtime_ns = _index_mtime_ns(segment.index_path)
+            self._dirty_journals.pop(segment.seq, None)
+
+    def _persist_segment_state(self, segment: _FileSegment, acked: Optional[set[int]] = None) -> None:
         tmp_path = segment.index_path + ".tmp"
         data = {
-            "acked": sorted(segment.acked),
+            "acked": sorted(segment.acked if acked is None else acked),
             "start_offset": segment.start_offset,
             "end_offset": segment.end_offset,
             "record_count": segment.record_count,
@@ -630,7 +1329,8 @@ class FileWorkQueue(WorkQueue):
                 pass
 
     def _maybe_compact_head(self) -> None:
-        with self._io_lock:
+        # same lock order as put(): io lock, then state lock
+        with self._io_lock, self._lock:
             while self._segments:
                 head = self._segments[0]
                 if head.pending > 0:
@@ -649,18 +1349,34 @@ class FileWorkQueue(WorkQueue):
                     os.remove(head.index_path + _LOCK_SUFFIX)
                 except FileNotFoundError:
                     pass
+                with self._journal_lock:
+                    if head.ack_fp is not None:
+                        head.ack_fp.close()
+                        head.ack_fp = None
+                try:
+                    os.remove(head.ack_path)
+                except FileNotFoundError:
+                    pass
+                self._dirty_journals.pop(head.seq, None)
                 self._segments.pop(0)
                 self._segments_by_seq.pop(head.seq, None)
 
 
-def _extract_available_at(task: Mapping[str, Any]) -> float:
+def _scheduled_at(task: Mapping[str, Any]) -> float:
     try:
-        scheduled = float(task.get("scheduled_at", 0.0))
+        return float(task.get("scheduled_at", 0.0))
     except Exception:
-        scheduled = 0.0
+        return 0.0
+
+
+def _available_from_scheduled(scheduled: float) -> float:
     now_wall = time.time()
     now_monotonic = time.monotonic()
     if scheduled <= 0:
         return now_monotonic
     delay = max(0.0, scheduled - now_wall)
     return now_monotonic + delay
+
+
+def _extract_available_at(task: Mapping[str, Any]) -> float:
+    return _available_from_scheduled(_scheduled_at(task))
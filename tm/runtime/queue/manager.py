@@ -3,10 +3,11 @@ from __future__ import annotations
 import logging
 import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Mapping, Optional
+from dataclasses import dataclass, replace
+from typing import Any, Iterable, Mapping, Optional, Sequence
 
 from .base import WorkQueue
+from .scheduling import priority_label, share_key, task_priority
 from ..idempotency import IdempotencyResult, IdempotencyStore
 from ..task import TaskEnvelope
 from tm.obs import counters
@@ -14,6 +15,8 @@ from tm.obs import counters
 
 LOGGER = logging.getLogger("tm.queue.manager")
 
+_QUEUE_WAIT_BUCKETS = [10, 50, 100, 250, 500, 1000, 5000, 30000, float("inf")]
+
 
 @dataclass(frozen=True)
 class ManagedLease:
@@ -38,6 +41,14 @@ class EnqueueOutcome:
     cached_result: Optional[IdempotencyResult] = None
 
 
+@dataclass(frozen=True)
+class EnqueueRequest:
+    flow_id: str
+    input: Mapping[str, Any]
+    headers: Optional[Mapping[str, Any]] = None
+    trace: Optional[Mapping[str, Any]] = None
+
+
 class TaskQueueManager:
     """High-level helper that owns a work queue plus idempotency store."""
 
@@ -73,41 +84,75 @@ class TaskQueueManager:
         trace: Optional[Mapping[str, Any]] = None,
         idempotency_ttl: Optional[float] = None,
     ) -> EnqueueOutcome:
-        envelope = TaskEnvelope.new(flow_id=flow_id, input=input, headers=headers or {}, trace=trace or {})
-        idem_key = envelope.idempotency_key
-        composite = envelope.composite_key
+        request = EnqueueRequest(flow_id=flow_id, input=input, headers=headers, trace=trace)
+        return self.enqueue_many([request])[0]
 
-        if idem_key:
-            cached = self._idempotency.get(composite)
-            if cached is not None:
-                counters.metrics.get_counter(
-                    "tm_queue_idempo_hits_total",
-                    help="Idempotency cache hits",
-                ).inc(labels={"flow": flow_id})
-                return EnqueueOutcome(queued=False, envelope=None, cached_result=cached)
-            with self._lock:
-                existing_task = self._pending_keys.get(composite)
-                if existing_task is not None:
-                    return EnqueueOutcome(queued=False, envelope=None, cached_result=None)
-                self._pending_keys[composite] = envelope.task_id
-            self._store_envelope(envelope)
-            counters.metrics.get_counter(
+    def enqueue_many(self, requests: Sequence[EnqueueRequest]) -> list[EnqueueOutcome]:
+        """Enqueue several tasks, persisting the accepted ones with a single ``put_many``.
+
+        Idempotency is checked per request in order, so a key repeated within
+        the batch is only queued once.
+        """
+
+        outcomes: list[EnqueueOutcome] = []
+        accepted: list[TaskEnvelope] = []
+        for request in requests:
+            envelope = TaskEnvelope.new(
+                flow_id=request.flow_id,
+                input=request.input,
+                headers=request.headers or {},
+                trace=request.trace or {},
+            )
+            if envelope.idempotency_key:
+                composite = envelope.composite_key
+                cached = self._idempotency.get(composite)
+                if cached is not None:
+                    counters.metrics.get_counter(
+                        "tm_queue_idempo_hits_total",
+                        help="Idempotency cache hits",
+                    ).inc(labels={"flow": request.flow_id})
+                    outcomes.append(EnqueueOutcome(queued=False, envelope=None, cached_result=cached))
+                    continue
+                with self._lock:
+                    existing_task = self._pending_keys.get(composite)
+                    if existing_task is not None:
+                        outcomes.append(EnqueueOutcome(queued=False, envelope=None, cached_result=None))
+                        continue
+                    self._pending_keys[composite] = envelope.task_id
+            accepted.append(envelope)
+            outcomes.append(EnqueueOutcome(queued=True, envelope=envelope))
+        if accepted:
+            try:
+                self._store_envelopes(accepted)
+            except BaseException:
+                # nothing was queued: release the keys so a retry of these events is accepted
+                for envelope in accepted:
+                    self._clear_pending(envelope)
+                raise
+            enqueued = counters.metrics.get_counter(
                 "tm_queue_enqueued_total",
                 help="Total tasks enqueued",
-            ).inc(labels={"flow": flow_id})
-            return EnqueueOutcome(queued=True, envelope=envelope)
-        self._store_envelope(envelope)
-        counters.metrics.get_counter(
-            "tm_queue_enqueued_total",
-            help="Total tasks enqueued",
-        ).inc(labels={"flow": flow_id})
-        return EnqueueOutcome(queued=True, envelope=envelope)
+            )
+            for envelope in accepted:
+                enqueued.inc(labels={"flow": envelope.flow_id})
+        return outcomes
 
     def lease(self, count: int, lease_ms: int) -> list[ManagedLease]:
         leased = self._queue.lease(count, lease_ms)
         managed: list[ManagedLease] = []
+        now = time.time()
+        # time from due to leased, per scheduling class, to check fair-share and priority targets
+        queue_wait = counters.metrics.get_histogram(
+            "tm_queue_wait_ms",
+            help="Time from a task becoming due to being leased, in milliseconds",
+            buckets=_QUEUE_WAIT_BUCKETS,
+        )
         for item in leased:
             envelope = TaskEnvelope.from_dict(item.task)
+            queue_wait.observe(
+                max(0.0, (now - envelope.scheduled_at) * 1000.0),
+                labels={"class": share_key(item.task), "priority": priority_label(task_priority(item.task))},
+            )
             managed.append(
                 ManagedLease(
                     offset=item.offset,
@@ -123,20 +168,45 @@ class TaskQueueManager:
         return managed
 
     def ack(self, lease: ManagedLease, *, clear_pending: bool = True, record_metrics: bool = True) -> None:
-        self._queue.ack(lease.offset, lease.token)
+        self.ack_many([lease], clear_pending=clear_pending, record_metrics=record_metrics)
+
+    def ack_many(
+        self,
+        leases: Iterable[ManagedLease],
+        *,
+        clear_pending: bool = True,
+        record_metrics: bool = True,
+    ) -> None:
+        leases = list(leases)
+        if not leases:
+            return
+        self._queue.ack_many([(lease.offset, lease.token) for lease in leases])
         with self._lock:
-            if self._inflight > 0:
-                self._inflight -= 1
-            self._task_offsets.pop(lease.envelope.task_id, None)
-        if clear_pending:
-            self._clear_pending(lease.envelope)
-        if record_metrics:
-            counters.metrics.get_counter(
-                "tm_queue_acked_total",
-                help="Total tasks acknowledged",
-            ).inc(labels={"flow": lease.flow_id})
+            self._inflight = max(0, self._inflight - len(leases))
+            for lease in leases:
+                self._task_offsets.pop(lease.envelope.task_id, None)
+        for lease in leases:
+            if clear_pending:
+                self._clear_pending(lease.envelope)
+            if record_metrics:
+                counters.metrics.get_counter(
+                    "tm_queue_acked_total",
+                    help="Total tasks acknowledged",
+                ).inc(labels={"flow": lease.flow_id})
         self._record_queue_metrics()
 
+    def extend_lease(self, lease: ManagedLease, lease_ms: int) -> Optional[ManagedLease]:
+        """Renew *lease* for another *lease_ms*; ``None`` means it was lost and may run elsewhere."""
+
+        deadline = self._queue.extend_lease(lease.offset, lease.token, lease_ms)
+        counters.metrics.get_counter(
+            "tm_queue_lease_extensions_total",
+            help="Lease renewals for long-running tasks",
+        ).inc(labels={"flow": lease.flow_id, "result": "ok" if deadline is not None else "lost"})
+        if deadline is None:
+            return None
+        return replace(lease, deadline=deadline)
+
     def nack(self, lease: ManagedLease, *, requeue: bool = True) -> None:
         self._queue.nack(lease.offset, lease.token, requeue=requeue)
         with self._lock:
@@ -254,12 +324,15 @@ class TaskQueueManager:
                 self._pending_keys.pop(composite, None)
 
     def _store_envelope(self, envelope: TaskEnvelope) -> None:
-        payload = envelope.to_dict()
-        offset = self._queue.put(payload)
+        self._store_envelopes([envelope])
+
+    def _store_envelopes(self, envelopes: Sequence[TaskEnvelope]) -> None:
+        offsets = self._queue.put_many([envelope.to_dict() for envelope in envelopes])
         with self._lock:
-            self._task_offsets[envelope.task_id] = offset
-            if envelope.idempotency_key:
-                self._pending_keys.setdefault(envelope.composite_key, envelope.task_id)
+            for envelope, offset in zip(envelopes, offsets):
+                self._task_offsets[envelope.task_id] = offset
+                if envelope.idempotency_key:
+                    self._pending_keys.setdefault(envelope.composite_key, envelope.task_id)
         self._record_queue_metrics()
 
     def _record_queue_metrics(self) -> None:
@@ -284,4 +357,4 @@ class TaskQueueManager:
         ).set(inflight)
 
 
-__all__ = ["TaskQueueManager", "ManagedLease", "EnqueueOutcome"]
+__all__ = ["TaskQueueManager", "ManagedLease", "EnqueueOutcome", "EnqueueRequest"]
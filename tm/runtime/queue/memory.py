@@ -3,7 +3,7 @@ from __future__ import annotations
 import time
 import threading
 from dataclasses import dataclass
-from typing import Any, Dict, Mapping, MutableMapping, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 import heapq
 
 from .base import LeasedTask, WorkQueue
@@ -29,18 +29,20 @@ class InMemoryWorkQueue(WorkQueue):
         self._lease_seq = 0
 
     def put(self, task: Mapping[str, Any]) -> int:
-        payload: Mapping[str, Any]
-        if isinstance(task, MutableMapping):
-            payload = dict(task)
-        else:
-            payload = task
+        return self.put_many([task])[0]
+
+    def put_many(self, tasks: Iterable[Mapping[str, Any]]) -> List[int]:
+        payloads = [dict(task) if isinstance(task, MutableMapping) else task for task in tasks]
+        offsets: List[int] = []
         with self._lock:
-            offset = self._next_offset
-            self._next_offset += 1
-            available_at = _extract_available_at(payload)
-            self._entries[offset] = _Entry(task=payload, available_at=available_at)
-            heapq.heappush(self._ready, (available_at, offset))
-            return offset
+            for payload in payloads:
+                offset = self._next_offset
+                self._next_offset += 1
+                available_at = _extract_available_at(payload)
+                self._entries[offset] = _Entry(task=payload, available_at=available_at)
+                heapq.heappush(self._ready, (available_at, offset))
+                offsets.append(offset)
+        return offsets
 
     def lease(self, count: int, lease_ms: int) -> Sequence[LeasedTask]:
         if count <= 0:
@@ -73,16 +75,32 @@ class InMemoryWorkQueue(WorkQueue):
         return leased
 
     def ack(self, offset: int, token: str) -> None:
+        with self._lock:
+            self._ack_unlocked(offset, token)
+
+    def ack_many(self, items: Iterable[Tuple[int, str]]) -> None:
+        with self._lock:
+            for offset, token in items:
+                self._ack_unlocked(offset, token)
+
+    def _ack_unlocked(self, offset: int, token: str) -> None:
+        entry = self._entries.get(offset)
+        if entry is None or entry.acked:
+            return
+        if entry.token != token:
+            return
+        entry.acked = True
+        entry.token = None
+        entry.lease_deadline = 0.0
+        self._entries.pop(offset, None)
+
+    def extend_lease(self, offset: int, token: str, lease_ms: int) -> Optional[float]:
         with self._lock:
             entry = self._entries.get(offset)
-            if entry is None or entry.acked:
-                return
-            if entry.token != token:
-                return
-            entry.acked = True
-            entry.token = None
-            entry.lease_deadline = 0.0
-            self._entries.pop(offset, None)
+            if entry is None or entry.acked or entry.token != token:
+                return None
+            entry.lease_deadline = time.monotonic() + max(lease_ms, 0) / 1000.0
+            return entry.lease_deadline
 
     def nack(self, offset: int, token: str, *, requeue: bool = True) -> None:
         with self._lock:
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+import stat
+from typing import Optional
+
+_WAKE_NAME = "queue.wake"
+# a few bytes per batch is enough to wake every idle reader
+_MAX_WAKE_BYTES = 16
+
+
+class QueueWakeListener:
+    """Read end of a queue's wake-up pipe; readable whenever work was enqueued."""
+
+    def __init__(self, fd: int) -> None:
+        self._fd = fd
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def drain(self) -> None:
+        while True:
+            try:
+                if not os.read(self._fd, 4096):
+                    return
+            except BlockingIOError:
+                return
+            except OSError:
+                return
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class QueueNotifier:
+    """Wake-up channel for consumers of a queue directory, backed by a named pipe.
+
+    Consumers call :meth:`listen` to create the pipe and get a pollable
+    listener; producers call :meth:`notify` after persisting work. Notifying
+    never blocks: with no listener (or a full pipe) it is a no-op, and on
+    platforms without named pipes consumers fall back to polling.
+    """
+
+    def __init__(self, dir_path: str) -> None:
+        self.path = os.path.join(dir_path, _WAKE_NAME)
+
+    def listen(self) -> Optional[QueueWakeListener]:
+        mkfifo = getattr(os, "mkfifo", None)
+        if mkfifo is None:
+            return None
+        try:
+            mkfifo(self.path, 0o600)
+        except FileExistsError:
+            if not stat.S_ISFIFO(os.stat(self.path).st_mode):
+                return None
+        except OSError:
+            return None
+        # opened read-write so the pipe never reports EOF while no producer is attached
+        fd = os.open(self.path, os.O_RDWR | os.O_NONBLOCK)
+        return QueueWakeListener(fd)
+
+    def notify(self, count: int = 1) -> None:
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            return  # no pipe (ENOENT) or no listener attached (ENXIO)
+        try:
+            if stat.S_ISFIFO(os.fstat(fd).st_mode):
+                os.write(fd, b"\0" * max(1, min(count, _MAX_WAKE_BYTES)))
+        except OSError:
+            pass  # e.g. EAGAIN: the pipe already holds pending wake-ups
+        finally:
+            os.close(fd)
+
+
+__all__ = ["QueueNotifier", "QueueWakeListener"]
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .base import LeasedTask, WorkQueue
+from .file import _SEGMENT_RE, FileWorkQueue, _fsync_parent
+from .notify import QueueNotifier, QueueWakeListener
+
+try:  # pragma: no cover - platform specific
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+LAYOUT_NAME = "partitions.json"
+_CLAIM_NAME = "consumer.lock"
+_GIVE_BACK_SUFFIX = ".want"
+_GIVE_BACK_TTL_S = 30.0
+
+PartitionKey = Union[str, Callable[[Mapping[str, Any]], Any]]
+
+
+def _partition_dir(dir_path: str, index: int) -> str:
+    return os.path.join(dir_path, f"p{index:03d}")
+
+
+def read_partition_count(dir_path: str) -> Optional[int]:
+    """Return the partition count recorded in *dir_path*, or ``None`` for an unpartitioned queue."""
+
+    try:
+        with open(os.path.join(dir_path, LAYOUT_NAME), "r", encoding="utf-8") as fh:
+            layout = json.load(fh)
+    except FileNotFoundError:
+        return None
+    count = int(layout.get("partitions", 0)) if isinstance(layout, Mapping) else 0
+    if count <= 0:
+        raise ValueError(f"invalid partition layout in {dir_path}")
+    return count
+
+
+def partition_dirs(dir_path: str) -> Optional[List[str]]:
+    """Return the sub-queue directories of a partitioned queue, or ``None`` if it is not partitioned."""
+
+    count = read_partition_count(dir_path)
+    if count is None:
+        return None
+    return [_partition_dir(dir_path, index) for index in range(count)]
+
+
+def _listdir(dir_path: str) -> List[str]:
+    try:
+        return os.listdir(dir_path)
+    except FileNotFoundError:
+        return []
+
+
+def _record_partition_count(dir_path: str, partitions: int) -> int:
+    # link(2) publishes the complete file or fails, so concurrent openers agree on one count
+    os.makedirs(dir_path, exist_ok=True)
+    tmp_path = os.path.join(dir_path, f".{LAYOUT_NAME}.{uuid.uuid4().hex}")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump({"partitions": partitions}, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    try:
+        os.link(tmp_path, os.path.join(dir_path, LAYOUT_NAME))
+    except FileExistsError:
+        pass
+    else:
+        _fsync_parent(os.path.join(dir_path, LAYOUT_NAME))
+    finally:
+        os.unlink(tmp_path)
+    return read_partition_count(dir_path) or partitions
+
+
+class _PartitionClaim:
+    """Exclusive ``flock`` marking the one consumer currently leasing from a partition.
+
+    Consuming a partition from one process at a time keeps per-key order.
+    An owner that finds its partition taken touches a ``.want`` sidecar to ask
+    the holder for it back; the request lapses unless renewed within
+    ``_GIVE_BACK_TTL_S``, so a crashed owner does not pin the partition.
+    Without ``fcntl`` claims always succeed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._want_path = path + _GIVE_BACK_SUFFIX
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)  # drops the flock
+            self._fd = None
+
+    def request(self) -> None:
+        """Ask the current holder to hand the partition back."""
+
+        with open(self._want_path, "a", encoding="utf-8"):
+            pass
+        os.utime(self._want_path)
+
+    def requested(self) -> bool:
+        try:
+            mtime = os.stat(self._want_path).st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - mtime < _GIVE_BACK_TTL_S
+
+    def withdraw(self) -> None:
+        try:
+            os.unlink(self._want_path)
+        except FileNotFoundError:
+            pass
+
+
+class PartitionedWorkQueue(WorkQueue):
+    """Work queue split into independent :class:`FileWorkQueue` partitions.
+
+    Tasks are routed by a stable hash (CRC32) of ``key`` -- the ``flow_id``
+    field by default, or any callable over the task -- so every task with
+    the same key lands in the same partition. Within a partition tasks are
+    leased in its scheduling order (priority, then fair share, then enqueue
+    order), not strictly in enqueue order. Partitions have their own segments, offset counter and locks, so
+    producers and workers touching different partitions do not contend.
+
+    A partition is leased from by one consumer at a time, which holds a
+    ``consumer.lock`` claim on it; that keeps per-key processing order across
+    worker processes. ``owned`` lists the partitions this consumer claims and
+    keeps; :meth:`lease` drains those first and, with ``steal`` enabled,
+    tops up the batch from unclaimed partitions (e.g. of a crashed or
+    restarting worker). A stolen partition is given back once it is drained,
+    or as soon as its in-flight tasks finish when its owner asks for it
+    back. Offsets
+    returned by the queue encode the partition as ``local * partitions +
+    index``.
+
+    The partition count is stored in ``partitions.json`` when the directory
+    is first created; reopening with a different count raises ``ValueError``
+    because it would re-route keys.
+    """
+
+    def __init__(
+        self,
+        dir_path: str,
+        *,
+        partitions: Optional[int] = None,
+        key: PartitionKey = "flow_id",
+        owned: Optional[Iterable[int]] = None,
+        steal: bool = True,
+        **queue_options: Any,
+    ) -> None:
+        existing = read_partition_count(dir_path)
+        if partitions is not None and partitions <= 0:
+            raise ValueError("partitions must be positive")
+        if existing is None:
+            if any(_SEGMENT_RE.match(name) for name in _listdir(dir_path)):
+                raise ValueError(f"{dir_path} already holds an unpartitioned queue")
+            existing = _record_partition_count(dir_path, partitions or 1)
+        if partitions is not None and partitions != existing:
+            raise ValueError(f"queue at {dir_path} has {existing} partitions, not {partitions}")
+        self._dir = dir_path
+        self._count = existing
+        self._key = key
+        self._steal = steal
+        self._notifier = QueueNotifier(dir_path)
+        self._partitions: List[FileWorkQueue] = [
+            FileWorkQueue(_partition_dir(dir_path, index), notifier=self._notifier, **queue_options)
+            for index in range(self._count)
+        ]
+        preferred = sorted({index % self._count for index in owned}) if owned is not None else []
+        self._owned = preferred or list(range(self._count))
+        self._others = [index for index in range(self._count) if index not in self._owned]
+        self._claims = [
+            _PartitionClaim(os.path.join(_partition_dir(dir_path, index), _CLAIM_NAME)) for index in range(self._count)
+        ]
+        self._cursor_lock = threading.Lock()
+        self._cursor = 0
+
+    @staticmethod
+    def owned_partitions(partitions: int, consumer_index: int, consumer_count: int) -> List[int]:
+        """Spread *partitions* round-robin over *consumer_count* consumers.
+
+        With more consumers than partitions, consumers share partitions.
+        """
+
+        consumer_count = max(1, consumer_count)
+        if consumer_count >= partitions:
+            return [consumer_index % partitions]
+        return [index for index in range(partitions) if index % consumer_count == consumer_index % consumer_count]
+
+    @property
+    def partitions(self) -> int:
+        return self._count
+
+    def partition_for(self, task: Mapping[str, Any]) -> int:
+        value = self._key(task) if callable(self._key) else task.get(self._key)
+        return zlib.crc32(str(value if value is not None else "").encode("utf-8")) % self._count
+
+    def _split(self, offset: int) -> Tuple[FileWorkQueue, int]:
+        local, index = divmod(offset, self._count)
+        return self._partitions[index], local
+
+    # ------------------------------------------------------------------
+    # WorkQueue interface
+    # ------------------------------------------------------------------
+    def put(self, task: Mapping[str, Any]) -> int:
+        return self.put_many([task])[0]
+
+    def put_many(self, tasks: Iterable[Mapping[str, Any]]) -> List[int]:
+        groups: Dict[int, List[Tuple[int, Mapping[str, Any]]]] = {}
+        count = 0
+        for position, task in enumerate(tasks):
+            groups.setdefault(self.partition_for(task), []).append((position, task))
+            count = position + 1
+        offsets: List[int] = [0] * count
+        for index, group in groups.items():
+            local_offsets = self._partitions[index].put_many([task for _, task in group])
+            for (position, _), local in zip(group, local_offsets):
+                offsets[position] = local * self._count + index
+        return offsets
+
+    def lease(self, count: int, lease_ms: int) -> Sequence[LeasedTask]:
+        if count <= 0:
+            return []
+        with self._cursor_lock:
+            start = self._cursor
+            self._cursor += 1
+        order = _rotate(self._owned, start)
+        if self._steal:
+            order += _rotate(self._others, start)
+        leased: List[LeasedTask] = []
+        for index in order:
+            queue = self._partitions[index]
+            claim = self._claims[index]
+            stolen = index in self._others
+            if not claim.held:
+                if stolen and claim.requested():
+                    continue  # its owner is waiting for it
+                if not claim.acquire():
+                    if not stolen:
+                        claim.request()  # ask whoever stole it to give it back
+                    continue
+                if not stolen:
+                    claim.withdraw()
+                queue.refresh()  # catch up with acks from the previous holder
+            if stolen and claim.requested():
+                # the owner wants it back: lease nothing new, release once our leases settle
+                if not queue.describe()["inflight"]:
+                    claim.release()
+                continue
+            batch = queue.lease(count - len(leased), lease_ms)
+            if not batch and stolen and not queue.describe()["inflight"]:
+                claim.release()  # drained: hand a stolen partition back
+            for task in batch:
+                leased.append(
+                    LeasedTask(
+                        offset=task.offset * self._count + index,
+                        task=task.task,
+                        lease_deadline=task.lease_deadline,
+                        token=task.token,
+                    )
+                )
+            if len(leased) >= count:
+                break
+        return leased
+
+    def ack(self, offset: int, token: str) -> None:
+        queue, local = self._split(offset)
+        queue.ack(local, token)
+
+    def ack_many(self, items: Iterable[Tuple[int, str]]) -> None:
+        groups: Dict[int, List[Tuple[int, str]]] = {}
+        for offset, token in items:
+            local, index = divmod(offset, self._count)
+            groups.setdefault(index, []).append((local, token))
+        for index, group in groups.items():
+            self._partitions[index].ack_many(group)
+
+    def extend_lease(self, offset: int, token: str, lease_ms: int) -> Optional[float]:
+        queue, local = self._split(offset)
+        return queue.extend_lease(local, token, lease_ms)
+
+    def nack(self, offset: int, token: str, *, requeue: bool = True) -> None:
+        queue, local = self._split(offset)
+        queue.nack(local, token, requeue=requeue)
+
+    def reschedule(self, offset: int, *, available_at: float) -> None:
+        queue, local = self._split(offset)
+        queue.reschedule(local, available_at=available_at)
+
+    def pending_count(self) -> int:
+        return sum(queue.pending_count() for queue in self._partitions)
+
+    def oldest_available_at(self) -> Optional[float]:
+        candidates = [queue.oldest_available_at() for queue in self._partitions]
+        present = [value for value in candidates if value is not None]
+        return min(present) if present else None
+
+    def describe(self) -> Mapping[str, Any]:
+        """Return aggregated occupancy plus a per-partition breakdown."""
+
+        parts = [queue.describe() for queue in self._partitions]
+        oldest = [part["oldest_available_at"] for part in parts if part["oldest_available_at"] is not None]
+        return {
+            "backlog": sum(int(part["backlog"]) for part in parts),
+            "pending": sum(int(part["pending"]) for part in parts),
+            "inflight": sum(int(part["inflight"]) for part in parts),
+            "oldest_available_at": min(oldest) if oldest else None,
+            "partitions": parts,
+        }
+
+    def open_wakeup(self) -> Optional[QueueWakeListener]:
+        return self._notifier.listen()
+
+    def refresh(self) -> None:
+        for queue in self._partitions:
+            queue.refresh()
+
+    def flush(self) -> None:
+        for queue in self._partitions:
+            queue.flush()
+
+    def close(self) -> None:
+        for queue in self._partitions:
+            queue.close()
+        for claim in self._claims:
+            claim.release()
+
+
+def _rotate(indexes: List[int], start: int) -> List[int]:
+    if not indexes:
+        return []
+    pivot = start % len(indexes)
+    return indexes[pivot:] + indexes[:pivot]
+
+
+def open_file_queue(
+    dir_path: str,
+    *,
+    partitions: Optional[int] = None,
+    owned: Optional[Iterable[int]] = None,
+    **queue_options: Any,
+) -> Union[FileWorkQueue, PartitionedWorkQueue]:
+    """Open the file-backed queue in *dir_path*, partitioned if it was created that way.
+
+    ``partitions > 1`` creates a partitioned layout in a new directory.
+    """
+
+    if read_partition_count(dir_path) is not None or (partitions or 1) > 1:
+        return PartitionedWorkQueue(dir_path, partitions=partitions, owned=owned, **queue_options)
+    return FileWorkQueue(dir_path, **queue_options)
+
+
+__all__ = [
+    "PartitionedWorkQueue",
+    "open_file_queue",
+    "partition_dirs",
+    "read_partition_count",
+]
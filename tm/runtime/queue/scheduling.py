@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+try:
+    import tomllib  # Python 3.11+
+except ModuleNotFoundError:  # pragma: no cover - fallback
+    import tomli as tomllib
+
+
+# priorities are stored as signed 32-bit ints in binary queue segments
+PRIORITY_MIN = -(2**31)
+PRIORITY_MAX = 2**31 - 1
+# tm_queue_wait_ms labels priorities beyond this with a sign bucket, keeping label cardinality bounded
+_PRIORITY_LABEL_SPAN = 10
+
+
+def share_key(task: Mapping[str, Any]) -> str:
+    """Fair-share class of a queued task: its ``tenant`` header, else its flow id."""
+
+    headers = task.get("headers")
+    if isinstance(headers, Mapping):
+        tenant = headers.get("tenant")
+        if isinstance(tenant, str) and tenant:
+            return tenant
+    flow_id = task.get("flow_id")
+    return flow_id if isinstance(flow_id, str) else ""
+
+
+def task_priority(task: Mapping[str, Any]) -> int:
+    """Priority from the ``priority`` header; higher runs first, default ``0``.
+
+    Values outside the signed 32-bit range are clamped to it.
+    """
+
+    headers = task.get("headers")
+    if not isinstance(headers, Mapping):
+        return 0
+    try:
+        priority = int(headers.get("priority", 0))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+    return min(max(priority, PRIORITY_MIN), PRIORITY_MAX)
+
+
+def priority_label(priority: int) -> str:
+    """Metric label for *priority*: the value itself within +/-10, else ``"high"`` or ``"low"``."""
+
+    if priority > _PRIORITY_LABEL_SPAN:
+        return "high"
+    if priority < -_PRIORITY_LABEL_SPAN:
+        return "low"
+    return str(priority)
+
+
+def load_share_weights(path: str | Path | None = None) -> Dict[str, float]:
+    """Read ``[queue.weights]`` (class -> weight) from ``trace_config.toml``-style config."""
+
+    config_path = Path(path) if path is not None else Path("trace_config.toml")
+    if not config_path.exists():
+        return {}
+    try:
+        with config_path.open("rb") as fh:
+            data = tomllib.load(fh)
+    except Exception:
+        return {}
+    queue = data.get("queue") if isinstance(data, Mapping) else None
+    raw = queue.get("weights") if isinstance(queue, Mapping) else None
+    if not isinstance(raw, Mapping):
+        return {}
+    weights: Dict[str, float] = {}
+    for key, value in raw.items():
+        try:
+            weight = float(value)
+        except (TypeError, ValueError):
+            continue
+        if weight > 0:
+            weights[str(key)] = weight
+    return weights
+
+
+@dataclass
+class _ShareClass:
+    weight: float
+    pass_: float = 0.0
+    version: int = 0
+    # (-priority, available_at, offset)
+    heap: List[Tuple[int, float, int]] = field(default_factory=list)
+
+
+class FairReadyQueue:
+    """Ready set that orders tasks by priority, then weighted fair share.
+
+    Higher priorities always go first. Among equal priorities, share classes
+    take turns in proportion to their weight (stride scheduling): each pop
+    advances the class's pass by ``1 / weight`` and the class with the
+    lowest pass goes next. A class re-entering after being empty starts at
+    the current virtual time, so it cannot bank credit while idle. Within a
+    class, tasks go in ``available_at`` order.
+
+    Entries are dropped lazily: ``is_ready`` tells :meth:`pop` whether an
+    offset is still waiting (not acked or leased meanwhile).
+    """
+
+    def __init__(self, weights: Optional[Mapping[str, float]] = None, *, default_weight: float = 1.0) -> None:
+        self._weights = {key: float(value) for key, value in (weights or {}).items() if float(value) > 0}
+        self._default_weight = default_weight if default_weight > 0 else 1.0
+        self._queued: Dict[int, float] = {}
+        # (available_at, offset, share, priority) until available
+        self._delayed: List[Tuple[float, int, str, int]] = []
+        self._by_time: List[Tuple[float, int]] = []
+        self._classes: Dict[str, _ShareClass] = {}
+        # (-top priority, pass, version, share); stale once the class version moves on
+        self._active: List[Tuple[int, float, int, str]] = []
+        self._vtime = 0.0
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __contains__(self, offset: int) -> bool:
+        return offset in self._queued
+
+    def push(self, offset: int, available_at: float, share: str, priority: int) -> None:
+        if offset in self._queued:
+            return
+        self._queued[offset] = available_at
+        heapq.heappush(self._delayed, (available_at, offset, share, priority))
+        heapq.heappush(self._by_time, (available_at, offset))
+
+    def discard(self, offset: int) -> None:
+        """Forget *offset*, e.g. to push it again with an earlier ``available_at``."""
+
+        self._queued.pop(offset, None)
+
+    def pop(self, now: float, is_ready: Callable[[int], bool]) -> Optional[Tuple[int, float]]:
+        """Remove and return ``(offset, available_at)`` of the next task due by *now*."""
+
+        self._promote(now)
+        while self._active:
+            _, _, version, share = heapq.heappop(self._active)
+            cls = self._classes.get(share)
+            if cls is None or cls.version != version:
+                continue
+            _, available_at, offset = heapq.heappop(cls.heap)
+            if self._queued.get(offset) != available_at:
+                self._activate(share, cls)
+                continue
+            del self._queued[offset]
+            if not is_ready(offset):
+                self._activate(share, cls)
+                continue
+            self._vtime = max(self._vtime, cls.pass_)
+            cls.pass_ += 1.0 / cls.weight
+            self._activate(share, cls)
+            return offset, available_at
+        return None
+
+    def oldest(self, is_ready: Callable[[int], bool]) -> Optional[float]:
+        """Earliest ``available_at`` among queued tasks, delayed ones included."""
+
+        heap = self._by_time
+        while heap:
+            available_at, offset = heap[0]
+            if self._queued.get(offset) == available_at and is_ready(offset):
+                return available_at
+            heapq.heappop(heap)
+        return None
+
+    def _promote(self, now: float) -> None:
+        delayed = self._delayed
+        while delayed and delayed[0][0] <= now:
+            available_at, offset, share, priority = heapq.heappop(delayed)
+            if self._queued.get(offset) != available_at:
+                continue
+            cls = self._classes.get(share)
+            if cls is None:
+                cls = _ShareClass(weight=self._weights.get(share, self._default_weight), pass_=self._vtime)
+                self._classes[share] = cls
+            item = (-priority, available_at, offset)
+            heapq.heappush(cls.heap, item)
+            if cls.heap[0] == item:
+                self._activate(share, cls)
+
+    def _activate(self, share: str, cls: _ShareClass) -> None:
+        self._seq += 1
+        cls.version = self._seq
+        if not cls.heap:
+            # drained; a class that comes back starts from the current virtual time
+            del self._classes[share]
+            return
+        heapq.heappush(self._active, (cls.heap[0][0], cls.pass_, cls.version, share))
+
+
+__all__ = [
+    "PRIORITY_MAX",
+    "PRIORITY_MIN",
+    "FairReadyQueue",
+    "load_share_weights",
+    "priority_label",
+    "share_key",
+    "task_priority",
+]
@@ -0,0 +1,690 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from .base import LeasedTask, WorkQueue
+from .file import _extract_available_at, _fsync_parent, _lock_file, _unlock_file
+from .notify import QueueNotifier, QueueWakeListener
+
+LOGGER = logging.getLogger("tm.runtime.queue.shm")
+
+_MAGIC = b"TMSHMQ02"
+# header: magic followed by int64 fields, addressed by the _H_* indexes below
+_HEADER = struct.Struct("<8s12q")
+_FIELD = struct.Struct("<q")
+_H_CAPACITY = 0
+_H_DATA_BYTES = 1
+_H_TAIL = 2  # next offset to allocate
+_H_DATA_HEAD = 3
+_H_DATA_TAIL = 4
+_H_LEASE_SEQ = 5
+_H_PENDING = 6  # occupied slots, leased or not
+_H_LOG_GEN = 7
+_H_LOG_BYTES = 8
+_H_READY_SIZE = 9
+_H_LEASED_SIZE = 10
+_H_DATA_LIVE = 11  # bytes of live payload records in the data ring
+
+# task offset N lives in slot N % capacity; a slot still held by an older task is skipped by new offsets
+# slot: state, offset, available_at, lease_deadline, lease id, payload position, payload length, heap index
+_SLOT = struct.Struct("<B7xqddqqq")
+_SLOT_SIZE = _SLOT.size + _FIELD.size
+_FREE = 0
+_READY = 1
+_LEASED = 2
+
+# two binary heaps of slot indexes: ready tasks by (available_at, offset), leases by (deadline, offset)
+_READY_HEAP = 0
+_LEASE_HEAP = 1
+
+# data ring record: owning offset and payload length, then the payload; offset -1 pads to the ring end
+_DATA_PREFIX = struct.Struct("<qq")
+
+# durability log record: kind, offset, payload length, payload, crc32 of the preceding bytes
+_LOG_HEAD = struct.Struct("<BqI")
+_LOG_CRC = struct.Struct("<I")
+_LOG_PUT = 1
+_LOG_ACK = 2
+
+_LOG_NAME = "shm-queue.log"
+_LOCK_NAME = "shm-queue.lock"
+
+
+def _segment_name(dir_path: str) -> str:
+    digest = hashlib.blake2b(os.path.abspath(dir_path).encode("utf-8"), digest_size=8).hexdigest()
+    return f"tm-q-{digest}"
+
+
+def _log_record(kind: int, offset: int, payload: bytes = b"") -> bytes:
+    head = _LOG_HEAD.pack(kind, offset, len(payload))
+    return head + payload + _LOG_CRC.pack(zlib.crc32(head + payload) & 0xFFFFFFFF)
+
+
+def _read_log(path: str) -> Tuple[Dict[int, bytes], int, int]:
+    """Replay a durability log into ``{offset: payload}`` of unacked records.
+
+    Returns the live records, the highest offset seen (``-1`` if none) and the
+    length of the intact prefix; anything after a torn or corrupt record is
+    ignored.
+    """
+
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read()
+    except FileNotFoundError:
+        return {}, -1, 0
+    live: Dict[int, bytes] = {}
+    max_offset = -1
+    pos = 0
+    while pos + _LOG_HEAD.size <= len(raw):
+        kind, offset, length = _LOG_HEAD.unpack_from(raw, pos)
+        end = pos + _LOG_HEAD.size + length
+        if end + _LOG_CRC.size > len(raw):
+            break
+        (crc,) = _LOG_CRC.unpack_from(raw, end)
+        if zlib.crc32(raw[pos:end]) & 0xFFFFFFFF != crc:
+            break
+        if kind == _LOG_PUT:
+            live[offset] = raw[pos + _LOG_HEAD.size : end]
+            max_offset = max(max_offset, offset)
+        elif kind == _LOG_ACK:
+            live.pop(offset, None)
+        pos = end + _LOG_CRC.size
+    return live, max_offset, pos
+
+
+class SharedMemoryWorkQueue(WorkQueue):
+    """Single-host queue kept in a ``multiprocessing.shared_memory`` block.
+
+    Every process that opens the same ``dir_path`` attaches to one shared
+    segment holding a ring of fixed-size slots (state, lease, availability)
+    and a byte ring with the JSON payloads, so a put in the producer is
+    visible to every worker without touching the filesystem. Updates are
+    serialised with an ``flock`` on a sidecar file in ``dir_path``. Two heaps
+    in the segment index ready tasks by availability and leases by deadline,
+    so leasing, acking and :meth:`describe` never walk the slots.
+
+    Puts and acks are also appended to ``shm-queue.log`` in ``dir_path``
+    (fsynced per batch when ``fsync`` is set). The segment outlives the
+    processes using it; when it is missing (after a reboot or
+    :meth:`unlink`) the first process to open the queue rebuilds it from the
+    log, renumbering unacked tasks after the highest offset it recorded. The
+    log is rewritten with only live records once it grows past
+    ``log_compact_bytes`` and is mostly acked.
+
+    ``capacity`` bounds the number of unacked tasks and ``data_bytes`` their
+    payloads; :meth:`put_many` raises :class:`RuntimeError` when either is
+    exhausted. A task that stays unacked (delayed, rescheduled or leased for
+    long) does not hold up the space behind it: new offsets skip its slot and
+    its payload is moved out of the way when the byte ring wraps. Both limits
+    are fixed by whichever process creates the segment; later openers use its
+    geometry.
+    """
+
+    def __init__(
+        self,
+        dir_path: str,
+        *,
+        capacity: int = 16_384,
+        data_bytes: int = 32 * 1024 * 1024,
+        fsync: bool = False,
+        log_compact_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if data_bytes <= 0:
+            raise ValueError("data_bytes must be positive")
+        self._dir = dir_path
+        os.makedirs(self._dir, exist_ok=True)
+        self._fsync = fsync
+        self._log_compact_bytes = max(1, int(log_compact_bytes))
+        self._log_path = os.path.join(self._dir, _LOG_NAME)
+        self._name = _segment_name(self._dir)
+        self._thread_lock = threading.Lock()
+        self._lock_fp = open(os.path.join(self._dir, _LOCK_NAME), "a+b")
+        self._log_fp: Optional[Any] = None
+        self._log_gen = -1
+        self._notifier = QueueNotifier(self._dir)
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        with self._locked():
+            self._shm = self._attach_or_create(int(capacity), int(data_bytes))
+        self._set_geometry(self._shm, self._get(_H_CAPACITY), self._get(_H_DATA_BYTES))
+
+    # ------------------------------------------------------------------
+    # WorkQueue interface
+    # ------------------------------------------------------------------
+    def put(self, task: Mapping[str, Any]) -> int:
+        return self.put_many([task])[0]
+
+    def put_many(self, tasks: Iterable[Mapping[str, Any]]) -> List[int]:
+        """Copy *tasks* into the shared rings and log them with one write."""
+
+        payloads = [dict(task) if isinstance(task, MutableMapping) else task for task in tasks]
+        if not payloads:
+            return []
+        encoded = [json.dumps(payload, separators=(",", ":")).encode("utf-8") for payload in payloads]
+        with self._locked():
+            if self._get(_H_PENDING) + len(encoded) > self._capacity:
+                raise RuntimeError("shared memory queue is full (capacity)")
+            sizes = [_DATA_PREFIX.size + len(data) for data in encoded]
+            if self._get(_H_DATA_LIVE) + sum(sizes) > self._data_bytes:
+                raise RuntimeError("shared memory queue is full (data_bytes)")
+            placements = self._place(sizes)
+            offsets: List[int] = []
+            tail = self._get(_H_TAIL)
+            for _ in encoded:
+                while self._slot_state(tail % self._capacity) != _FREE:
+                    tail += 1  # the slot is still held by an older task
+                offsets.append(tail)
+                tail += 1
+            self._append_log(b"".join(_log_record(_LOG_PUT, offset, data) for offset, data in zip(offsets, encoded)))
+            data_tail = self._get(_H_DATA_TAIL)
+            for offset, payload, data, pos in zip(offsets, payloads, encoded, placements):
+                self._pad(data_tail, pos)
+                self._write_data(pos, offset, data)
+                data_tail = pos + _DATA_PREFIX.size + len(data)
+                index = offset % self._capacity
+                self._write_slot(index, _READY, offset, _extract_available_at(payload), 0.0, 0, pos, len(data))
+                self._heap_push(_READY_HEAP, index)
+            self._set(_H_DATA_TAIL, data_tail)
+            self._set(_H_DATA_LIVE, self._get(_H_DATA_LIVE) + sum(sizes))
+            self._set(_H_TAIL, tail)
+            self._set(_H_PENDING, self._get(_H_PENDING) + len(encoded))
+        self._notifier.notify(len(encoded))
+        return offsets
+
+    def lease(self, count: int, lease_ms: int) -> Sequence[LeasedTask]:
+        if count <= 0:
+            return []
+        lease_delta = max(lease_ms, 0) / 1000.0
+        leased: List[LeasedTask] = []
+        with self._locked():
+            now = time.monotonic()
+            self._release_expired(now)
+            lease_seq = self._get(_H_LEASE_SEQ)
+            while len(leased) < count and self._get(_H_READY_SIZE):
+                index = self._heap_item(_READY_HEAP, 0)
+                _, offset, available_at, _, _, pos, length = _SLOT.unpack_from(self._buf, self._slot_pos(index))
+                if available_at > now:
+                    break
+                self._heap_remove(_READY_HEAP, index)
+                lease_seq += 1
+                lease_deadline = now + lease_delta
+                self._write_slot(index, _LEASED, offset, available_at, lease_deadline, lease_seq, pos, length)
+                self._heap_push(_LEASE_HEAP, index)
+                leased.append(
+                    LeasedTask(
+                        offset=offset,
+                        task=json.loads(self._read_payload(pos, length)),
+                        lease_deadline=lease_deadline,
+                        token=f"lease-{lease_seq}",
+                    )
+                )
+            self._set(_H_LEASE_SEQ, lease_seq)
+        return leased
+
+    def ack(self, offset: int, token: str) -> None:
+        self.ack_many([(offset, token)])
+
+    def ack_many(self, items: Iterable[Tuple[int, str]]) -> None:
+        items = list(items)
+        if not items:
+            return
+        with self._locked():
+            acked = [offset for offset, token in items if self._leased_slot(offset, token) is not None]
+            if not acked:
+                return
+            self._append_log(b"".join(_log_record(_LOG_ACK, offset) for offset in acked))
+            for offset in acked:
+                self._heap_remove(_LEASE_HEAP, offset % self._capacity)
+                self._free_slot(offset)
+            self._advance_data_head()
+            self._maybe_compact_log()
+
+    def extend_lease(self, offset: int, token: str, lease_ms: int) -> Optional[float]:
+        with self._locked():
+            slot = self._leased_slot(offset, token)
+            if slot is None:
+                return None
+            _, _, available_at, _, lease_id, pos, length = slot
+            deadline = time.monotonic() + max(lease_ms, 0) / 1000.0
+            index = offset % self._capacity
+            self._write_slot(index, _LEASED, offset, available_at, deadline, lease_id, pos, length)
+            self._heap_fix(_LEASE_HEAP, index)
+            return deadline
+
+    def nack(self, offset: int, token: str, *, requeue: bool = True) -> None:
+        with self._locked():
+            slot = self._leased_slot(offset, token)
+            if slot is None:
+                return
+            index = offset % self._capacity
+            self._heap_remove(_LEASE_HEAP, index)
+            if not requeue:
+                self._append_log(_log_record(_LOG_ACK, offset))
+                self._free_slot(offset)
+                self._advance_data_head()
+                self._maybe_compact_log()
+                return
+            _, _, available_at, _, _, pos, length = slot
+            self._write_slot(index, _READY, offset, max(available_at, time.monotonic()), 0.0, 0, pos, length)
+            self._heap_push(_READY_HEAP, index)
+
+    def reschedule(self, offset: int, *, available_at: float) -> None:
+        with self._locked():
+            slot = self._slot(offset)
+            if slot is None or slot[1] == _FREE:
+                return
+            _, state, _, deadline, lease_id, pos, length = slot
+            index = offset % self._capacity
+            self._write_slot(index, state, offset, available_at, deadline, lease_id, pos, length)
+            if state == _READY:
+                self._heap_fix(_READY_HEAP, index)
+
+    def pending_count(self) -> int:
+        with self._locked():
+            return self._get(_H_PENDING)
+
+    def oldest_available_at(self) -> Optional[float]:
+        with self._locked():
+            return self._oldest_ready()
+
+    def describe(self) -> Mapping[str, Any]:
+        """Return a lightweight snapshot of queue occupancy."""
+
+        with self._locked():
+            backlog = self._get(_H_PENDING)
+            pending = self._get(_H_READY_SIZE)
+            oldest = self._oldest_ready()
+        return {
+            "backlog": backlog,
+            "pending": pending,
+            "inflight": backlog - pending,
+            "oldest_available_at": oldest,
+        }
+
+    def open_wakeup(self) -> Optional[QueueWakeListener]:
+        return self._notifier.listen()
+
+    def flush(self) -> None:
+        with self._locked():
+            if self._log_fp is not None:
+                self._log_fp.flush()
+                os.fsync(self._log_fp.fileno())
+
+    def close(self) -> None:
+        with self._thread_lock:
+            if self._shm is None:
+                return
+            if self._log_fp is not None:
+                self._log_fp.close()
+                self._log_fp = None
+            self._buf = None  # type: ignore[assignment]
+            self._shm.close()
+            self._shm = None
+            self._lock_fp.close()
+
+    def unlink(self) -> None:
+        """Remove the shared segment; the next open rebuilds it from the durability log."""
+
+        try:
+            shared_memory.SharedMemory(name=self._name).unlink()
+        except FileNotFoundError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Segment setup and recovery
+    # ------------------------------------------------------------------
+    def _attach_or_create(self, capacity: int, data_bytes: int) -> shared_memory.SharedMemory:
+        # caller holds the file lock, so creation and recovery happen once
+        try:
+            shm = shared_memory.SharedMemory(name=self._name)
+        except FileNotFoundError:
+            shm = None
+        if shm is not None:
+            self._untrack(shm)
+            magic = bytes(shm.buf[: len(_MAGIC)])
+            if magic == _MAGIC:
+                self._buf = shm.buf
+                return shm
+            # a creator died before initialising the header, or the layout changed; start over
+            shm.close()
+            shm.unlink()
+        size = _HEADER.size + capacity * (_SLOT_SIZE + 2 * _FIELD.size) + data_bytes
+        shm = shared_memory.SharedMemory(name=self._name, create=True, size=size)
+        self._untrack(shm)
+        self._set_geometry(shm, capacity, data_bytes)
+        self._recover()
+        return shm
+
+    def _set_geometry(self, shm: shared_memory.SharedMemory, capacity: int, data_bytes: int) -> None:
+        self._buf = shm.buf
+        self._capacity = capacity
+        self._data_bytes = data_bytes
+        self._slots_at = _HEADER.size
+        self._heaps_at = self._slots_at + capacity * _SLOT_SIZE
+        self._data_at = self._heaps_at + 2 * capacity * _FIELD.size
+
+    @staticmethod
+    def _untrack(shm: shared_memory.SharedMemory) -> None:
+        # the segment is shared with unrelated processes; do not let the resource tracker unlink it on exit
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        except Exception:  # pragma: no cover - tracker unavailable
+            pass
+
+    def _recover(self) -> None:
+        live, max_offset, _ = _read_log(self._log_path)
+        first = max_offset + 1
+        data_live = sum(_DATA_PREFIX.size + len(data) for data in live.values())
+        if len(live) > self._capacity or data_live > self._data_bytes:
+            raise RuntimeError("shared memory queue too small for the tasks in its durability log")
+        _HEADER.pack_into(self._buf, 0, b"\0" * len(_MAGIC), *([0] * 12))
+        self._buf[self._slots_at : self._data_at] = bytes(self._data_at - self._slots_at)
+        self._set(_H_CAPACITY, self._capacity)
+        self._set(_H_DATA_BYTES, self._data_bytes)
+        offset = first
+        pos = 0
+        for data in live.values():
+            payload = json.loads(data)
+            self._write_data(pos, offset, data)
+            index = offset % self._capacity
+            self._write_slot(index, _READY, offset, _extract_available_at(payload), 0.0, 0, pos, len(data))
+            self._heap_push(_READY_HEAP, index)
+            offset += 1
+            pos += _DATA_PREFIX.size + len(data)
+        self._set(_H_TAIL, offset)
+        self._set(_H_DATA_TAIL, pos)
+        self._set(_H_DATA_LIVE, data_live)
+        self._set(_H_PENDING, len(live))
+        self._rewrite_log()
+        self._buf[: len(_MAGIC)] = _MAGIC
+        if live:
+            LOGGER.info("rebuilt shared memory queue %s with %d tasks from %s", self._name, len(live), self._log_path)
+
+    # ------------------------------------------------------------------
+    # Shared state helpers (caller holds the lock)
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._thread_lock:
+            _lock_file(self._lock_fp)
+            try:
+                yield
+            finally:
+                _unlock_file(self._lock_fp)
+
+    def _get(self, field: int) -> int:
+        return _FIELD.unpack_from(self._buf, len(_MAGIC) + field * _FIELD.size)[0]
+
+    def _set(self, field: int, value: int) -> None:
+        _FIELD.pack_into(self._buf, len(_MAGIC) + field * _FIELD.size, value)
+
+    def _slot_pos(self, index: int) -> int:
+        return self._slots_at + index * _SLOT_SIZE
+
+    def _slot_state(self, index: int) -> int:
+        return self._buf[self._slot_pos(index)]
+
+    def _slot(self, offset: int) -> Optional[Tuple[int, int, float, float, int, int, int]]:
+        if offset < 0:
+            return None
+        state, stored, available_at, deadline, lease_id, pos, length = _SLOT.unpack_from(
+            self._buf, self._slot_pos(offset % self._capacity)
+        )
+        if stored != offset or state == _FREE:
+            return None
+        return offset, state, available_at, deadline, lease_id, pos, length
+
+    def _write_slot(
+        self,
+        index: int,
+        state: int,
+        offset: int,
+        available_at: float,
+        deadline: float,
+        lease_id: int,
+        pos: int,
+        length: int,
+    ) -> None:
+        _SLOT.pack_into(self._buf, self._slot_pos(index), state, offset, available_at, deadline, lease_id, pos, length)
+
+    def _leased_slot(self, offset: int, token: str) -> Optional[Tuple[int, int, float, float, int, int, int]]:
+        slot = self._slot(offset)
+        if slot is None or slot[1] != _LEASED or token != f"lease-{slot[4]}":
+            return None
+        return slot
+
+    def _free_slot(self, offset: int) -> None:
+        index = offset % self._capacity
+        _, _, available_at, _, _, pos, length = _SLOT.unpack_from(self._buf, self._slot_pos(index))
+        self._write_slot(index, _FREE, offset, available_at, 0.0, 0, pos, length)
+        self._set(_H_PENDING, self._get(_H_PENDING) - 1)
+        self._set(_H_DATA_LIVE, self._get(_H_DATA_LIVE) - _DATA_PREFIX.size - length)
+
+    def _release_expired(self, now: float) -> None:
+        while self._get(_H_LEASED_SIZE):
+            index = self._heap_item(_LEASE_HEAP, 0)
+            _, offset, available_at, deadline, _, pos, length = _SLOT.unpack_from(self._buf, self._slot_pos(index))
+            if deadline > now:
+                return
+            self._heap_remove(_LEASE_HEAP, index)
+            self._write_slot(index, _READY, offset, available_at, 0.0, 0, pos, length)
+            self._heap_push(_READY_HEAP, index)
+
+    def _oldest_ready(self) -> Optional[float]:
+        if not self._get(_H_READY_SIZE):
+            return None
+        return _SLOT.unpack_from(self._buf, self._slot_pos(self._heap_item(_READY_HEAP, 0)))[2]
+
+    # ------------------------------------------------------------------
+    # Ready and lease heaps (caller holds the lock)
+    # ------------------------------------------------------------------
+    def _heap_item(self, heap: int, i: int) -> int:
+        return _FIELD.unpack_from(self._buf, self._heaps_at + (heap * self._capacity + i) * _FIELD.size)[0]
+
+    def _heap_place(self, heap: int, i: int, index: int) -> None:
+        _FIELD.pack_into(self._buf, self._heaps_at + (heap * self._capacity + i) * _FIELD.size, index)
+        _FIELD.pack_into(self._buf, self._slot_pos(index) + _SLOT.size, i)
+
+    def _heap_key(self, heap: int, index: int) -> Tuple[float, int]:
+        _, offset, available_at, deadline, _, _, _ = _SLOT.unpack_from(self._buf, self._slot_pos(index))
+        return (deadline if heap == _LEASE_HEAP else available_at), offset
+
+    def _heap_push(self, heap: int, index: int) -> None:
+        size = self._get(_H_READY_SIZE + heap)
+        self._set(_H_READY_SIZE + heap, size + 1)
+        self._heap_place(heap, size, index)
+        self._sift_up(heap, size)
+
+    def _heap_remove(self, heap: int, index: int) -> None:
+        i = _FIELD.unpack_from(self._buf, self._slot_pos(index) + _SLOT.size)[0]
+        last = self._get(_H_READY_SIZE + heap) - 1
+        self._set(_H_READY_SIZE + heap, last)
+        if i != last:
+            self._heap_place(heap, i, self._heap_item(heap, last))
+            self._sift_down(heap, self._sift_up(heap, i))
+
+    def _heap_fix(self, heap: int, index: int) -> None:
+        i = _FIELD.unpack_from(self._buf, self._slot_pos(index) + _SLOT.size)[0]
+        self._sift_down(heap, self._sift_up(heap, i))
+
+    def _sift_up(self, heap: int, i: int) -> int:
+        index = self._heap_item(heap, i)
+        key = self._heap_key(heap, index)
+        while i > 0:
+            parent = (i - 1) // 2
+            above = self._heap_item(heap, parent)
+            if self._heap_key(heap, above) <= key:
+                break
+            self._heap_place(heap, i, above)
+            i = parent
+        self._heap_place(heap, i, index)
+        return i
+
+    def _sift_down(self, heap: int, i: int) -> None:
+        size = self._get(_H_READY_SIZE + heap)
+        index = self._heap_item(heap, i)
+        key = self._heap_key(heap, index)
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            below = self._heap_item(heap, child)
+            below_key = self._heap_key(heap, below)
+            if child + 1 < size:
+                right = self._heap_item(heap, child + 1)
+                right_key = self._heap_key(heap, right)
+                if right_key < below_key:
+                    child, below, below_key = child + 1, right, right_key
+            if key <= below_key:
+                break
+            self._heap_place(heap, i, below)
+            i = child
+        self._heap_place(heap, i, index)
+
+    # ------------------------------------------------------------------
+    # Payload ring (caller holds the lock)
+    # ------------------------------------------------------------------
+    def _place(self, sizes: Sequence[int]) -> List[int]:
+        """Ring positions for records of *sizes*; repacks the ring when a live record at its head is in the way."""
+
+        for attempt in range(2):
+            data_head, pos = self._get(_H_DATA_HEAD), self._get(_H_DATA_TAIL)
+            placements: List[int] = []
+            for size in sizes:
+                pos = self._fit(pos, size)
+                placements.append(pos)
+                pos += size
+            if pos - data_head <= self._data_bytes:
+                return placements
+            if attempt == 0:
+                self._compact_data()
+        raise RuntimeError("shared memory queue is full (data_bytes)")
+
+    def _compact_data(self) -> None:
+        """Rewrite the live records back to back from the next ring start.
+
+        Walks every slot, so it only runs when a record that stays unacked
+        (delayed, rescheduled or leased for long) blocks the ring from wrapping.
+        """
+
+        live = []
+        for index in range(self._capacity):
+            state, offset, _, _, _, pos, length = _SLOT.unpack_from(self._buf, self._slot_pos(index))
+            if state != _FREE:
+                live.append((pos, index, offset, self._read_payload(pos, length)))
+        tail = self._get(_H_DATA_TAIL)
+        pos = base = tail + (-tail % self._data_bytes)
+        for _, index, offset, data in sorted(live):
+            self._write_data(pos, offset, data)
+            state, _, available_at, deadline, lease_id, _, length = _SLOT.unpack_from(self._buf, self._slot_pos(index))
+            self._write_slot(index, state, offset, available_at, deadline, lease_id, pos, length)
+            pos += _DATA_PREFIX.size + len(data)
+        self._set(_H_DATA_HEAD, base)
+        self._set(_H_DATA_TAIL, pos)
+
+    def _advance_data_head(self) -> None:
+        head, tail = self._get(_H_DATA_HEAD), self._get(_H_DATA_TAIL)
+        while head < tail:
+            record = self._record_at(head)
+            if record is None:
+                head += self._data_bytes - head % self._data_bytes
+                continue
+            offset, length = record
+            slot = self._slot(offset)
+            if slot is not None and slot[5] == head:
+                break
+            head += _DATA_PREFIX.size + length
+        self._set(_H_DATA_HEAD, head)
+
+    def _record_at(self, pos: int) -> Optional[Tuple[int, int]]:
+        # None when the rest of the ring is padding
+        room = self._data_bytes - pos % self._data_bytes
+        if room < _DATA_PREFIX.size:
+            return None
+        offset, length = _DATA_PREFIX.unpack_from(self._buf, self._data_at + pos % self._data_bytes)
+        return None if offset < 0 else (offset, length)
+
+    def _pad(self, pos: int, end: int) -> None:
+        # marks a skipped ring end so walkers jump to the start
+        if end > pos and self._data_bytes - pos % self._data_bytes >= _DATA_PREFIX.size:
+            _DATA_PREFIX.pack_into(self._buf, self._data_at + pos % self._data_bytes, -1, 0)
+
+    def _fit(self, pos: int, size: int) -> int:
+        # records never wrap: skip to the start of the ring when one would not fit before its end
+        if size > self._data_bytes:
+            raise RuntimeError("task payload larger than the shared memory queue")
+        if pos % self._data_bytes + size > self._data_bytes:
+            pos += self._data_bytes - pos % self._data_bytes
+        return pos
+
+    def _write_data(self, pos: int, offset: int, data: bytes) -> None:
+        start = self._data_at + pos % self._data_bytes
+        _DATA_PREFIX.pack_into(self._buf, start, offset, len(data))
+        self._buf[start + _DATA_PREFIX.size : start + _DATA_PREFIX.size + len(data)] = data
+
+    def _read_payload(self, pos: int, length: int) -> bytes:
+        start = self._data_at + pos % self._data_bytes + _DATA_PREFIX.size
+        return bytes(self._buf[start : start + length])
+
+    # ------------------------------------------------------------------
+    # Durability log (caller holds the lock)
+    # ------------------------------------------------------------------
+    def _append_log(self, blob: bytes) -> None:
+        gen = self._get(_H_LOG_GEN)
+        if self._log_fp is None or self._log_gen != gen:
+            # another process rewrote the log; follow it to the new file
+            if self._log_fp is not None:
+                self._log_fp.close()
+            self._log_fp = open(self._log_path, "ab")
+            self._log_gen = gen
+        self._log_fp.write(blob)
+        self._log_fp.flush()
+        if self._fsync:
+            os.fsync(self._log_fp.fileno())
+        self._set(_H_LOG_BYTES, self._get(_H_LOG_BYTES) + len(blob))
+
+    def _maybe_compact_log(self) -> None:
+        log_bytes = self._get(_H_LOG_BYTES)
+        if log_bytes < self._log_compact_bytes:
+            return
+        if self._get(_H_DATA_LIVE) * 2 > log_bytes:
+            return
+        self._rewrite_log()
+
+    def _rewrite_log(self) -> None:
+        # walks every slot, but only when recovering or compacting
+        live = []
+        for index in range(self._capacity):
+            state, offset, _, _, _, pos, length = _SLOT.unpack_from(self._buf, self._slot_pos(index))
+            if state != _FREE:
+                live.append((offset, pos, length))
+        blob = b"".join(
+            _log_record(_LOG_PUT, offset, self._read_payload(pos, length)) for offset, pos, length in sorted(live)
+        )
+        tmp_path = f"{self._log_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as fh:
+            fh.write(blob)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self._log_path)
+        _fsync_parent(self._log_path)
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+        self._set(_H_LOG_BYTES, len(blob))
+        self._set(_H_LOG_GEN, self._get(_H_LOG_GEN) + 1)
+
+
+__all__ = ["SharedMemoryWorkQueue"]
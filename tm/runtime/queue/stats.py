@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import math
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+try:  # pragma: no cover - platform specific
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+STATS_NAME = "queue.stats"
+_MAGIC = b"TMQSTAT1"
+# magic, backlog, inflight, oldest available_at (wall clock, NaN when none), updated_at (wall clock)
+_RECORD = struct.Struct("<8sqqdd")
+
+
+@dataclass(frozen=True)
+class QueueStats:
+    """Occupancy counters persisted next to a queue for cheap status reads."""
+
+    backlog: int
+    inflight: int
+    oldest_available_at: Optional[float]
+    updated_at: float
+
+    @property
+    def pending(self) -> int:
+        return max(0, self.backlog - self.inflight)
+
+
+def _decode(raw: bytes) -> Optional[QueueStats]:
+    if len(raw) < _RECORD.size:
+        return None
+    magic, backlog, inflight, oldest, updated_at = _RECORD.unpack_from(raw)
+    if magic != _MAGIC:
+        return None
+    backlog = max(0, backlog)
+    return QueueStats(
+        backlog=backlog,
+        inflight=min(max(0, inflight), backlog),
+        oldest_available_at=None if math.isnan(oldest) else oldest,
+        updated_at=updated_at,
+    )
+
+
+def read_queue_stats(dir_path: str) -> Optional[QueueStats]:
+    """Read the stats record of the queue in *dir_path*; ``None`` if it has none yet.
+
+    This is a single fixed-size read, independent of how many tasks are queued.
+    """
+
+    try:
+        fd = os.open(os.path.join(dir_path, STATS_NAME), os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+        return _decode(_read_record(fd))
+    finally:
+        os.close(fd)
+
+
+class QueueStatsFile:
+    """Writer side of ``queue.stats``: a fixed-size record updated in place.
+
+    Every process using the queue applies its changes as deltas under an
+    exclusive ``flock``, so the counters add up across producers and workers.
+    Deltas go stale when a process dies holding leases, so each full load of
+    the queue calls :meth:`reseed` to reset the record from what it counted.
+    ``oldest_available_at`` comes from the writer's view of the queue as of
+    its latest write. It does not cover records the writer has not loaded
+    yet, and it is corrected by the next update or reseed.
+    """
+
+    def __init__(self, dir_path: str) -> None:
+        self._path = os.path.join(dir_path, STATS_NAME)
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def reseed(self, backlog: int, inflight: int, oldest_available_at: Optional[float]) -> None:
+        """Overwrite the record with counts taken from a full view of the queue."""
+
+        with self._locked() as fd:
+            self._write(fd, backlog, inflight, oldest_available_at)
+
+    def update(self, *, backlog: int = 0, inflight: int = 0, oldest_available_at: Optional[float] = None) -> None:
+        with self._locked() as fd:
+            current = _decode(_read_record(fd))
+            if current is None:
+                return  # not seeded yet; the reseeding load accounts for this change
+            self._write(fd, current.backlog + backlog, current.inflight + inflight, oldest_available_at)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[int]:
+        with self._lock:
+            fd = self._fd
+            if fd is None:
+                raise RuntimeError("queue stats file is closed")
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                yield fd
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _write(self, fd: int, backlog: int, inflight: int, oldest_available_at: Optional[float]) -> None:
+        oldest = math.nan if oldest_available_at is None else float(oldest_available_at)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, _RECORD.pack(_MAGIC, max(0, backlog), max(0, inflight), oldest, time.time()))
+
+
+def _read_record(fd: int) -> bytes:
+    os.lseek(fd, 0, os.SEEK_SET)
+    return os.read(fd, _RECORD.size)
+
+
+__all__ = ["QueueStats", "QueueStatsFile", "read_queue_stats"]
@@ -10,14 +10,17 @@ import signal
 import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 from .idempotency import IdempotencyResult, IdempotencyStore
-from .queue import FileWorkQueue, InMemoryWorkQueue, WorkQueue
+from .queue import InMemoryWorkQueue, PartitionedWorkQueue, SharedMemoryWorkQueue, WorkQueue, open_file_queue
+from .queue.partitioned import read_partition_count
+from .queue.scheduling import load_share_weights
 from .queue.manager import ManagedLease, TaskQueueManager
 from .dlq import DeadLetterStore
 from .retry import load_retry_policy
 from tm.obs import counters
+from tm.obs.shared import MetricsSpool, retire_spool, spool_names
 from tm.kstore import DEFAULT_KSTORE_URL, KStore, open_kstore
 
 LOGGER = logging.getLogger("tm.workers")
@@ -29,12 +32,14 @@ _END_TO_END_BUCKETS = [50, 100, 250, 500, 1000, 5000, float("inf")]
 @dataclass
 class WorkerOptions:
     worker_count: int = 1
-    queue_backend: str = "file"  # file | memory
+    queue_backend: str = "file"  # file | shm | memory
     queue_dir: Optional[str] = None
+    queue_partitions: int = 0  # file backend: >1 creates a partitioned queue; 0 keeps the existing layout
     idempotency_dir: Optional[str] = None
     runtime_spec: Optional[str] = None  # module:attr or module:function
     lease_ms: int = 30_000
     batch_size: int = 1
+    max_inflight: int = 1  # leased tasks processed concurrently per worker
     poll_interval: float = 0.5
     heartbeat_interval: float = 5.0
     heartbeat_timeout: float = 15.0
@@ -42,22 +47,29 @@ class WorkerOptions:
     dlq_dir: Optional[str] = None
     config_path: Optional[str] = None
     drain_grace: float = 10.0
+    metrics_dir: Optional[str] = None  # spool directory for fleet-wide metrics; None keeps them per process
 
     def validate(self) -> None:
         if self.worker_count <= 0:
             raise ValueError("worker_count must be positive")
-        if self.queue_backend not in {"file", "memory"}:
-            raise ValueError("queue_backend must be 'file' or 'memory'")
+        if self.queue_backend not in {"file", "shm", "memory"}:
+            raise ValueError("queue_backend must be 'file', 'shm' or 'memory'")
         if self.queue_backend == "memory" and self.worker_count > 1:
             raise ValueError("memory backend only supports a single worker")
-        if self.queue_backend == "file" and not self.queue_dir:
-            raise ValueError("queue_dir required for file backend")
-        if self.queue_backend == "file" and not self.idempotency_dir:
-            raise ValueError("idempotency_dir required for file backend")
-        if self.queue_backend == "file" and not self.dlq_dir:
-            raise ValueError("dlq_dir required for file backend")
+        if self.queue_backend != "memory" and not self.queue_dir:
+            raise ValueError(f"queue_dir required for {self.queue_backend} backend")
+        if self.queue_backend != "memory" and not self.idempotency_dir:
+            raise ValueError(f"idempotency_dir required for {self.queue_backend} backend")
+        if self.queue_backend != "memory" and not self.dlq_dir:
+            raise ValueError(f"dlq_dir required for {self.queue_backend} backend")
+        if self.queue_partitions < 0:
+            raise ValueError("queue_partitions must not be negative")
+        if self.queue_partitions > 1 and self.queue_backend != "file":
+            raise ValueError("queue_partitions requires the file backend")
         if self.batch_size <= 0:
             raise ValueError("batch_size must be positive")
+        if self.max_inflight <= 0:
+            raise ValueError("max_inflight must be positive")
         if self.poll_interval <= 0:
             raise ValueError("poll_interval must be positive")
         if self.heartbeat_interval <= 0:
@@ -72,6 +84,7 @@ class WorkerState:
     conn: mp_connection.Connection
     last_heartbeat: float
     restarts: int = 0
+    spool: Optional[str] = None
 
 
 def _load_runtime(spec: Optional[str]) -> Any:
@@ -91,18 +104,30 @@ def _load_runtime(spec: Optional[str]) -> Any:
     return runtime
 
 
-def _make_queue(opts: WorkerOptions) -> WorkQueue:
+def _make_queue(opts: WorkerOptions, worker_id: int = 0) -> WorkQueue:
     if opts.queue_backend == "memory":
         return InMemoryWorkQueue()
     queue_dir = opts.queue_dir or os.path.join(os.getcwd(), "data", "queue")
-    return FileWorkQueue(queue_dir)
+    if opts.queue_backend == "shm":
+        return SharedMemoryWorkQueue(queue_dir)
+    partitions = read_partition_count(queue_dir) or opts.queue_partitions
+    owned = None
+    if partitions > 1:
+        # each worker prefers its own partitions and steals from the rest when those run dry
+        owned = PartitionedWorkQueue.owned_partitions(partitions, worker_id, opts.worker_count)
+    return open_file_queue(
+        queue_dir,
+        partitions=opts.queue_partitions or None,
+        owned=owned,
+        share_weights=load_share_weights(opts.config_path),
+    )
 
 
 def _make_idempotency_store(opts: WorkerOptions) -> IdempotencyStore:
     if opts.queue_backend == "memory":
         return IdempotencyStore(dir_path=opts.idempotency_dir or os.path.join(os.getcwd(), "data", "idem"))
     if not opts.idempotency_dir:
-        raise RuntimeError("idempotency_dir required for file backend")
+        raise RuntimeError(f"idempotency_dir required for {opts.queue_backend} backend")
     return IdempotencyStore(dir_path=opts.idempotency_dir)
 
 
@@ -117,6 +142,25 @@ def _serialize_result(result: Mapping[str, Any]) -> IdempotencyResult:
     return IdempotencyResult(status=status, output=dict(result), error=error_payload)
 
 
+def _spool_name(role: str, pid: Optional[int]) -> str:
+    return f"{role}-{pid}"
+
+
+def _retire_stale_spools(metrics_dir: str) -> None:
+    """Retire spools left behind by processes that are gone (e.g. after a supervisor crash)."""
+
+    for name in spool_names(metrics_dir):
+        _, _, pid_text = name.rpartition("-")
+        try:
+            os.kill(int(pid_text), 0)
+        except ValueError:
+            continue
+        except ProcessLookupError:
+            retire_spool(metrics_dir, name)
+        except PermissionError:  # pragma: no cover - alive, owned by someone else
+            continue
+
+
 def _send_heartbeat(conn: mp_connection.Connection, worker_id: int, ts: Optional[float] = None) -> None:
     payload = ("heartbeat", worker_id, ts if ts is not None else time.monotonic())
     try:
@@ -131,7 +175,7 @@ def _worker_entry(
     control_conn: mp_connection.Connection,
 ) -> None:
     async def _async_worker() -> None:
-        queue_impl = _make_queue(opts)
+        queue_impl = _make_queue(opts, worker_id)
         id_store = _make_idempotency_store(opts)
         dlq_dir = opts.dlq_dir or os.path.join(os.getcwd(), "data", "dlq")
         dlq_store = DeadLetterStore(dlq_dir)
@@ -144,13 +188,39 @@ def _worker_entry(
             default_ttl=opts.result_ttl,
         )
         runtime = _load_runtime(opts.runtime_spec)
+        spool = (
+            MetricsSpool(opts.metrics_dir, _spool_name(f"worker-{worker_id}", os.getpid()))
+            if opts.metrics_dir
+            else None
+        )
+        task_metrics = _TaskMetrics()
         lease_ms = opts.lease_ms
         batch_size = opts.batch_size
+        max_inflight = opts.max_inflight
         poll_interval = opts.poll_interval
         heartbeat_interval = opts.heartbeat_interval
         next_heartbeat = 0.0
         draining = False
         drain_deadline: Optional[float] = None
+        inflight: set[asyncio.Task[None]] = set()
+        next_refresh = 0.0
+        loop = asyncio.get_running_loop()
+        # producers poke this channel on enqueue, so idle workers need not wait out poll_interval
+        wakeup = queue_impl.open_wakeup()
+        woken = asyncio.Event()
+        if wakeup is not None:
+
+            def _on_wakeup() -> None:
+                wakeup.drain()
+                woken.set()
+
+            loop.add_reader(wakeup.fileno(), _on_wakeup)
+
+        def _reap(task: asyncio.Task[None]) -> None:
+            inflight.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                LOGGER.error("worker-%s task processing failed", worker_id, exc_info=task.exception())
+
         try:
             while True:
                 shutdown_requested = False
@@ -172,20 +242,50 @@ def _worker_entry(
                 if now >= next_heartbeat:
                     _send_heartbeat(control_conn, worker_id, now)
                     next_heartbeat = now + heartbeat_interval
+                    if spool is not None:
+                        _publish_spool(spool, worker_id)
                 if draining:
-                    if drain_deadline is not None and now >= drain_deadline:
+                    if not inflight or (drain_deadline is not None and now >= drain_deadline):
                         break
-                leases = manager.lease(batch_size, lease_ms)
-                if not leases:
-                    if draining:
-                        break
-                    await asyncio.sleep(poll_interval)
-                    continue
-                for lease in leases:
-                    await _process_lease(manager, runtime, lease, control_conn, worker_id)
-                if draining:
-                    break
+                else:
+                    if woken.is_set() or now >= next_refresh:
+                        woken.clear()
+                        queue_impl.refresh()
+                        next_refresh = now + poll_interval
+                    # keep every slot busy: lease again as soon as one frees up
+                    while len(inflight) < max_inflight:
+                        leases = manager.lease(min(batch_size, max_inflight - len(inflight)), lease_ms)
+                        if not leases:
+                            break
+                        for lease in leases:
+                            task = asyncio.create_task(
+                                _process_lease(manager, runtime, lease, control_conn, worker_id, lease_ms, task_metrics)
+                            )
+                            inflight.add(task)
+                            task.add_done_callback(_reap)
+                wake_in = max(0.0, min(poll_interval, next_heartbeat - time.monotonic()))
+                waiters: set[asyncio.Future[Any]] = set(inflight)
+                wake_waiter: Optional[asyncio.Future[Any]] = None
+                if wakeup is not None and not draining:
+                    wake_waiter = asyncio.ensure_future(woken.wait())
+                    waiters.add(wake_waiter)
+                if waiters:
+                    await asyncio.wait(waiters, timeout=wake_in, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await asyncio.sleep(wake_in)
+                if wake_waiter is not None and not wake_waiter.done():
+                    wake_waiter.cancel()
         finally:
+            # unfinished tasks are abandoned; their leases expire and they are redelivered
+            for task in list(inflight):
+                task.cancel()
+            if inflight:
+                await asyncio.gather(*inflight, return_exceptions=True)
+            if wakeup is not None:
+                loop.remove_reader(wakeup.fileno())
+                wakeup.close()
+            if spool is not None:
+                _publish_spool(spool, worker_id)
             try:
                 queue_impl.flush()
             except Exception:  # pragma: no cover - best effort
@@ -208,29 +308,72 @@ def _worker_entry(
     asyncio.run(_async_worker())
 
 
+def _publish_spool(spool: MetricsSpool, worker_id: int) -> None:
+    try:
+        spool.publish()
+    except Exception:  # pragma: no cover - metrics must not take a worker down
+        LOGGER.debug("worker-%s failed to publish metrics", worker_id, exc_info=True)
+
+
+async def _renew_lease(manager: TaskQueueManager, lease: ManagedLease, lease_ms: int, worker_id: int) -> None:
+    """Keep *lease* alive while its task runs, renewing it every third of ``lease_ms``."""
+
+    interval = max(lease_ms / 3000.0, 0.01)
+    while True:
+        await asyncio.sleep(interval)
+        renewed = manager.extend_lease(lease, lease_ms)
+        if renewed is None:
+            LOGGER.warning("worker-%s lost the lease on task %s; it may run again elsewhere", worker_id, lease.task_id)
+            return
+        lease = renewed
+
+
+class _TaskMetrics:
+    """Latency histogram children a worker binds once per ``(flow, status)``."""
+
+    def __init__(self) -> None:
+        self._bound: Dict[
+            Tuple[str, str], Tuple[counters.Histogram, counters.HistogramChild, counters.HistogramChild]
+        ] = {}
+
+    def observe(self, flow_id: str, status: str, processing_ms: float, end_to_end_ms: float) -> None:
+        processing = counters.metrics.get_histogram(
+            "tm_task_processing_ms",
+            help="Task execution duration in milliseconds",
+            buckets=_TASK_PROCESSING_BUCKETS,
+        )
+        bound = self._bound.get((flow_id, status))
+        if bound is None or bound[0] is not processing:  # first use, or the registry was swapped
+            end_to_end = counters.metrics.get_histogram(
+                "tm_end_to_end_ms",
+                help="End-to-end task latency in milliseconds",
+                buckets=_END_TO_END_BUCKETS,
+            )
+            bound = self._bound[(flow_id, status)] = (
+                processing,
+                processing.labels(flow=flow_id, status=status),
+                end_to_end.labels(flow=flow_id, status=status),
+            )
+        bound[1].observe(processing_ms)
+        bound[2].observe(end_to_end_ms)
+
+
 async def _process_lease(
     manager: TaskQueueManager,
     runtime: Any,
     lease: ManagedLease,
     control_conn: mp_connection.Connection,
     worker_id: int,
+    lease_ms: int,
+    task_metrics: _TaskMetrics,
 ) -> None:
     envelope = lease.envelope
     processing_start = time.perf_counter()
 
     def _observe(status: str) -> None:
         duration_ms = (time.perf_counter() - processing_start) * 1000.0
-        counters.metrics.get_histogram(
-            "tm_task_processing_ms",
-            help="Task execution duration in milliseconds",
-            buckets=_TASK_PROCESSING_BUCKETS,
-        ).observe(duration_ms, labels={"flow": envelope.flow_id, "status": status})
         end_to_end_ms = max(0.0, (time.time() - envelope.scheduled_at) * 1000.0)
-        counters.metrics.get_histogram(
-            "tm_end_to_end_ms",
-            help="End-to-end task latency in milliseconds",
-            buckets=_END_TO_END_BUCKETS,
-        ).observe(end_to_end_ms, labels={"flow": envelope.flow_id, "status": status})
+        task_metrics.observe(envelope.flow_id, status, duration_ms, end_to_end_ms)
 
     cached = manager.get_cached_result(envelope)
     if cached is not None:
@@ -239,6 +382,8 @@ async def _process_lease(
         _observe("cached")
         return
 
+    # renew the lease while the flow runs, so lease_ms only bounds redelivery after a crash
+    renewer = asyncio.create_task(_renew_lease(manager, lease, lease_ms, worker_id))
     try:
         result = await runtime.run(envelope.flow_id, inputs=envelope.input)
     except Exception as exc:  # pragma: no cover - runtime failure path
@@ -251,6 +396,8 @@ async def _process_lease(
         manager.handle_failure(lease, error=error_payload)
         _observe("error")
         return
+    finally:
+        renewer.cancel()
 
     status = result.get("status") if isinstance(result, Mapping) else None
     if status != "ok":
@@ -287,6 +434,8 @@ class TaskWorkerSupervisor:
         self._kstore_url = url
         self._kstore: KStore | None = open_kstore(url)
         self._kstore_closed = False
+        self._spool: Optional[MetricsSpool] = None
+        self._next_publish = 0.0
 
     # ------------------------------------------------------------------
     def start(self) -> None:
@@ -296,6 +445,9 @@ class TaskWorkerSupervisor:
         if self._running:
             return
         self._running = True
+        if self._opts.metrics_dir:
+            _retire_stale_spools(self._opts.metrics_dir)
+            self._spool = MetricsSpool(self._opts.metrics_dir, _spool_name("supervisor", os.getpid()))
         for worker_id in range(self._opts.worker_count):
             self._spawn_worker(worker_id)
         self._monitor_thread = threading.Thread(target=self._monitor_loop, name="tm-worker-monitor", daemon=True)
@@ -325,8 +477,12 @@ class TaskWorkerSupervisor:
                     state.conn.close()
                 except Exception:  # pragma: no cover
                     pass
+                self._retire_spool(state)
             self._states.clear()
         self._record_worker_metrics()
+        if self._spool is not None:
+            self._retire_spool_name(self._spool.name)
+            self._spool = None
         if self._monitor_thread is not None:
             self._monitor_thread.join(timeout=1.0)
             self._monitor_thread = None
@@ -393,6 +549,7 @@ class TaskWorkerSupervisor:
                         state.conn.close()
                     except Exception:  # pragma: no cover
                         pass
+                    self._retire_spool(state)
                     self._states.pop(worker_id, None)
             self._record_worker_metrics()
         finally:
@@ -414,6 +571,7 @@ class TaskWorkerSupervisor:
                 conn=parent_conn,
                 last_heartbeat=time.monotonic(),
                 restarts=restarts,
+                spool=_spool_name(f"worker-{worker_id}", proc.pid) if self._opts.metrics_dir else None,
             )
         LOGGER.info("started worker %s pid=%s restarts=%s", worker_id, proc.pid, restarts)
         self._record_worker_metrics()
@@ -483,6 +641,12 @@ class TaskWorkerSupervisor:
                         LOGGER.exception("failed to terminate unresponsive worker %s", worker_id)
                 self._restart_worker(worker_id)
         self._record_worker_metrics()
+        if self._spool is not None and now >= self._next_publish:
+            self._next_publish = now + self._opts.heartbeat_interval
+            try:
+                self._spool.publish()
+            except Exception:  # pragma: no cover - best effort
+                LOGGER.debug("supervisor failed to publish metrics", exc_info=True)
 
     def _restart_worker(self, worker_id: int) -> None:
         if not self._running:
@@ -497,9 +661,23 @@ class TaskWorkerSupervisor:
                 pass
             if old_state.process.is_alive():
                 old_state.process.join(timeout=0.5)
+            self._retire_spool(old_state)
         self._spawn_worker(worker_id, restarts=restarts)
         self._record_worker_metrics()
 
+    def _retire_spool(self, state: WorkerState) -> None:
+        # a worker still running (e.g. failed to terminate) keeps its spool until the next start
+        if state.spool is not None and not state.process.is_alive():
+            self._retire_spool_name(state.spool)
+
+    def _retire_spool_name(self, name: str) -> None:
+        if not self._opts.metrics_dir:
+            return
+        try:
+            retire_spool(self._opts.metrics_dir, name)
+        except Exception:  # pragma: no cover - best effort
+            LOGGER.warning("failed to retire metrics spool %s", name, exc_info=True)
+
     def _find_worker_id(self, conn: mp_connection.Connection) -> Optional[int]:
         with self._lock:
             for worker_id, state in self._states.items():
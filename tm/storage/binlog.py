@@ -1,11 +1,15 @@
 # tm/storage/binlog.py
+import json
+import mmap
 import os
 import time
 import zlib
-from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+from dataclasses import dataclass
+from typing import AbstractSet, BinaryIO, Iterable, Iterator, List, Optional, Tuple
 
 MAGIC = b"TMG1"
 VER = 1
+INDEX_SUFFIX = ".idx"
 
 
 def _varint_encode(n: int) -> bytes:
@@ -31,88 +35,341 @@ def _varint_decode(buf: memoryview, pos: int) -> Tuple[int, int]:
     return out, pos
 
 
+class FrameError(ValueError):
+    """Raised for a frame whose header or checksum is invalid."""
+
+
+def encode_frame(etype: str, payload: bytes) -> bytes:
+    """Frame one ``(etype, payload)`` record: magic, version, varint length, body, CRC32."""
+
+    etb = etype.encode("utf-8")
+    body = _varint_encode(len(etb)) + etb + payload
+    frame = MAGIC + bytes([VER]) + _varint_encode(len(body)) + body
+    return frame + (zlib.crc32(frame) & 0xFFFFFFFF).to_bytes(4, "big")
+
+
+def decode_frame(buf: memoryview, pos: int, end: int) -> Optional[Tuple[str, memoryview, int]]:
+    """Decode the frame starting at ``buf[pos]``, returning ``(etype, payload, next_pos)``.
+
+    Returns ``None`` when the frame runs past ``end`` (not fully written yet)
+    and raises :class:`FrameError` when it is corrupt.
+    """
+
+    if pos + 9 > end:
+        return None
+    if buf[pos : pos + 4] != MAGIC:
+        raise FrameError(f"bad frame magic at {pos}")
+    q = pos + 5
+    blen = 0
+    shift = 0
+    while True:  # bounded varint decode: the length itself may be torn
+        if q >= end:
+            return None
+        b = buf[q]
+        q += 1
+        blen |= (b & 0x7F) << shift
+        if not b & 0x80:
+            break
+        shift += 7
+        if shift > 63:
+            raise FrameError(f"bad frame length at {pos}")
+    frame_end = q + blen
+    if frame_end + 4 > end:
+        return None
+    crc = int.from_bytes(buf[frame_end : frame_end + 4], "big")
+    if (zlib.crc32(buf[pos:frame_end]) & 0xFFFFFFFF) != crc:
+        raise FrameError(f"bad frame checksum at {pos}")
+    et_len, r = _varint_decode(buf, q)
+    if r + et_len > frame_end:
+        raise FrameError(f"bad frame type length at {pos}")
+    return str(buf[r : r + et_len], "utf-8"), buf[r + et_len : frame_end], frame_end + 4
+
+
+@dataclass(frozen=True)
+class BlockIndexEntry:
+    """One run of contiguous frames in a segment, as recorded in the sidecar index."""
+
+    offset: int
+    length: int
+    frames: int
+    ts_min: float
+    ts_max: float
+    etypes: Optional[Tuple[str, ...]] = None
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.length
+
+    def to_json(self) -> str:
+        payload = {"o": self.offset, "n": self.length, "c": self.frames, "t0": self.ts_min, "t1": self.ts_max}
+        if self.etypes is not None:
+            payload["e"] = list(self.etypes)
+        return json.dumps(payload, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: bytes) -> "BlockIndexEntry":
+        data = json.loads(line)
+        etypes = data.get("e")
+        return cls(
+            offset=int(data["o"]),
+            length=int(data["n"]),
+            frames=int(data["c"]),
+            ts_min=float(data["t0"]),
+            ts_max=float(data["t1"]),
+            etypes=tuple(str(et) for et in etypes) if isinstance(etypes, list) else None,
+        )
+
+    def may_contain(self, types: AbstractSet[str]) -> bool:
+        return self.etypes is None or not types.isdisjoint(self.etypes)
+
+
+def read_block_index(segment_path: str) -> List[BlockIndexEntry]:
+    """Load the sidecar index of a segment; missing or torn entries are skipped."""
+
+    try:
+        with open(segment_path + INDEX_SUFFIX, "rb") as fh:
+            raw_lines = fh.readlines()
+    except FileNotFoundError:
+        return []
+    entries: List[BlockIndexEntry] = []
+    for raw in raw_lines:
+        if not raw.endswith(b"\n"):
+            break
+        try:
+            entries.append(BlockIndexEntry.from_json(raw))
+        except (ValueError, KeyError, TypeError):
+            break
+    return entries
+
+
 class BinaryLogWriter:
-    def __init__(self, dir_path: str, seg_bytes: int = 128_000_000):
+    """Append framed records to rolling ``.tmbl`` segments.
+
+    Alongside each segment the writer keeps a ``.tmbl.idx`` sidecar with one
+    JSON line per block of roughly ``block_bytes`` of frames: the block's file
+    offset and length, its frame count, the smallest/largest timestamp passed
+    to :meth:`append_many` and the set of event types it holds. Readers use it
+    to seek to a time range and to skip blocks without any wanted type.
+    """
+
+    def __init__(self, dir_path: str, seg_bytes: int = 128_000_000, *, block_bytes: int = 64 * 1024):
         self.dir = dir_path
         os.makedirs(self.dir, exist_ok=True)
         self.seg_bytes = seg_bytes
+        self.block_bytes = max(1, int(block_bytes))
         self.fp: Optional[BinaryIO] = None
+        self.index_fp: Optional[BinaryIO] = None
         self.path: Optional[str] = None
         self.size = 0
+        self._offset = 0
+        self._reset_block()
         self._open_new_segment()
 
+    def _reset_block(self) -> None:
+        self._block_start = self._offset
+        self._block_frames = 0
+        self._block_ts_min = float("inf")
+        self._block_ts_max = float("-inf")
+        self._block_types: set[str] = set()
+
     def _open_new_segment(self) -> None:
         ts = int(time.time())
         self.path = os.path.join(self.dir, f"events-{ts}.tmbl")
         self.fp = open(self.path, "ab", buffering=1024 * 1024)
+        self.index_fp = open(self.path + INDEX_SUFFIX, "ab")
         self.size = 0
+        self._offset = self.fp.tell()
+        self._reset_block()
+
+    def append_many(self, records: Iterable[Tuple[str, bytes]], *, ts: Optional[float] = None) -> None:
+        """Append ``(etype, payload)`` records; ``ts`` tags them in the block index (default: now)."""
 
-    def append_many(self, records: Iterable[Tuple[str, bytes]]) -> None:
-        # records: (etype, payload_bytes)
         if self.fp is None:
             raise RuntimeError("binary log writer is closed")
         chunks = []
         for etype, payload in records:
-            etb = etype.encode("utf-8")
-            body = _varint_encode(len(etb)) + etb + payload
-            frame = MAGIC + bytes([VER]) + _varint_encode(len(body)) + body
-            crc = zlib.crc32(frame) & 0xFFFFFFFF
-            chunks.append(frame + crc.to_bytes(4, "big"))
+            chunks.append(encode_frame(etype, payload))
+            self._block_types.add(etype)
+        if not chunks:
+            return
         blob = b"".join(chunks)
         n = self.fp.write(blob)
         self.size += n
+        self._offset += n
+        stamp = time.time() if ts is None else float(ts)
+        self._block_frames += len(chunks)
+        self._block_ts_min = min(self._block_ts_min, stamp)
+        self._block_ts_max = max(self._block_ts_max, stamp)
+        if self._offset - self._block_start >= self.block_bytes:
+            self._emit_block()
         if self.size >= self.seg_bytes:
-            self.fp.flush()
-            os.fsync(self.fp.fileno())
-            self.fp.close()
+            self._close_segment()
             self._open_new_segment()
 
-    def flush_fsync(self) -> None:
-        if self.fp is None:
+    def _emit_block(self) -> None:
+        if self._block_frames == 0 or self.fp is None or self.index_fp is None:
             return
+        # data reaches the OS before the index entry describing it
         self.fp.flush()
-        os.fsync(self.fp.fileno())
+        entry = BlockIndexEntry(
+            offset=self._block_start,
+            length=self._offset - self._block_start,
+            frames=self._block_frames,
+            ts_min=self._block_ts_min,
+            ts_max=self._block_ts_max,
+            etypes=tuple(sorted(self._block_types)),
+        )
+        self.index_fp.write(entry.to_json().encode("utf-8") + b"\n")
+        self._reset_block()
 
-    def close(self) -> None:
+    def _sync(self) -> None:
         if self.fp is None:
             return
+        self._emit_block()
         self.fp.flush()
         os.fsync(self.fp.fileno())
-        self.fp.close()
+        if self.index_fp is not None:
+            self.index_fp.flush()
+            os.fsync(self.index_fp.fileno())
+
+    def _close_segment(self) -> None:
+        self._sync()
+        if self.fp is not None:
+            self.fp.close()
+        if self.index_fp is not None:
+            self.index_fp.close()
         self.fp = None
+        self.index_fp = None
+
+    def flush_fsync(self) -> None:
+        self._sync()
+
+    def close(self) -> None:
+        if self.fp is None:
+            return
+        self._close_segment()
+
+
+def _iter_frames(
+    mv: memoryview,
+    pos: int,
+    end: int,
+    types: Optional[AbstractSet[bytes]] = None,
+) -> Iterator[Tuple[str, memoryview]]:
+    """Decode frames in ``mv[pos:end]``; stops at the first torn or corrupt frame.
+
+    When ``types`` is given, frames whose etype header is not in the set are
+    stepped over using the length prefix alone, without CRC or payload work.
+    """
+
+    while pos + 9 <= end:  # magic(4)+ver(1)+len(varint)+crc(4)
+        if mv[pos : pos + 4] != MAGIC:
+            return
+        start = pos
+        pos += 5
+        blen, pos = _varint_decode(mv, pos)
+        if pos + blen + 4 > end:
+            return
+        frame_end = pos + blen
+        et_len, q = _varint_decode(mv, pos)
+        if types is not None and mv[q : q + et_len].tobytes() not in types:
+            pos = frame_end + 4
+            continue
+        crc = int.from_bytes(mv[frame_end : frame_end + 4], "big")
+        if (zlib.crc32(mv[start:frame_end]) & 0xFFFFFFFF) != crc:
+            return
+        et = str(mv[q : q + et_len], "utf-8")
+        yield et, mv[q + et_len : frame_end]
+        pos = frame_end + 4
 
 
 class BinaryLogReader:
+    """Memory-mapped reader over the ``.tmbl`` segments of a directory."""
+
     def __init__(self, dir_path: str):
         self.dir = dir_path
 
-    def scan(self) -> Iterator[Tuple[str, bytes]]:
-        for name in sorted(os.listdir(self.dir)):
-            if not name.endswith(".tmbl"):
-                continue
-            with open(os.path.join(self.dir, name), "rb") as f:
-                data = f.read()
-                mv, p = memoryview(data), 0
-                L = len(data)
-                while p + 9 <= L:  # magic(4)+ver(1)+len(varint)+crc(4)
-                    if mv[p : p + 4].tobytes() != MAGIC:
-                        break
-                    start = p
-                    p += 4
-                    _ = mv[p]
-                    p += 1
-
-                    blen, p = _varint_decode(mv, p)
-                    if p + blen + 4 > L:
-                        break
-                    frame = mv[start : p + blen]  # include magic+ver+len for crc window
-                    body = mv[p : p + blen].tobytes()
-                    p += blen
-                    crc = int.from_bytes(mv[p : p + 4], "big")
-                    p += 4
-                    if (zlib.crc32(frame.tobytes()) & 0xFFFFFFFF) != crc:
-                        break
-                    et_len, q = _varint_decode(memoryview(body), 0)
-                    et = body[q : q + et_len].decode("utf-8")
-                    payload = body[q + et_len :]
-                    yield et, payload
+    def segments(self) -> List[str]:
+        return [os.path.join(self.dir, name) for name in sorted(os.listdir(self.dir)) if name.endswith(".tmbl")]
+
+    def scan(
+        self,
+        *,
+        types: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[Tuple[str, bytes]]:
+        """Yield ``(etype, payload)`` pairs as owned bytes."""
+
+        for et, view in self.scan_views(types=types, since=since, until=until):
+            yield et, view.tobytes()
+
+    def scan_views(
+        self,
+        *,
+        types: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[Tuple[str, memoryview]]:
+        """Yield ``(etype, payload)`` pairs as zero-copy views into the mapped segment.
+
+        ``types`` restricts output to those event types; it is applied to the
+        frame header (and to whole blocks through the index) before any CRC or
+        payload work. ``since``/``until`` prune whole indexed blocks whose
+        timestamp range lies outside the window; frames from unindexed regions
+        are always yielded, so callers still filter individual records. Views
+        stay valid only while the caller holds them; copy anything kept longer.
+        """
+
+        wanted = frozenset(types) if types is not None else None
+        for path in self.segments():
+            yield from self.scan_segment(path, types=wanted, since=since, until=until)
+
+    def scan_segment(
+        self,
+        path: str,
+        *,
+        types: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[Tuple[str, memoryview]]:
+        wanted = frozenset(types) if types is not None else None
+        wanted_bytes = frozenset(et.encode("utf-8") for et in wanted) if wanted is not None else None
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(mm)
+        try:
+            for start, end in _segment_ranges(read_block_index(path), size, since, until, wanted):
+                for et, view in _iter_frames(mv, start, end, wanted_bytes):
+                    yield et, view
+        finally:
+            mv.release()
+            try:
+                mm.close()
+            except BufferError:
+                # the caller still holds payload views; the map is released with them
+                pass
+
+
+def _segment_ranges(
+    blocks: List[BlockIndexEntry],
+    size: int,
+    since: Optional[float],
+    until: Optional[float],
+    types: Optional[AbstractSet[str]] = None,
+) -> Iterator[Tuple[int, int]]:
+    pos = 0
+    for block in blocks:
+        if block.offset < pos or block.end > size:
+            break
+        if block.offset > pos:
+            yield pos, block.offset  # unindexed gap, e.g. left by a crashed writer
+        in_window = not ((since is not None and block.ts_max < since) or (until is not None and block.ts_min > until))
+        if in_window and (types is None or block.may_contain(types)):
+            yield block.offset, block.end
+        pos = block.end
+    if pos < size:
+        yield pos, size
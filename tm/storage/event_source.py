@@ -1,4 +1,4 @@
-from typing import Iterator, Tuple
+from typing import Iterable, Iterator, Optional, Tuple
 
 from .binlog import BinaryLogReader
 
@@ -11,5 +11,5 @@ class EventSource:
     def __init__(self, log_dir: str):
         self._reader = BinaryLogReader(log_dir)
 
-    def stream(self) -> Iterator[Tuple[str, bytes]]:
-        return self._reader.scan()
+    def stream(self, types: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, bytes]]:
+        return self._reader.scan(types=types)
@@ -2,17 +2,23 @@ from __future__ import annotations
 
 import asyncio
 from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
 
 from tm.runtime.dlq import DeadLetterStore
 from tm.runtime.idempotency import IdempotencyStore
-from tm.runtime.queue import FileWorkQueue
-from tm.runtime.queue.manager import TaskQueueManager
+from tm.runtime.queue import open_file_queue
+from tm.runtime.queue.manager import EnqueueRequest, TaskQueueManager
 
 from .manager import TriggerEvent
 
 
 class TriggerQueueDispatcher:
-    """Dispatches trigger events into the TraceMind work queue."""
+    """Dispatches trigger events into the TraceMind work queue.
+
+    Events that arrive while a write is in flight are coalesced and enqueued
+    together through :meth:`TaskQueueManager.enqueue_many`, so a burst pays
+    for one queue write (and fsync) instead of one per event.
+    """
 
     def __init__(
         self,
@@ -24,28 +30,49 @@ class TriggerQueueDispatcher:
         Path(queue_dir).mkdir(parents=True, exist_ok=True)
         Path(idempotency_dir).mkdir(parents=True, exist_ok=True)
         Path(dlq_dir).mkdir(parents=True, exist_ok=True)
-        self._queue = FileWorkQueue(queue_dir)
+        self._queue = open_file_queue(queue_dir)
         self._idempotency = IdempotencyStore(dir_path=idempotency_dir)
         self._dlq = DeadLetterStore(dlq_dir)
         self._manager = TaskQueueManager(self._queue, self._idempotency, dead_letters=self._dlq)
+        self._pending: List[Tuple[TriggerEvent, asyncio.Future[None]]] = []
+        self._drain_task: Optional[asyncio.Task[None]] = None
 
     async def handle(self, event: TriggerEvent) -> None:
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._enqueue_sync, event)
+        done: asyncio.Future[None] = loop.create_future()
+        self._pending.append((event, done))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = loop.create_task(self._drain())
+        await done
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await loop.run_in_executor(None, self._enqueue_batch, [event for event, _ in batch])
+            except Exception as exc:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(exc)
+            else:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_result(None)
 
     def _enqueue_sync(self, event: TriggerEvent) -> None:
-        headers = dict(event.headers)
-        payload = dict(event.payload)
-        if event.idempotency_key:
-            headers.setdefault("idempotency_key", event.idempotency_key)
-        outcome = self._manager.enqueue(
-            flow_id=event.flow_id,
-            input=payload,
-            headers=headers or None,
-            trace=None,
-        )
-        if outcome.cached_result is not None:
-            return
+        self._enqueue_batch([event])
+
+    def _enqueue_batch(self, events: Sequence[TriggerEvent]) -> None:
+        requests: List[EnqueueRequest] = []
+        for event in events:
+            headers = dict(event.headers)
+            if event.idempotency_key:
+                headers.setdefault("idempotency_key", event.idempotency_key)
+            requests.append(
+                EnqueueRequest(flow_id=event.flow_id, input=dict(event.payload), headers=headers or None, trace=None)
+            )
+        self._manager.enqueue_many(requests)
 
     def close(self) -> None:
         self._queue.flush()
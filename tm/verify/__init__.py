@@ -1,6 +1,15 @@
 from .adapter import TraceMindAdapter
-from .explorer import Explorer
+from .explorer import ExplorationProgress, Explorer
+from .invariants import invariant_monitor
 from .report import build_report
 from .spec import load_plan, load_spec
 
-__all__ = ["TraceMindAdapter", "Explorer", "build_report", "load_plan", "load_spec"]
+__all__ = [
+    "TraceMindAdapter",
+    "Explorer",
+    "ExplorationProgress",
+    "build_report",
+    "invariant_monitor",
+    "load_plan",
+    "load_spec",
+]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Dict, List, Mapping, Sequence, Tuple
 
 from tm.pipeline import selectors
@@ -30,6 +30,10 @@ def _selector_to_path(expr: str) -> Path:
     return tuple(path)
 
 
+def _identity_step(ctx):
+    return ctx
+
+
 def _rule_triggered(triggers: Sequence[str], changed_paths: Sequence[Path]) -> bool:
     for trig in triggers:
         for path in changed_paths:
@@ -64,6 +68,16 @@ class TraceMindAdapter:
             initial_done=tuple(initial_done or ()),
         )
 
+    def structural(self) -> "TraceMindAdapter":
+        """Copy of this adapter whose step callables are replaced by a picklable no-op.
+
+        Exploration only looks at step reads/writes and rules, so the copy has
+        the same successor relation and can be shipped to worker processes.
+        """
+
+        steps = {name: replace(spec, fn=_identity_step) for name, spec in self.plan.steps.items()}
+        return replace(self, plan=Plan(steps=steps, rules=list(self.plan.rules)))
+
     def initial_state(self) -> State:
         pending: List[str] = list(self.initial_pending)
         pending.extend(self._collect_steps(self.changed_paths))
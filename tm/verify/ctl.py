@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import List, Optional, Set
+from typing import Dict, Hashable, List, Optional, Set
 
 from .adapter import TraceMindAdapter
 from .explorer import ExplorationResult
@@ -197,56 +197,140 @@ def eval_state_expr(expr: Expr, state: State, adapter: TraceMindAdapter) -> bool
     raise TypeError(f"Unsupported expression node: {expr}")
 
 
-def _sat(expr: Expr, model: ExplorationResult, adapter: TraceMindAdapter) -> Set[int]:
+def _expr_key(expr: Expr) -> Hashable:
     if isinstance(expr, Predicate):
-        return {i for i, st in enumerate(model.states) if _eval_predicate(expr, st, adapter)}
+        return ("P", expr.name, expr.value)
     if isinstance(expr, Not):
-        all_states = set(range(len(model.states)))
-        return all_states - _sat(expr.child, model, adapter)
+        return ("NOT", _expr_key(expr.child))
     if isinstance(expr, And):
-        return _sat(expr.left, model, adapter) & _sat(expr.right, model, adapter)
+        return ("AND", _expr_key(expr.left), _expr_key(expr.right))
     if isinstance(expr, Or):
-        return _sat(expr.left, model, adapter) | _sat(expr.right, model, adapter)
+        return ("OR", _expr_key(expr.left), _expr_key(expr.right))
     if isinstance(expr, Ctl):
-        child_sat = _sat(expr.child, model, adapter)
-        if expr.op == "EX":
-            return {sid for sid, succs in model.edges.items() if any(nxt in child_sat for nxt in succs)}
-        if expr.op == "EF":
-            sat = set(child_sat)
-            changed = True
-            while changed:
-                changed = False
-                for sid, succs in model.edges.items():
-                    if sid in sat:
-                        continue
-                    if any(nxt in sat for nxt in succs):
-                        sat.add(sid)
-                        changed = True
-            return sat
-        if expr.op == "AF":
-            sat = set(child_sat)
-            changed = True
-            while changed:
-                changed = False
-                for sid, succs in model.edges.items():
-                    if sid in sat:
-                        continue
-                    if succs and all(nxt in sat for nxt in succs):
-                        sat.add(sid)
-                        changed = True
-            # terminals that already satisfy child are included; those that do not stay out
-            for sid in range(len(model.states)):
-                if sid not in model.edges and sid in child_sat:
-                    sat.add(sid)
-            return sat
-        if expr.op == "EG":
-            # EG p == not AF not p
-            return set(range(len(model.states))) - _sat(Ctl(op="AF", child=Not(expr.child)), model, adapter)
-        if expr.op == "AG":
-            # AG p == not EF not p
-            return set(range(len(model.states))) - _sat(Ctl(op="EF", child=Not(expr.child)), model, adapter)
+        return (expr.op, _expr_key(expr.child))
     raise TypeError(f"Unsupported expression node: {expr}")
 
 
+class CtlChecker:
+    """Backwards-reachability CTL model checker over an explored model.
+
+    Satisfaction sets are compact flag arrays (one byte per state) combined
+    with big-integer bitwise operations, the reverse adjacency is built once,
+    and every distinct subformula is evaluated at most once per checker.
+    """
+
+    def __init__(self, model: ExplorationResult, adapter: TraceMindAdapter):
+        self.model = model
+        self.adapter = adapter
+        n = len(model.states)
+        self._n = n
+        self._ones = int.from_bytes(b"\x01" * n, "little")
+        succs: List[List[int]] = [[] for _ in range(n)]
+        preds: List[List[int]] = [[] for _ in range(n)]
+        for sid, targets in model.edges.items():
+            distinct = list(dict.fromkeys(targets))
+            succs[sid] = distinct
+            for nxt in distinct:
+                preds[nxt].append(sid)
+        self._succs = succs
+        self._preds = preds
+        self._cache: Dict[Hashable, bytearray] = {}
+
+    def sat(self, expr: Expr) -> bytearray:
+        """Return the satisfaction flags of ``expr`` (``result[i]`` is 1 when state ``i`` satisfies it)."""
+
+        key = _expr_key(expr)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._compute(expr)
+            self._cache[key] = cached
+        return cached
+
+    def states(self, expr: Expr) -> Set[int]:
+        flags = self.sat(expr)
+        return {i for i, flag in enumerate(flags) if flag}
+
+    def _to_int(self, flags: bytearray) -> int:
+        return int.from_bytes(flags, "little")
+
+    def _from_int(self, value: int) -> bytearray:
+        return bytearray(value.to_bytes(self._n, "little"))
+
+    def _compute(self, expr: Expr) -> bytearray:
+        if isinstance(expr, Predicate):
+            states, adapter = self.model.states, self.adapter
+            return bytearray(1 if _eval_predicate(expr, st, adapter) else 0 for st in states)
+        if isinstance(expr, Not):
+            return self._from_int(self._ones ^ self._to_int(self.sat(expr.child)))
+        if isinstance(expr, And):
+            return self._from_int(self._to_int(self.sat(expr.left)) & self._to_int(self.sat(expr.right)))
+        if isinstance(expr, Or):
+            return self._from_int(self._to_int(self.sat(expr.left)) | self._to_int(self.sat(expr.right)))
+        if isinstance(expr, Ctl):
+            if expr.op == "EX":
+                return self._ex(self.sat(expr.child))
+            if expr.op == "EF":
+                return self._ef(self.sat(expr.child))
+            if expr.op == "AF":
+                return self._af(self.sat(expr.child))
+            if expr.op == "EG":
+                # EG p == not AF not p
+                return self.sat(Not(Ctl(op="AF", child=Not(expr.child))))
+            if expr.op == "AG":
+                # AG p == not EF not p
+                return self.sat(Not(Ctl(op="EF", child=Not(expr.child))))
+        raise TypeError(f"Unsupported expression node: {expr}")
+
+    def _ex(self, child: bytearray) -> bytearray:
+        out = bytearray(self._n)
+        preds = self._preds
+        for sid in _iter_set(child):
+            for prev in preds[sid]:
+                out[prev] = 1
+        return out
+
+    def _ef(self, child: bytearray) -> bytearray:
+        sat = bytearray(child)
+        preds = self._preds
+        work = list(_iter_set(child))
+        while work:
+            sid = work.pop()
+            for prev in preds[sid]:
+                if not sat[prev]:
+                    sat[prev] = 1
+                    work.append(prev)
+        return sat
+
+    def _af(self, child: bytearray) -> bytearray:
+        # a state with successors satisfies AF once all of them do; states
+        # without successors only satisfy it through the child formula
+        sat = bytearray(child)
+        succs, preds = self._succs, self._preds
+        remaining = [len(targets) for targets in succs]
+        work = list(_iter_set(child))
+        while work:
+            sid = work.pop()
+            for prev in preds[sid]:
+                if sat[prev]:
+                    continue
+                remaining[prev] -= 1
+                if remaining[prev] == 0:
+                    sat[prev] = 1
+                    work.append(prev)
+        return sat
+
+
+def _iter_set(flags: bytearray):
+    find = flags.find
+    idx = find(1)
+    while idx != -1:
+        yield idx
+        idx = find(1, idx + 1)
+
+
+def _sat(expr: Expr, model: ExplorationResult, adapter: TraceMindAdapter) -> Set[int]:
+    return CtlChecker(model, adapter).states(expr)
+
+
 def check_ctl(expr: Expr, model: ExplorationResult, adapter: TraceMindAdapter) -> Set[int]:
     return _sat(expr, model, adapter)
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
-from collections import defaultdict, deque
+import os
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from .adapter import TraceMindAdapter
-from .state import State
+from .state import HashParts, State, StateHasher, StateTable
+from .visited import MemoryVisitedSet, SqliteVisitedSet, VisitedSet
 
 
 @dataclass
 class ExplorationResult:
-    states: List[State]
+    states: Sequence[State]
     edges: Dict[int, List[int]]
     predecessors: Dict[int, Tuple[int, str]]
     deadlocks: List[int]
     hash_mode: str
     max_depth: int
+    stopped: Optional[str] = None
 
     def path_to(self, target: int) -> List[int]:
         if target >= len(self.states):
@@ -30,39 +35,144 @@ class ExplorationResult:
         return path
 
 
+@dataclass(frozen=True)
+class ExplorationProgress:
+    """Snapshot passed to the ``progress`` callback after each BFS level."""
+
+    depth: int
+    states: int
+    frontier: int
+    edges: int
+
+
+_Expansion = Tuple[bool, List[Tuple[str, State, HashParts]]]
+_FrontierItem = Tuple[int, State, HashParts]
+
+# levels with fewer states than this are cheaper to expand in-process
+_PARALLEL_MIN_FRONTIER = 64
+
+_worker_adapter: Optional[TraceMindAdapter] = None
+_worker_hasher: Optional[StateHasher] = None
+
+
+def _init_worker(adapter: TraceMindAdapter, hash_mode: str) -> None:
+    global _worker_adapter, _worker_hasher
+    _worker_adapter = adapter
+    _worker_hasher = StateHasher(hash_mode)
+
+
+def _expand(adapter: TraceMindAdapter, hasher: StateHasher, st: State, parts: HashParts, expand: bool) -> _Expansion:
+    succ = adapter.successors(st) if expand else []
+    deadlocked = not succ and adapter.is_deadlocked(st)
+    return deadlocked, [(label, nxt, hasher.derive(st, parts, nxt)) for label, nxt in succ]
+
+
+def _expand_partition(batch: List[_FrontierItem], expand: bool) -> List[Tuple[int, _Expansion]]:
+    assert _worker_adapter is not None and _worker_hasher is not None
+    return [(sid, _expand(_worker_adapter, _worker_hasher, st, parts, expand)) for sid, st, parts in batch]
+
+
 class Explorer:
     def __init__(self, adapter: TraceMindAdapter):
         self.adapter = adapter
 
-    def run(self, *, max_depth: int = 8, hash_mode: str = "full") -> ExplorationResult:
+    def run(
+        self,
+        *,
+        max_depth: int = 8,
+        hash_mode: str = "full",
+        visited_path: Optional[str | Path] = None,
+        workers: int = 1,
+        max_states: Optional[int] = None,
+        stop_on: Optional[Callable[[State], bool]] = None,
+        progress: Optional[Callable[[ExplorationProgress], None]] = None,
+    ) -> ExplorationResult:
+        """Breadth-first exploration up to ``max_depth`` transitions.
+
+        States are deduplicated by an incremental 128-bit hash (see
+        :class:`StateHasher`) and recorded in a compact :class:`StateTable`.
+        With ``visited_path`` the hash-to-id map lives in a SQLite scratch
+        file instead of memory.
+
+        The search runs one depth level at a time. With ``workers > 1`` (or
+        ``workers <= 0`` for one per CPU) each level's frontier is partitioned
+        by state hash across worker processes, which compute successors and
+        their hashes; the parent merges results in state-id order, so ids,
+        edges and predecessors match a single-process run. Exploration stops
+        early once ``max_states`` states are known (``stopped="budget"``) or
+        when ``stop_on`` returns true for a newly reached state
+        (``stopped="violation"``).
+        """
+
+        hasher = StateHasher(hash_mode)
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        visited: VisitedSet = SqliteVisitedSet(visited_path) if visited_path is not None else MemoryVisitedSet()
         root = self.adapter.initial_state()
-        states: List[State] = [root]
+        root_parts = hasher.parts(root)
+        states = StateTable()
+        states.append(root)
         edges: Dict[int, List[int]] = defaultdict(list)
         predecessors: Dict[int, Tuple[int, str]] = {}
         deadlocks: List[int] = []
-        seen: Dict[str, int] = {root.stable_hash(hash_mode): 0}
-        depths: Dict[int, int] = {0: 0}
-
-        q: deque[Tuple[int, State]] = deque()
-        q.append((0, root))
-        while q:
-            sid, st = q.popleft()
-            depth = depths.get(sid, 0)
-            succ = [] if depth >= max_depth else self.adapter.successors(st)
-            if not succ and self.adapter.is_deadlocked(st):
-                deadlocks.append(sid)
-            for label, nxt in succ:
-                h = nxt.stable_hash(hash_mode)
-                if h in seen:
-                    nid = seen[h]
+        edge_count = 0
+        stopped: Optional[str] = None
+
+        pool: Optional[Executor] = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.adapter.structural(), hash_mode),
+            )
+        try:
+            visited.add(hasher.combine(root_parts), 0)
+            if stop_on is not None and stop_on(root):
+                stopped = "violation"
+            frontier: List[_FrontierItem] = [(0, root, root_parts)]
+            depth = 0
+            while frontier and stopped is None:
+                expand = depth < max_depth
+                if pool is None or len(frontier) < _PARALLEL_MIN_FRONTIER:
+                    expanded = [(sid, _expand(self.adapter, hasher, st, parts, expand)) for sid, st, parts in frontier]
                 else:
-                    nid = len(states)
-                    states.append(nxt)
-                    seen[h] = nid
-                    depths[nid] = depth + 1
-                    q.append((nid, nxt))
-                edges[sid].append(nid)
-                predecessors.setdefault(nid, (sid, label))
+                    expanded = self._expand_parallel(pool, workers, frontier, expand)
+                parents = {sid: st for sid, st, _ in frontier}
+                nxt_frontier: List[_FrontierItem] = []
+                for sid, (deadlocked, succ) in expanded:
+                    if deadlocked:
+                        deadlocks.append(sid)
+                    st = parents[sid]
+                    for label, nxt, nxt_parts in succ:
+                        h = hasher.combine(nxt_parts)
+                        nid = visited.get(h)
+                        if nid is None:
+                            if max_states is not None and len(states) >= max_states:
+                                stopped = "budget"
+                                break
+                            prefix = sid if nxt.events[: len(st.events)] == st.events else None
+                            nid = states.append(nxt, prefix_of=prefix)
+                            visited.add(h, nid)
+                            nxt_frontier.append((nid, nxt, nxt_parts))
+                            if stop_on is not None and stop_on(nxt):
+                                stopped = "violation"
+                        edges[sid].append(nid)
+                        edge_count += 1
+                        predecessors.setdefault(nid, (sid, label))
+                        if stopped is not None:
+                            break
+                    if stopped is not None:
+                        break
+                frontier = nxt_frontier
+                depth += 1
+                if progress is not None:
+                    progress(
+                        ExplorationProgress(depth=depth, states=len(states), frontier=len(frontier), edges=edge_count)
+                    )
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            visited.close()
 
         return ExplorationResult(
             states=states,
@@ -71,4 +181,17 @@ class Explorer:
             deadlocks=deadlocks,
             hash_mode=hash_mode,
             max_depth=max_depth,
+            stopped=stopped,
         )
+
+    @staticmethod
+    def _expand_parallel(
+        pool: Executor, workers: int, frontier: List[_FrontierItem], expand: bool
+    ) -> List[Tuple[int, _Expansion]]:
+        partitions: List[List[_FrontierItem]] = [[] for _ in range(workers)]
+        for item in frontier:
+            partitions[StateHasher.combine(item[2]) % workers].append(item)
+        futures = [pool.submit(_expand_partition, part, expand) for part in partitions if part]
+        merged = [entry for fut in futures for entry in fut.result()]
+        merged.sort(key=lambda entry: entry[0])
+        return merged
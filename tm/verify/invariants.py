@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from .adapter import TraceMindAdapter
 from .ctl import Expr, eval_state_expr, has_ctl_nodes, parse_expr
 from .explorer import ExplorationResult
+from .state import State
 
 
 @dataclass
@@ -49,3 +50,27 @@ def check_invariants(
             path = model.path_to(violated_at)
             results.append(InvariantResult(expr=raw, ok=False, violated_at=violated_at, path=path, reason="violated"))
     return results
+
+
+def invariant_monitor(invariants: List[str], adapter: TraceMindAdapter) -> Optional[Callable[[State], bool]]:
+    """Predicate for ``Explorer.run(stop_on=...)`` that is true once any invariant fails.
+
+    Invariants that do not parse or use CTL operators are left to
+    :func:`check_invariants` to report.
+    """
+
+    exprs: List[Expr] = []
+    for raw in invariants:
+        try:
+            expr = parse_expr(raw)
+        except Exception:
+            continue
+        if not has_ctl_nodes(expr):
+            exprs.append(expr)
+    if not exprs:
+        return None
+
+    def violated(state: State) -> bool:
+        return any(not eval_state_expr(expr, state, adapter) for expr in exprs)
+
+    return violated
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import List, Optional, Sequence
 
 from .adapter import TraceMindAdapter
-from .ctl import Expr, Not, check_ctl, parse_expr
+from .ctl import CtlChecker, Expr, Not, parse_expr
 from .explorer import ExplorationResult
 from .invariants import InvariantResult, check_invariants
 from .spec import PropertySpec
@@ -27,6 +27,7 @@ class VerifyReport:
     deadlocks: List[int]
     hash_mode: str
     max_depth: int
+    stopped: Optional[str] = None
 
     def as_dict(self) -> dict:
         return {
@@ -34,6 +35,7 @@ class VerifyReport:
             "deadlocks": self.deadlocks,
             "hash_mode": self.hash_mode,
             "max_depth": self.max_depth,
+            "stopped": self.stopped,
             "invariants": [
                 {
                     "expr": inv.expr,
@@ -57,21 +59,10 @@ class VerifyReport:
         }
 
 
-def _nearest_reachable(targets: Sequence[int], model: ExplorationResult) -> Optional[int]:
-    available = set(targets)
-    if not available:
-        return None
-    for idx in range(len(model.states)):
-        if idx in available:
-            return idx
-    return None
-
-
-def _counterexample(expr: Expr, model: ExplorationResult, adapter: TraceMindAdapter) -> List[int]:
-    neg = Not(expr)
-    sat_neg = check_ctl(neg, model, adapter)
-    target = _nearest_reachable(sorted(sat_neg), model)
-    if target is None:
+def _counterexample(expr: Expr, model: ExplorationResult, checker: CtlChecker) -> List[int]:
+    # the lowest state id is the nearest one in BFS order
+    target = checker.sat(Not(expr)).find(1)
+    if target == -1:
         return []
     return model.path_to(target)
 
@@ -80,15 +71,16 @@ def check_properties(
     props: Sequence[PropertySpec], model: ExplorationResult, adapter: TraceMindAdapter
 ) -> List[PropertyResult]:
     results: List[PropertyResult] = []
+    checker = CtlChecker(model, adapter)
     for spec in props:
         try:
             expr = parse_expr(spec.formula)
-            sat = check_ctl(expr, model, adapter)
-            ok = 0 in sat
+            sat = checker.sat(expr)
+            ok = bool(sat) and sat[0] == 1
             path: List[int] = []
             reason = ""
             if not ok:
-                path = _counterexample(expr, model, adapter)
+                path = _counterexample(expr, model, checker)
                 reason = "not satisfied from initial state"
             results.append(
                 PropertyResult(name=spec.name, formula=spec.formula, ok=ok, counterexample=path, reason=reason)
@@ -118,4 +110,5 @@ def build_report(
         deadlocks=model.deadlocks,
         hash_mode=model.hash_mode,
         max_depth=model.max_depth,
+        stopped=model.stopped,
     )
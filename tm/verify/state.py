@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import copy
 import hashlib
 import json
+from array import array
 from dataclasses import dataclass
-from typing import Any, Mapping, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, overload
 
 
 def _normalize(value: Any) -> Any:
@@ -41,3 +43,297 @@ class State:
             "done": list(self.done),
             "events": list(self.events),
         }
+
+
+_SCALARS = (str, int, float, bool, type(None))
+_MISSING = object()
+_RECORD_LIMIT = 1 << 16
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(_normalize(value), sort_keys=True, default=str)
+
+
+def _value_key(value: Any) -> Any:
+    """Hashable key equal only for values of the same types and contents."""
+
+    if isinstance(value, _SCALARS):
+        return (type(value), value)
+    if isinstance(value, Mapping):
+        return (type(value), frozenset((_value_key(k), _value_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_value_key(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return (type(value), frozenset(_value_key(v) for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        return (type(value), _canonical(value))
+    return (type(value), value)
+
+
+def _term(*parts: str) -> int:
+    digest = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest, "big")
+
+
+HashParts = Tuple[int, int, int, int]
+
+
+class StateHasher:
+    """Zobrist-style 128-bit state hashes that update incrementally.
+
+    A state hash is the XOR of one term per store entry, per pending/done
+    position and per event position, so deriving a successor's hash only
+    touches the entries that differ from its parent. Terms are memoized, and
+    ``mode`` selects the same components as :meth:`State.stable_hash`.
+    """
+
+    def __init__(self, mode: str = "full") -> None:
+        if mode not in {"full", "store"}:
+            raise ValueError(f"Unknown hash mode '{mode}'")
+        self.mode = mode
+        self._store_terms: Dict[Tuple[str, type, Any], int] = {}
+        self._seq_terms: Dict[Tuple[str, int, str], int] = {}
+        # non-scalar values may be mutated in place, so remember the term each object was hashed with
+        self._hashed: Dict[Tuple[str, int], Tuple[Any, int]] = {}
+
+    def parts(self, state: State) -> HashParts:
+        """Hash every component of ``state`` from scratch."""
+
+        store_h = self._store_hash(state.store)
+        if self.mode == "store":
+            return store_h, 0, 0, 0
+        return (
+            store_h,
+            self._seq_hash("p", state.pending),
+            self._seq_hash("d", state.done),
+            self._seq_hash("e", state.events),
+        )
+
+    def derive(self, parent: State, parent_parts: HashParts, child: State) -> HashParts:
+        """Hash ``child`` by patching ``parent_parts`` with the entries that changed.
+
+        Unchanged scalar entries are detected by identity, which is what a
+        successor built from a copy of its parent's store preserves. Other
+        values are rehashed and patched out with the term they were hashed
+        with, so in-place mutation is caught; if that term is unknown (e.g.
+        the parent was hashed by another hasher) ``child`` is hashed in full.
+        A store shared with the parent may have been mutated in place, so it
+        is rehashed rather than trusted.
+        """
+
+        store_h = parent_parts[0]
+        pstore, cstore = parent.store, child.store
+        if pstore is cstore:
+            return self._store_hash(cstore), *self._derive_seqs(parent, parent_parts, child)
+        for key, value in cstore.items():
+            old = pstore.get(key, _MISSING)
+            if old is value and isinstance(value, _SCALARS):
+                continue
+            if old is not _MISSING:
+                old_term = self._hashed_term(key, old)
+                if old_term is None:
+                    return self.parts(child)
+                store_h ^= old_term
+            store_h ^= self._store_term(key, value)
+        if len(pstore) > len(cstore) or not pstore.keys() <= cstore.keys():
+            for key in pstore.keys() - cstore.keys():
+                old_term = self._hashed_term(key, pstore[key])
+                if old_term is None:
+                    return self.parts(child)
+                store_h ^= old_term
+        return store_h, *self._derive_seqs(parent, parent_parts, child)
+
+    def _derive_seqs(self, parent: State, parent_parts: HashParts, child: State) -> Tuple[int, int, int]:
+        if self.mode == "store":
+            return 0, 0, 0
+        return (
+            self._seq_derive("p", parent.pending, parent_parts[1], child.pending),
+            self._seq_derive("d", parent.done, parent_parts[2], child.done),
+            self._seq_derive("e", parent.events, parent_parts[3], child.events),
+        )
+
+    @staticmethod
+    def combine(parts: HashParts) -> int:
+        return parts[0] ^ parts[1] ^ parts[2] ^ parts[3]
+
+    def _store_hash(self, store: Mapping[str, Any]) -> int:
+        store_h = 0
+        for key, value in store.items():
+            store_h ^= self._store_term(key, value)
+        return store_h
+
+    def _store_term(self, key: str, value: Any) -> int:
+        if isinstance(value, _SCALARS):
+            memo = (key, type(value), value)
+            term = self._store_terms.get(memo)
+            if term is None:
+                term = _term("s", str(key), _canonical(value))
+                self._store_terms[memo] = term
+            return term
+        term = _term("s", str(key), _canonical(value))
+        if len(self._hashed) >= _RECORD_LIMIT:
+            self._hashed.clear()
+        self._hashed[(key, id(value))] = (value, term)
+        return term
+
+    def _hashed_term(self, key: str, value: Any) -> Optional[int]:
+        """The term ``value`` was last hashed with, or ``None`` if it is not known."""
+
+        if isinstance(value, _SCALARS):
+            return self._store_term(key, value)
+        record = self._hashed.get((key, id(value)))
+        return record[1] if record is not None and record[0] is value else None
+
+    def _seq_term(self, kind: str, pos: int, item: str) -> int:
+        memo = (kind, pos, item)
+        term = self._seq_terms.get(memo)
+        if term is None:
+            term = _term(kind, str(pos), str(item))
+            self._seq_terms[memo] = term
+        return term
+
+    def _seq_hash(self, kind: str, items: Tuple[str, ...], start: int = 0, acc: int = 0) -> int:
+        for pos in range(start, len(items)):
+            acc ^= self._seq_term(kind, pos, items[pos])
+        return acc
+
+    def _seq_derive(self, kind: str, old: Tuple[str, ...], old_h: int, new: Tuple[str, ...]) -> int:
+        if new is old:
+            return old_h
+        n = len(old)
+        if len(new) >= n and new[:n] == old:
+            return self._seq_hash(kind, new, n, old_h)
+        return self._seq_hash(kind, new)
+
+
+class StateTable(Sequence[State]):
+    """Append-only table of explored states kept as interned component ids.
+
+    Each row is four integers: an interned store (sorted key/value id pairs),
+    interned pending and done tuples, and a node in an event trie shared by
+    every state with the same event prefix. :class:`State` objects are rebuilt
+    on access, so only the exploration frontier holds full states in memory.
+    Non-scalar values are interned as private copies and copied again on
+    access, so rebuilt states never share mutable objects.
+    """
+
+    def __init__(self) -> None:
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._values: List[Any] = []
+        self._value_ids: Dict[Any, int] = {}
+        self._stores: List[Tuple[int, ...]] = []
+        self._store_ids: Dict[Tuple[int, ...], int] = {}
+        self._seqs: List[Tuple[int, ...]] = []
+        self._seq_ids: Dict[Tuple[int, ...], int] = {}
+        # node 0 is the empty event list; other nodes are (parent, name id, length)
+        self._event_nodes: List[Tuple[int, int, int]] = [(-1, -1, 0)]
+        self._event_ids: Dict[Tuple[int, int], int] = {}
+        self._rows = array("q")
+
+    def __len__(self) -> int:
+        return len(self._rows) // 4
+
+    @overload
+    def __getitem__(self, index: int) -> State: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[State]: ...
+
+    def __getitem__(self, index: int | slice) -> State | List[State]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("state index out of range")
+        base = index * 4
+        store_id, pending_id, done_id, events_id = self._rows[base : base + 4]
+        names, values = self._names, self._values
+        flat = self._stores[store_id]
+        store = {names[flat[i]]: _thaw(values[flat[i + 1]]) for i in range(0, len(flat), 2)}
+        return State(
+            store=store,
+            pending=tuple(names[i] for i in self._seqs[pending_id]),
+            done=tuple(names[i] for i in self._seqs[done_id]),
+            events=self._decode_events(events_id),
+        )
+
+    def append(self, state: State, *, prefix_of: Optional[int] = None) -> int:
+        """Store ``state`` and return its index.
+
+        ``prefix_of`` may name a stored state whose events are a prefix of
+        ``state.events`` (typically its BFS parent) so only the new events
+        are walked into the trie.
+        """
+
+        flat: List[int] = []
+        for key in sorted(state.store, key=str):
+            flat.append(self._intern_name(key))
+            flat.append(self._intern_value(state.store[key]))
+        node, start = 0, 0
+        if prefix_of is not None:
+            node = self._rows[prefix_of * 4 + 3]
+            start = self._event_nodes[node][2]
+        for pos in range(start, len(state.events)):
+            node = self._intern_event(node, self._intern_name(state.events[pos]))
+        self._rows.extend(
+            (
+                self._intern(tuple(flat), self._stores, self._store_ids),
+                self._intern(tuple(self._intern_name(s) for s in state.pending), self._seqs, self._seq_ids),
+                self._intern(tuple(self._intern_name(s) for s in state.done), self._seqs, self._seq_ids),
+                node,
+            )
+        )
+        return len(self) - 1
+
+    @staticmethod
+    def _intern(item: Tuple[int, ...], table: List[Tuple[int, ...]], ids: Dict[Tuple[int, ...], int]) -> int:
+        idx = ids.get(item)
+        if idx is None:
+            idx = len(table)
+            table.append(item)
+            ids[item] = idx
+        return idx
+
+    def _intern_name(self, name: str) -> int:
+        idx = self._name_ids.get(name)
+        if idx is None:
+            idx = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = idx
+        return idx
+
+    def _intern_value(self, value: Any) -> int:
+        memo = _value_key(value)
+        idx = self._value_ids.get(memo)
+        if idx is None:
+            idx = len(self._values)
+            self._values.append(_thaw(value))
+            self._value_ids[memo] = idx
+        return idx
+
+    def _intern_event(self, parent: int, name_id: int) -> int:
+        idx = self._event_ids.get((parent, name_id))
+        if idx is None:
+            idx = len(self._event_nodes)
+            self._event_nodes.append((parent, name_id, self._event_nodes[parent][2] + 1))
+            self._event_ids[(parent, name_id)] = idx
+        return idx
+
+    def _decode_events(self, node: int) -> Tuple[str, ...]:
+        out: List[str] = []
+        nodes, names = self._event_nodes, self._names
+        while node > 0:
+            parent, name_id, _ = nodes[node]
+            out.append(names[name_id])
+            node = parent
+        out.reverse()
+        return tuple(out)
+
+
+def _thaw(value: Any) -> Any:
+    return value if isinstance(value, _SCALARS) else copy.deepcopy(value)
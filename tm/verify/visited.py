@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional, Protocol
+
+
+class VisitedSet(Protocol):
+    """Maps 128-bit state hashes to state ids during exploration."""
+
+    def get(self, key: int) -> Optional[int]: ...
+
+    def add(self, key: int, sid: int) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def close(self) -> None: ...
+
+
+class MemoryVisitedSet:
+    def __init__(self) -> None:
+        self._ids: Dict[int, int] = {}
+
+    def get(self, key: int) -> Optional[int]:
+        return self._ids.get(key)
+
+    def add(self, key: int, sid: int) -> None:
+        self._ids[key] = sid
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def close(self) -> None:
+        self._ids.clear()
+
+
+class SqliteVisitedSet:
+    """Visited set spilled to a SQLite file for state spaces that outgrow memory.
+
+    New entries are buffered and written in batches of ``batch_size``;
+    lookups consult the buffer first. The file is scratch space: it is
+    truncated on open and not made durable.
+    """
+
+    def __init__(self, path: str | Path, *, batch_size: int = 10_000) -> None:
+        self._path = Path(path)
+        self._batch_size = max(1, int(batch_size))
+        self._buffer: Dict[bytes, int] = {}
+        self._count = 0
+        if self._path.parent and str(self._path.parent):
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path))
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("DROP TABLE IF EXISTS visited")
+        self._conn.execute("CREATE TABLE visited (h BLOB PRIMARY KEY, sid INTEGER NOT NULL) WITHOUT ROWID")
+
+    @staticmethod
+    def _key(key: int) -> bytes:
+        return key.to_bytes(16, "big")
+
+    def get(self, key: int) -> Optional[int]:
+        raw = self._key(key)
+        sid = self._buffer.get(raw)
+        if sid is not None:
+            return sid
+        row = self._conn.execute("SELECT sid FROM visited WHERE h = ?", (raw,)).fetchone()
+        return None if row is None else int(row[0])
+
+    def add(self, key: int, sid: int) -> None:
+        self._buffer[self._key(key)] = sid
+        self._count += 1
+        if len(self._buffer) >= self._batch_size:
+            self._flush()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO visited (h, sid) VALUES (?, ?)", self._buffer.items())
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self._buffer.clear()
+        self._conn.close()
+
+
+__all__ = ["VisitedSet", "MemoryVisitedSet", "SqliteVisitedSet"]